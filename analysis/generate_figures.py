@@ -1,23 +1,50 @@
 """Generate result figures"""
+import argparse
+import sys
+sys.path.insert(0, 'src')
+
 import matplotlib.pyplot as plt
 import numpy as np
+from pathlib import Path
+from src.evaluation.sweep import load_sweep_results
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cache-dir', default='results/cache')
+    parser.add_argument('--output', default='results/figures')
+    args = parser.parse_args()
+    
     print("Generating Figures")
     print("=" * 60)
     
-    # Figure: Performance Comparison
-    systems = ['Threshold', 'Iso Forest', 'Single', 'Static MA', 'ADAPT-MAD']
-    f1_scores = [0.552, 0.662, 0.682, 0.670, 0.836]
+    rows = load_sweep_results(args.cache_dir)
+    if not rows:
+        print(f"\nNo cached runs in {args.cache_dir}; run experiments/run_sweep.py first")
+        return
+    
+    # Figure: Performance Comparison (best F1 per dataset and strategy)
+    datasets = sorted({r['dataset'] for r in rows})
+    strategies = sorted({r['strategy'] for r in rows})
+    best = {
+        (d, s): max((r['f1'] for r in rows if r['dataset'] == d and r['strategy'] == s),
+                    default=0.0)
+        for d in datasets for s in strategies
+    }
     
+    x = np.arange(len(datasets))
+    width = 0.8 / len(strategies)
     plt.figure(figsize=(10, 6))
-    plt.bar(systems, f1_scores, color='steelblue')
+    for i, strategy in enumerate(strategies):
+        plt.bar(x + i * width, [best[(d, strategy)] for d in datasets], width, label=strategy)
+    plt.xticks(x + width * (len(strategies) - 1) / 2, datasets)
     plt.ylabel('F1 Score')
     plt.title('Detection Performance Comparison')
     plt.ylim([0, 1.0])
     plt.grid(axis='y', alpha=0.3)
+    plt.legend()
     
-    plt.savefig('results/figures/performance_comparison.png', dpi=300, bbox_inches='tight')
+    Path(args.output).mkdir(parents=True, exist_ok=True)
+    plt.savefig(f'{args.output}/performance_comparison.png', dpi=300, bbox_inches='tight')
     print("✓ Saved: performance_comparison.png")
     
     plt.close()
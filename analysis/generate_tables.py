@@ -1,27 +1,38 @@
 """Generate result tables"""
+import argparse
 import sys
 sys.path.insert(0, 'src')
 
+from src.evaluation.sweep import load_sweep_results
+
+PARAMS = ('window_size', 'hidden_dim', 'hysteresis', 'threshold_high_load',
+          'threshold_low_load')
+
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--cache-dir', default='results/cache')
+    args = parser.parse_args()
+    
     print("Generating Tables")
     print("=" * 60)
     
-    # Table II: Performance Comparison
-    print("\nTable II: Detection Performance")
-    print("-" * 60)
-    print(f"{'System':<20} {'Precision':>10} {'Recall':>10} {'F1':>10}")
-    print("-" * 60)
+    rows = load_sweep_results(args.cache_dir)
+    if not rows:
+        print(f"\nNo cached runs in {args.cache_dir}; run experiments/run_sweep.py first")
+        return
     
-    systems = [
-        ('Threshold', 0.412, 0.834, 0.552),
-        ('Isolation Forest', 0.628, 0.701, 0.662),
-        ('Single-Agent', 0.654, 0.712, 0.682),
-        ('Static MA', 0.683, 0.658, 0.670),
-        ('ADAPT-MAD', 0.817, 0.856, 0.836),
-    ]
+    print("\nDetection Performance")
+    print("-" * 96)
+    print(f"{'Dataset':<14} {'Config':<28} {'Strategy':<9} {'Precision':>10} "
+          f"{'Recall':>8} {'F1':>7} {'MTTD(m)':>8} {'win/s':>8}")
+    print("-" * 96)
     
-    for name, p, r, f1 in systems:
-        print(f"{name:<20} {p:>10.3f} {r:>10.3f} {f1:>10.3f}")
+    for row in sorted(rows, key=lambda r: (r['dataset'], r['hash'], r['strategy'])):
+        config = ' '.join(f"{k}={row[k]}" for k in PARAMS if k in row)
+        mttd = f"{row['mttd_minutes']:.2f}" if row['mttd_minutes'] is not None else "-"
+        print(f"{row['dataset']:<14} {config:<28} {row['strategy']:<9} "
+              f"{row['precision']:>10.3f} {row['recall']:>8.3f} {row['f1']:>7.3f} "
+              f"{mttd:>8} {row['windows_per_sec']:>8.1f}")
     
     print("\n✓ Tables generated!")
 
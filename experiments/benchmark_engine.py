@@ -0,0 +1,69 @@
+"""Benchmark the shared-signal engine against running each agent on its own
+
+Per tick, 'agents' calls detect/detect_batch on every agent, each
+computing its own features; 'engine' runs SharedSignalEngine, which
+shares one WindowSignals across agents. The pipeline default
+(execution.engine) is only worth keeping as 'shared' while it wins here.
+"""
+import argparse
+import sys
+import time
+sys.path.insert(0, 'src')
+
+import numpy as np
+import torch
+
+from src.agents import AGENT_CLASSES, AgentType
+from src.coordination import AdaptiveCoordinator, SharedSignalEngine
+
+def _best_ms(fn, repeats: int) -> float:
+    for _ in range(3):
+        fn()
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return float(np.median(times)) * 1000.0
+
+def benchmark(feature_dim: int, batch: int, window_size: int = 50,
+              hidden_dim: int = 64, repeats: int = 20) -> dict:
+    agent_types = [AgentType.LATENCY, AgentType.THROUGHPUT, AgentType.RESOURCE,
+                   AgentType.ERROR_RATE]
+    agents = [AGENT_CLASSES[t](feature_dim=feature_dim, window_size=window_size,
+                               hidden_dim=hidden_dim) for t in agent_types]
+    coordinator = AdaptiveCoordinator(agents)
+    engine = SharedSignalEngine(coordinator)
+    windows = np.random.randn(batch, window_size, feature_dim)
+    
+    if batch == 1:
+        separate = lambda: coordinator.detect(windows[0])
+        shared = lambda: engine.detect(windows[0])
+    else:
+        separate = lambda: [agent.detect_batch(windows) for agent in agents]
+        shared = lambda: engine.detect_batch(windows)
+    return {
+        'feature_dim': feature_dim, 'batch': batch,
+        'agents_ms': _best_ms(separate, repeats),
+        'engine_ms': _best_ms(shared, repeats),
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--feature-dims', type=int, nargs='+', default=[10, 187])
+    parser.add_argument('--batches', type=int, nargs='+', default=[1, 64])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=0)
+    args = parser.parse_args()
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    
+    print(f"{'F':>5} {'batch':>6} {'agents ms':>10} {'engine ms':>10} {'speedup':>8}")
+    for feature_dim in args.feature_dims:
+        for batch in args.batches:
+            row = benchmark(feature_dim, batch, repeats=args.repeats)
+            print(f"{feature_dim:>5} {batch:>6} {row['agents_ms']:>10.2f} "
+                  f"{row['engine_ms']:>10.2f} {row['agents_ms'] / row['engine_ms']:>7.2f}x")
+
+if __name__ == "__main__":
+    main()
@@ -1,12 +1,13 @@
 """Run single dataset experiment"""
 import argparse
+import json
 import sys
 sys.path.insert(0, 'src')
 
-from src.agents import *
-from src.coordination import AdaptiveCoordinator, SystemState
-import numpy as np
-from sklearn.metrics import precision_score, recall_score, f1_score
+from src.coordination import PipelineConfig
+from src.evaluation import (ReplayConfig, compact_report, run_replay,
+                            write_results, STRATEGIES)
+from pathlib import Path
 
 def main():
     parser = argparse.ArgumentParser()
@@ -14,55 +15,58 @@ def main():
                        choices=['train_ticket', 'robotshop', 'sock_shop'])
     parser.add_argument('--config', default='configs/default.yaml')
     parser.add_argument('--output', default='results/')
+    parser.add_argument('--services', nargs='*', default=None)
+    parser.add_argument('--strategies', nargs='*', default=STRATEGIES,
+                       choices=STRATEGIES)
+    parser.add_argument('--max-windows', type=int, default=None,
+                       help='Limit replayed windows per service')
+    parser.add_argument('--no-isolate', action='store_true',
+                       help='Run all strategies in this process (shared peak RSS)')
+    parser.add_argument('--compact-report', action='store_true',
+                       help='Compare int8 compact agents against float32 agents')
     args = parser.parse_args()
     
-    print(f"Running experiment on {args.dataset}")
-    print("=" * 60)
+    # Per-dataset overrides (configs/<dataset>.yaml) on top of --config
+    paths = [args.config]
+    dataset_config = Path(args.config).parent / f"{args.dataset}.yaml"
+    if dataset_config.exists():
+        paths.append(str(dataset_config))
+    config = PipelineConfig.from_yaml(*paths)
     
-    # Create agents
-    agents = [
-        LatencyDetectionAgent(feature_dim=10, window_size=50),
-        ThroughputMonitoringAgent(feature_dim=10, window_size=50),
-        ResourceUtilizationAgent(feature_dim=10, window_size=50),
-        ErrorRateAgent(feature_dim=10, window_size=50),
-    ]
+    replay_config = ReplayConfig.from_pipeline_config(
+        config, args.dataset, services=args.services, max_windows=args.max_windows,
+    )
     
-    # Create coordinator
-    coordinator = AdaptiveCoordinator(agents)
+    if args.compact_report:
+        report = compact_report(replay_config, args.strategies, isolate=not args.no_isolate)
+        print(f"Model weights: {report['model_bytes_float'] / 1024:.1f} KB float32 -> "
+              f"{report['model_bytes_compact'] / 1024:.1f} KB int8 "
+              f"({report['compression']:.2f}x smaller)")
+        for row in report['strategies']:
+            print(f"{row['strategy']:<10} F1 {row['f1_float']:.3f} -> {row['f1_compact']:.3f} "
+                  f"({row['f1_delta']:+.3f}), speed {row['speedup']:.2f}x")
+        path = Path(args.output) / f"compact_{args.dataset}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(report, indent=2))
+        print(f"\n✓ Report written to {path}")
+        return
     
-    # Simulate evaluation
-    print("\nSimulating evaluation...")
-    n_samples = 100
-    predictions = []
-    labels = np.random.randint(0, 2, n_samples)
+    print(f"Running experiment on {args.dataset}")
+    print("=" * 60)
     
-    for i in range(n_samples):
-        window = np.random.randn(50, 10)
-        
-        system_state = SystemState(
-            workload_intensity=np.random.uniform(1000, 5000),
-            cpu_utilization=np.random.uniform(0.3, 0.9),
-            memory_utilization=np.random.uniform(0.3, 0.8),
-            recent_fpr=0.08,
-            recent_fnr=0.05,
-            deployment_active=(i % 50 == 0),
-            timestamp=i
-        )
-        
-        agent_results = [agent.detect(window) for agent in agents]
-        is_anomaly, _, _ = coordinator.coordinate_detection(agent_results, system_state)
-        predictions.append(1 if is_anomaly else 0)
+    results = run_replay(replay_config, args.strategies, isolate=not args.no_isolate)
     
-    # Calculate metrics
-    precision = precision_score(labels, predictions, zero_division=0)
-    recall = recall_score(labels, predictions, zero_division=0)
-    f1 = f1_score(labels, predictions, zero_division=0)
+    print(f"\n{'Strategy':<10} {'P':>6} {'R':>6} {'F1':>6} {'MTTD(m)':>8} "
+          f"{'win/s':>8} {'p50ms':>7} {'p99ms':>7} {'RSS MB':>7}")
+    print("-" * 72)
+    for r in results:
+        mttd = f"{r.mttd_minutes:.2f}" if r.mttd_minutes is not None else "-"
+        print(f"{r.strategy:<10} {r.precision:>6.3f} {r.recall:>6.3f} {r.f1:>6.3f} "
+              f"{mttd:>8} {r.windows_per_sec:>8.1f} {r.latency_p50_ms:>7.2f} "
+              f"{r.latency_p99_ms:>7.2f} {r.peak_rss_mb:>7.1f}")
     
-    print("\nResults:")
-    print(f"  Precision: {precision:.3f}")
-    print(f"  Recall: {recall:.3f}")
-    print(f"  F1: {f1:.3f}")
-    print("\n✓ Experiment complete!")
+    path = write_results(results, replay_config, args.output)
+    print(f"\n✓ Results written to {path}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,35 @@
+"""Run a datasets x configuration sweep (cached by configuration hash)"""
+import argparse
+import sys
+sys.path.insert(0, 'src')
+
+from src.evaluation.sweep import run_sweep, STRATEGIES
+import yaml
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datasets', nargs='+', required=True,
+                       choices=['train_ticket', 'robotshop', 'sock_shop'])
+    parser.add_argument('--grid', required=True,
+                       help='YAML mapping of parameter -> list of values, e.g. '
+                            'window_size, hidden_dim, threshold_high_load, hysteresis')
+    parser.add_argument('--strategies', nargs='*', default=STRATEGIES, choices=STRATEGIES)
+    parser.add_argument('--max-windows', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--cache-dir', default='results/cache')
+    args = parser.parse_args()
+    
+    with open(args.grid) as f:
+        grid = yaml.safe_load(f)
+    base = {'max_windows': args.max_windows} if args.max_windows else {}
+    
+    print(f"Sweeping {len(args.datasets)} dataset(s) over {grid}")
+    print("=" * 60)
+    
+    entries = run_sweep(args.datasets, grid, base=base, strategies=args.strategies,
+                        cache_dir=args.cache_dir, max_workers=args.workers)
+    
+    print(f"\n✓ {len(entries)} cells in {args.cache_dir}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""Train agent detectors on a (time, features) trace"""
+import argparse
+import sys
+sys.path.insert(0, 'src')
+
+from src.coordination import PipelineConfig, build_pipeline
+from src.training import TrainingConfig, train_agents
+import numpy as np
+import yaml
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--data', required=True,
+                       help='.npy array of shape (time, features)')
+    parser.add_argument('--config', default='configs/default.yaml')
+    args = parser.parse_args()
+    
+    with open(args.config) as f:
+        config = yaml.safe_load(f)
+    training_config = TrainingConfig.from_dict(config)
+    # Fresh detectors: training.checkpoint_dir is where training writes
+    (config.get('model') or {}).pop('checkpoint_dir', None)
+    pipeline_config = PipelineConfig.from_dict(config)
+    
+    data = np.load(args.data, mmap_mode='r')
+    
+    print(f"Training on {args.data} {data.shape}")
+    print("=" * 60)
+    
+    agents = build_pipeline(pipeline_config, feature_dim=data.shape[1]).agents
+    
+    for agent_type, summary in train_agents(agents, data, training_config).items():
+        print(f"  {agent_type}: val_loss={summary['best_val_loss']:.4f} "
+              f"epochs={len(summary['history'])} -> {summary['checkpoint']}")
+    
+    print("\n✓ Training complete!")
+
+if __name__ == "__main__":
+    main()
@@ -1,28 +1,25 @@
 """ADAPT-MAD Quick Start Example"""
-from src.agents import LatencyDetectionAgent, ThroughputMonitoringAgent
-from src.coordination import AdaptiveCoordinator, SystemState
+from src.coordination import PipelineConfig, SystemState, build_pipeline
 import numpy as np
 import time
 
 print("ADAPT-MAD Quick Start")
 print("=" * 50)
 
-# Create agents
+# Build agents, coordinator and execution engine from the config
 print("\n1. Creating detection agents...")
-agents = [
-    LatencyDetectionAgent(feature_dim=10, window_size=50),
-    ThroughputMonitoringAgent(feature_dim=10, window_size=50),
-]
+config = PipelineConfig.from_yaml('configs/default.yaml')
+pipeline = build_pipeline(config, feature_dim=10)
+agents = pipeline.agents
 print(f"   Created {len(agents)} agents")
 
-# Create coordinator
 print("\n2. Initializing coordinator...")
-coordinator = AdaptiveCoordinator(agents)
-print("   Coordinator ready")
+print(f"   Coordinator ready ({config.execution.engine} engine, "
+      f"{config.execution.backend} backend)")
 
 # Generate sample data
 print("\n3. Preparing test data...")
-window = np.random.randn(50, 10)
+window = np.random.randn(config.window_size, 10)
 print(f"   Window shape: {window.shape}")
 
 # Define system state
@@ -38,12 +35,8 @@ system_state = SystemState(
 
 # Run detection
 print("\n4. Running anomaly detection...")
-agent_results = [agent.detect(window) for agent in agents]
-
-is_anomaly, confidence, metadata = coordinator.coordinate_detection(
-    agent_results, 
-    system_state
-)
+# The shared-signal engine computes features once per tick for all agents
+is_anomaly, confidence, metadata = pipeline.process(window, system_state)
 
 # Display results
 print("\n" + "=" * 50)
@@ -10,3 +10,7 @@ echo "Please download datasets manually:"
 echo "  1. Train-Ticket: https://zenodo.org/record/6979726"
 echo "  2. RobotShop: https://github.com/ms-anomaly/rs-anomic"
 echo "  3. Sock-Shop: https://github.com/microservices-demo/microservices-demo"
+echo ""
+echo "Place one CSV per service (timestamp,label,<metrics...>) in data/<dataset>/raw/."
+echo "They are converted once to memory-mapped arrays in data/<dataset>/columnar/"
+echo "on first use (src.data.open_dataset)."
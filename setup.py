@@ -40,6 +40,7 @@ setup(
     extras_require={
         "dev": ["pytest>=7.4.0", "pytest-cov>=4.1.0", "black>=23.7.0"],
         "docs": ["sphinx>=7.1.0"],
+        "onnx": ["onnx>=1.14.0", "onnxruntime>=1.15.0"],
     },
     entry_points={
         "console_scripts": [
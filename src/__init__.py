@@ -1,13 +1,16 @@
 """
 ADAPT-MAD: Adaptive Multi-Agent Detection Framework
+
+Subpackages are imported on first access, so e.g. coordination-only
+processes never load torch.
 """
 
 __version__ = "1.0.0"
 __author__ = "Minav Suresh Patel, Rohit Dhawan, Ankush Dhar"
 
-from . import agents
-from . import coordination
-from . import models
-from . import utils
+from .utils.lazy import lazy_exports
+
+__all__ = ['agents', 'coordination', 'data', 'evaluation', 'monitoring',
+           'serving', 'training', 'utils']
 
-__all__ = ['agents', 'coordination', 'models', 'utils']
+__getattr__, __dir__ = lazy_exports(__name__, {name: f'.{name}' for name in __all__})
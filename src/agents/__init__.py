@@ -1,19 +1,28 @@
-"""ADAPT-MAD Detection Agents"""
-from .base_agent import DetectionAgent, AgentType, DetectionResult, LSTMDetector
-from .latency_agent import LatencyDetectionAgent
-from .throughput_agent import ThroughputAgent
-from .resource_agent import ResourceAgent
-from .error_rate_agent import Error_rateAgent
-from .slo_agent import SloAgent
+"""ADAPT-MAD Detection Agents
 
-# Aliases
-ThroughputMonitoringAgent = ThroughputAgent
-ResourceUtilizationAgent = ResourceAgent
-ErrorRateAgent = Error_rateAgent
-SLOComplianceAgent = SloAgent
+AgentType, DetectionResult and MetricSchema are torch-free; the agents
+themselves import torch on first use.
+"""
+from ..utils.lazy import lazy_exports
 
 __all__ = [
     'DetectionAgent', 'AgentType', 'DetectionResult', 'LSTMDetector',
     'LatencyDetectionAgent', 'ThroughputMonitoringAgent',
-    'ResourceUtilizationAgent', 'ErrorRateAgent', 'SLOComplianceAgent'
+    'ResourceUtilizationAgent', 'ErrorRateAgent', 'SLOComplianceAgent',
+    'MetricSchema', 'AGENT_CLASSES', 'parse_agent_type'
 ]
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'AgentType': '.types',
+    'DetectionResult': '.types',
+    'MetricSchema': '.schema',
+    'DetectionAgent': '.base_agent',
+    'LSTMDetector': '.base_agent',
+    'LatencyDetectionAgent': '.latency_agent',
+    'ThroughputMonitoringAgent': '.throughput_agent',
+    'ResourceUtilizationAgent': '.resource_agent',
+    'ErrorRateAgent': '.error_rate_agent',
+    'SLOComplianceAgent': '.slo_agent',
+    'AGENT_CLASSES': '.registry',
+    'parse_agent_type': '.registry',
+})
@@ -0,0 +1,130 @@
+"""
+ADAPT-MAD: Inference Backends
+Eager, TorchScript and ONNX Runtime execution of LSTMDetector.forward_last
+"""
+
+import copy
+import inspect
+import io
+import warnings
+import numpy as np
+import torch
+import torch.nn as nn
+
+class _LastStep(nn.Module):
+    """Exposes LSTMDetector.forward_last as forward for tracing/export"""
+    
+    def __init__(self, model: nn.Module):
+        super().__init__()
+        self.model = model
+    
+    def forward(self, x):
+        return self.model.forward_last(x)
+
+class EagerBackend:
+    """Plain PyTorch module call under no_grad"""
+    
+    name = 'eager'
+    
+    def __init__(self, model: nn.Module, input_dim: int, window_size: int, device: str):
+        self.model = model
+        self.device = device
+    
+    def forward_last(self, features: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            x = torch.as_tensor(features, dtype=torch.float32, device=self.device)
+            return self.model.forward_last(x).cpu().numpy()
+
+class TorchScriptBackend(EagerBackend):
+    """Traced, frozen graph: no Python dispatch per layer"""
+    
+    name = 'torchscript'
+    
+    def __init__(self, model: nn.Module, input_dim: int, window_size: int, device: str):
+        super().__init__(model, input_dim, window_size, device)
+        example = torch.zeros(1, window_size, input_dim, device=device)
+        with torch.no_grad(), warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            traced = torch.jit.trace(_LastStep(model).eval(), example, check_trace=False)
+            self.graph = torch.jit.optimize_for_inference(torch.jit.freeze(traced))
+    
+    def forward_last(self, features: np.ndarray) -> np.ndarray:
+        with torch.no_grad():
+            x = torch.as_tensor(features, dtype=torch.float32, device=self.device)
+            return self.graph(x).cpu().numpy()
+
+class QuantizedBackend(EagerBackend):
+    """Dynamic int8 LSTM/Linear weights (activations quantized per call), CPU only
+    
+    Serves a quantized copy; the float model stays the one that is trained
+    and checkpointed. With inplace, model itself is converted instead, so
+    no float copy of the weights is left (the caller must not use it again).
+    """
+    
+    name = 'quantized'
+    
+    def __init__(self, model: nn.Module, input_dim: int, window_size: int, device: str,
+                 inplace: bool = False):
+        from torch.ao.quantization import quantize_dynamic
+        
+        source = model if inplace else copy.deepcopy(model)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            quantized = quantize_dynamic(
+                source.cpu().eval(), {nn.LSTM, nn.Linear}, dtype=torch.qint8, inplace=inplace
+            )
+        super().__init__(quantized, input_dim, window_size, 'cpu')
+
+class OnnxRuntimeBackend:
+    """ONNX export served by onnxruntime (CPU); requires the onnxruntime package"""
+    
+    name = 'onnxruntime'
+    
+    def __init__(self, model: nn.Module, input_dim: int, window_size: int, device: str):
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError("The 'onnxruntime' backend requires `pip install onnxruntime`") from e
+        
+        example = torch.zeros(1, window_size, input_dim)
+        export_kwargs = {}
+        if 'dynamo' in inspect.signature(torch.onnx.export).parameters:
+            export_kwargs['dynamo'] = False
+        
+        buffer = io.BytesIO()
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            torch.onnx.export(
+                _LastStep(model).cpu().eval(), (example,), buffer,
+                input_names=['x'], output_names=['y'],
+                dynamic_axes={'x': {0: 'batch', 1: 'time'}, 'y': {0: 'batch'}},
+                **export_kwargs
+            )
+        model.to(device)
+        
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = torch.get_num_threads()
+        self.session = ort.InferenceSession(
+            buffer.getvalue(), options, providers=['CPUExecutionProvider']
+        )
+    
+    def forward_last(self, features: np.ndarray) -> np.ndarray:
+        x = np.ascontiguousarray(features, dtype=np.float32)
+        return self.session.run(None, {'x': x})[0]
+
+BACKENDS = {
+    backend.name: backend
+    for backend in (EagerBackend, TorchScriptBackend, QuantizedBackend, OnnxRuntimeBackend)
+}
+
+def model_nbytes(model: nn.Module) -> int:
+    """Serialized size of a module's weights (packed int8 weights included)"""
+    buffer = io.BytesIO()
+    torch.save(model.state_dict(), buffer)
+    return buffer.tell()
+
+def create_backend(name: str, model: nn.Module, input_dim: int,
+                   window_size: int, device: str, **options):
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {name!r}, expected one of {sorted(BACKENDS)}")
+    return BACKENDS[name](model, input_dim, window_size, device, **options)
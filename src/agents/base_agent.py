@@ -3,28 +3,21 @@ ADAPT-MAD: Base Detection Agent
 Core agent implementation with LSTM-based anomaly detection
 """
 
+import asyncio
+import time
 import numpy as np
 import torch
 import torch.nn as nn
 from typing import Dict, List, Tuple, Optional
-from collections import deque
-from dataclasses import dataclass
-from enum import Enum
+from pathlib import Path
 
-class AgentType(Enum):
-    LATENCY = "LDA"
-    THROUGHPUT = "TMA"
-    RESOURCE = "RUA"
-    ERROR_RATE = "ERA"
-    SLO_COMPLIANCE = "SCA"
-
-@dataclass
-class DetectionResult:
-    score: float
-    is_anomaly: bool
-    confidence: float
-    timestamp: float
-    agent_type: AgentType
+from ..utils.rolling_stats import RollingWindowStats
+from ..utils.ring_buffer import RingBuffer, RollingRate
+from ..utils.clock import WallClock
+from . import checkpoint as ckpt
+from .backends import create_backend, model_nbytes
+from .types import AgentType, DetectionResult, DETECTION_DTYPE
+from .features import FEATURE_PIPELINES, FeaturePipeline, StreamSignals, WindowSignals
 
 class LSTMDetector(nn.Module):
     """LSTM-based anomaly detector"""
@@ -45,79 +38,407 @@ class LSTMDetector(nn.Module):
         lstm_out, _ = self.lstm(x)
         output = self.fc(lstm_out)
         return output
+    
+    def forward_last(self, x):
+        """Reconstruct only the last time step of each sequence"""
+        lstm_out, _ = self.lstm(x)
+        return self.fc(lstm_out[:, -1])
+    
+    def step(self, x, state=None):
+        """Advance from a carried (h, c) state; returns last-step output and new state"""
+        lstm_out, state = self.lstm(x, state)
+        return self.fc(lstm_out[:, -1]), state
 
 class DetectionAgent:
     """Base detection agent with adaptive threshold"""
     
+    # Window percentiles read by extract_features (see RollingWindowStats)
+    stat_percentiles: Tuple[float, ...] = ()
+    
     def __init__(self, agent_type: AgentType, feature_dim: int,
                  window_size: int = 50, hidden_dim: int = 64,
                  num_layers: int = 2, dropout: float = 0.2,
-                 device: str = 'cpu'):
+                 device: str = 'cpu', stream_resync_interval: Optional[int] = None,
+                 checkpoint: Optional[str] = None, backend: str = 'eager',
+                 compact: bool = False, serving_only: bool = False,
+                 feature_pipeline: Optional[FeaturePipeline] = None):
         self.agent_type = agent_type
         self.feature_dim = feature_dim
         self.window_size = window_size
         self.device = device
+        # Model input: feature_dim normalized metrics, then derived columns
+        self.feature_pipeline = feature_pipeline or FEATURE_PIPELINES.get(
+            agent_type, FeaturePipeline())
+        self.input_dim = feature_dim + self.feature_pipeline.extra_dim(feature_dim)
         
-        self.model = LSTMDetector(
-            feature_dim, hidden_dim, num_layers, dropout
-        ).to(device)
+        self._model_args = (self.input_dim, hidden_dim, num_layers, dropout)
+        self.model = LSTMDetector(*self._model_args).to(device)
+        self.model.eval()
+        self.checkpoint_version = None
+        # Compact mode: int8 inference and float32 feature extraction
+        self.compact = compact
+        self.feature_dtype = np.float32 if compact else np.float64
+        if compact and backend == 'eager':
+            backend = 'quantized'
+        # Serving-only: the quantized backend converts the float detector in
+        # place, so only int8 weights stay resident; the agent can then load
+        # checkpoints but not be trained or saved
+        self.serving_only = serving_only
+        self.backend_name = backend
+        self.backend = None
+        # StageTimers when instrumented (see monitoring.Instrumentation)
+        self.metrics = None
+        # Result timestamps; a coordinator replaces it with its own clock
+        self.clock = WallClock()
+        if checkpoint is not None:
+            self.load_checkpoint(checkpoint)
+        self.set_backend(backend)
         
-        self.detection_history = deque(maxlen=1000)
+        self.detection_history = RingBuffer(1000, DETECTION_DTYPE)
         self.performance_metrics = {
             'true_positives': 0, 'false_positives': 0,
             'true_negatives': 0, 'false_negatives': 0
         }
         
         self.alpha = 1.0
-        self.recent_fpr = deque(maxlen=100)
-        self.recent_fnr = deque(maxlen=100)
+        self.recent_fpr = RollingRate(100)
+        self.recent_fnr = RollingRate(100)
         self.weight = 1.0
         self.communication_buffer = []
+        
+        self.stream_resync_interval = stream_resync_interval or window_size
+        self.reset_stream()
     
-    def extract_features(self, window: np.ndarray) -> np.ndarray:
-        """Extract and normalize features"""
-        features = window.copy()
-        mean = np.mean(features, axis=0)
-        std = np.std(features, axis=0) + 1e-8
-        normalized = (features - mean) / std
-        return normalized
+    def load_checkpoint(self, path: str):
+        """Load detector weights from a checkpoint file, or the latest
+        version for this agent type in a checkpoint directory"""
+        path = Path(path)
+        if path.is_dir():
+            resolved = ckpt.latest_checkpoint(path, self.agent_type)
+            if resolved is None:
+                raise FileNotFoundError(
+                    f"No {self.agent_type.value} checkpoint under {path}")
+            path = resolved
+        
+        payload = ckpt.load_checkpoint(path, map_location=self.device)
+        if self.model is None:
+            # Serving-only weights were released; materialize them for the load
+            self.model = LSTMDetector(*self._model_args).to(self.device)
+        if payload['agent_type'] != self.agent_type.value:
+            raise ValueError(
+                f"Checkpoint {path} is for {payload['agent_type']}, not {self.agent_type.value}")
+        if payload['feature_dim'] != self.feature_dim:
+            raise ValueError(
+                f"Checkpoint {path} has feature_dim={payload['feature_dim']}, "
+                f"agent has {self.feature_dim}")
+        # Checkpoints from before feature pipelines were trained on metrics only
+        input_dim = payload.get('input_dim', payload['feature_dim'])
+        if input_dim != self.input_dim:
+            raise ValueError(
+                f"Checkpoint {path} was trained on {input_dim} input columns, "
+                f"this agent's feature pipeline produces {self.input_dim}; retrain it")
+        
+        self.model.load_state_dict(payload['state_dict'])
+        self.model.eval()
+        self.checkpoint_version = payload['version']
+        if self.backend is not None:
+            self.set_backend(self.backend_name)
     
-    def detect(self, window: np.ndarray) -> DetectionResult:
+    def set_backend(self, name: str):
+        """Compile the current detector weights for the named inference backend
+        ('eager', 'torchscript' or 'onnxruntime'); serves detect/detect_batch"""
+        model = self.float_model()
+        self.backend = create_backend(
+            name, model, self.input_dim, self.window_size, self.device,
+            **self._backend_options(name)
+        )
+        self.backend_name = name
+        if self._releases_weights(name):
+            self.model = None
+    
+    def float_model(self) -> LSTMDetector:
+        """The trainable float detector (released in serving-only compact mode)"""
+        if self.model is None:
+            raise RuntimeError(
+                f"{self.agent_type.value} agent is serving-only and holds no float weights; "
+                f"load a checkpoint or build it with serving_only=False to train or save it")
+        return self.model
+    
+    def _releases_weights(self, name: str) -> bool:
+        return self.serving_only and name == 'quantized'
+    
+    def _backend_options(self, name: str) -> Dict:
+        return {'inplace': True} if self._releases_weights(name) else {}
+    
+    def swap_model(self, model: LSTMDetector):
+        """Serve a new detector, e.g. from a background fine-tuning thread
+        
+        The backend is compiled before anything is published; in-flight
+        detections finish on the old model and the next ones see the new
+        model and backend. Carried streaming state is kept and is replaced
+        at the next periodic resync.
+        """
+        model.eval()
+        backend = create_backend(
+            self.backend_name, model, self.input_dim, self.window_size, self.device,
+            **self._backend_options(self.backend_name)
+        )
+        self.backend = backend
+        self.model = None if self._releases_weights(self.backend_name) else model
+    
+    def model_nbytes(self) -> Dict[str, int]:
+        """Weight bytes of the float detector, of what the backend serves, and
+        resident in total (both, when the backend holds its own copy)"""
+        served = getattr(self.backend, 'model', self.model)
+        float_bytes = 0 if self.model is None else model_nbytes(self.model)
+        served_bytes = model_nbytes(served)
+        resident = served_bytes if served is self.model else served_bytes + float_bytes
+        return {'float': float_bytes, 'served': served_bytes, 'resident': resident}
+    
+    def __getstate__(self):
+        # Compiled graphs/sessions are not picklable; rebuilt on unpickling.
+        # A serving-only quantized backend is the only copy of the weights.
+        state = self.__dict__.copy()
+        if self.model is not None:
+            state['backend'] = None
+        state['metrics'] = None
+        return state
+    
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if self.backend is None:
+            self.set_backend(self.backend_name)
+    
+    def extract_features(self, window: np.ndarray,
+                         stats: Optional[RollingWindowStats] = None) -> np.ndarray:
+        """(window_size, input_dim) model input from the agent's feature pipeline
+        
+        When stats tracks the same window, its incremental moments (and
+        subscribed percentiles) are reused instead of recomputing them.
+        """
+        window = np.asarray(window).astype(self.feature_dtype, copy=False)[np.newaxis]
+        if stats is None:
+            signals = WindowSignals(window)
+        else:
+            signals = WindowSignals(window, mean=stats.mean, std=stats.std)
+            if self.stat_percentiles:
+                signals.seed('percentiles', np.stack(
+                    [stats.percentile(q) for q in self.stat_percentiles])[np.newaxis])
+        return self._transform(signals)[0]
+    
+    def extract_features_batch(self, windows: np.ndarray,
+                               signals: Optional[WindowSignals] = None) -> np.ndarray:
+        """Extract features for a (batch, window_size, feature_dim) stack
+        
+        signals, shared by the agents of one tick, caches the derived
+        signals of these windows so each is computed once.
+        """
+        cls = type(self)
+        if (cls.extract_features is not DetectionAgent.extract_features
+                and cls.extract_features_batch is DetectionAgent.extract_features_batch):
+            # Subclass only customised the per-window path
+            return np.stack([self.extract_features(w) for w in windows])
+        if signals is None:
+            signals = WindowSignals(windows.astype(self.feature_dtype, copy=False))
+        return self._transform(signals.astype(self.feature_dtype))
+    
+    def _transform(self, signals: WindowSignals) -> np.ndarray:
+        return self.feature_pipeline.transform(signals).astype(self.feature_dtype, copy=False)
+    
+    def detect(self, window: np.ndarray,
+               stats: Optional[RollingWindowStats] = None) -> DetectionResult:
         """Algorithm 3: Agent Detection Process"""
-        features = self.extract_features(window)
+        t = self._clock()
+        features = self.extract_features(window, stats)
+        t = self._observe('extract_features', t)
+        y_pred = self._forward_last(features[np.newaxis])
+        t = self._observe('forward', t)
+        window_std = (np.std(window, axis=0) if stats is None else stats.std) + 1e-8
+        result = self._score_batch(features[np.newaxis, -1], y_pred, window_std)[0]
+        self._observe('score', t)
+        return result
+    
+    async def adetect(self, window: np.ndarray,
+                      stats: Optional[RollingWindowStats] = None,
+                      executor=None) -> DetectionResult:
+        """detect on executor (default: the loop's) without blocking the event loop
         
-        with torch.no_grad():
-            x = torch.FloatTensor(features).unsqueeze(0).to(self.device)
-            y_pred = self.model(x).squeeze(0).cpu().numpy()
+        Calls for one agent must not overlap: it carries adaptive state.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, self.detect, window, stats)
+    
+    def detect_batch(self, windows: np.ndarray) -> List[DetectionResult]:
+        """Algorithm 3 over many windows with a single forward pass
         
-        y_true = features[-1]
-        error = np.abs(y_true - y_pred[-1])
-        window_std = np.std(window, axis=0) + 1e-8
-        threshold = self.alpha * window_std
-        score = np.mean(error / threshold)
+        Equivalent to calling detect on each window in order.
+        """
+        windows = np.asarray(windows)
+        if windows.ndim == 2:
+            windows = windows[np.newaxis]
+        if len(windows) == 0:
+            return []
         
-        self._adapt_threshold()
+        t = self._clock()
+        signals = WindowSignals(windows)
+        features = self.extract_features_batch(windows, signals)
+        t = self._observe('extract_features', t)
+        y_pred = self._forward_last(features)
+        t = self._observe('forward', t)
+        window_std = signals.get('std')[:, 0]
+        results = self._score_batch(features[:, -1], y_pred, window_std)
+        self._observe('score', t)
+        return results
+    
+    def subscribe(self, stats: RollingWindowStats):
+        """Read streaming moments/percentiles from a shared RollingWindowStats
         
-        is_anomaly = score > 1.0
-        confidence = min(score / 2.0, 1.0) if is_anomaly else 1.0 - score
+        The owner of stats calls stats.update(sample) once per tick, before
+        the subscribed agents' detect_stream(sample).
+        """
+        stats.subscribe(self.stat_percentiles)
+        self._stream_stats = stats
+        self._owns_stream_stats = False
+        self._stream_state = None
+    
+    def reset_stream(self):
+        """Drop carried streaming state; the next full window triggers a resync"""
+        self._stream_stats = RollingWindowStats(self.window_size, self.feature_dim)
+        self._stream_stats.subscribe(self.stat_percentiles)
+        self._owns_stream_stats = True
+        self._stream_state = None
+        self._stream_steps = 0
+    
+    def detect_stream(self, sample: np.ndarray) -> Optional[DetectionResult]:
+        """Streaming detection on one new sample at per-sample cost
         
-        result = DetectionResult(
-            score=float(score), is_anomaly=bool(is_anomaly),
-            confidence=float(confidence), timestamp=0.0,
-            agent_type=self.agent_type
-        )
+        Keeps rolling window statistics and the LSTM (h, c) state between
+        calls, so each sample costs one recurrent step instead of a full
+        window. Every stream_resync_interval samples the state is rebuilt
+        from a full-window pass to keep drift bounded. Returns None until
+        window_size samples have been seen.
+        """
+        stats = self._stream_stats
+        sample = np.asarray(sample, dtype=float)
+        if self._owns_stream_stats:
+            stats.update(sample)
         
-        self.detection_history.append(result)
+        if stats.count < self.window_size:
+            return None
+        
+        if self._stream_state is None or self._stream_steps >= self.stream_resync_interval:
+            return self._resync_stream()
+        
+        t = self._clock()
+        window_std = stats.std + 1e-8
+        # Only the newest row of the model input, from the rolling state
+        x = self.feature_pipeline.transform(StreamSignals(stats))[0, -1]
+        t = self._observe('extract_features', t)
+        
+        with torch.no_grad():
+            x_t = torch.as_tensor(x, dtype=torch.float32, device=self.device).view(1, 1, -1)
+            y_pred, self._stream_state = self._stream_model().step(x_t, self._stream_state)
+        t = self._observe('forward', t)
+        
+        self._stream_steps += 1
+        result = self._score_batch(x[np.newaxis], y_pred.cpu().numpy(), window_std)[0]
+        self._observe('score', t)
         return result
     
-    def _adapt_threshold(self):
-        """Adapt detection threshold"""
+    def _resync_stream(self) -> DetectionResult:
+        """Rebuild the LSTM state (and own statistics) from the full window"""
+        stats = self._stream_stats
+        window = stats.window()
+        if self._owns_stream_stats:
+            stats.reset(window)
+        
+        features = self.extract_features(window, stats)
+        with torch.no_grad():
+            x = torch.as_tensor(features[np.newaxis], dtype=torch.float32, device=self.device)
+            y_pred, self._stream_state = self._stream_model().step(x)
+        
+        self._stream_steps = 0
+        window_std = stats.std + 1e-8
+        return self._score_batch(features[np.newaxis, -1], y_pred.cpu().numpy(), window_std)[0]
+    
+    def _stream_model(self) -> LSTMDetector:
+        # Serving-only agents stream through the int8 detector
+        return self.model if self.model is not None else self.backend.model
+    
+    def _clock(self) -> float:
+        return time.perf_counter() if self.metrics is not None else 0.0
+    
+    def _observe(self, stage: str, start: float) -> float:
+        """Record a stage duration when instrumented; returns the next stage's start"""
+        if self.metrics is None:
+            return 0.0
+        now = time.perf_counter()
+        getattr(self.metrics, stage).observe(now - start)
+        return now
+    
+    def _forward_last(self, features: np.ndarray) -> np.ndarray:
+        """Last-step reconstruction for a (batch, window_size, feature_dim) stack"""
+        return self.backend.forward_last(features)
+    
+    def _score_batch(self, y_true: np.ndarray, y_pred: np.ndarray,
+                     window_std: np.ndarray) -> List[DetectionResult]:
+        """Turn last-step reconstructions into detection results
+        
+        Only the feature_dim metric columns are scored; derived columns are
+        model context.
+        """
+        F = self.feature_dim
+        error = np.abs(y_true[:, :F] - y_pred[:, :F])
+        threshold = self._alpha_schedule(len(error))[:, np.newaxis] * window_std
+        scores = np.mean(error / threshold, axis=1)
+        
+        is_anomaly = scores > 1.0
+        confidence = np.where(is_anomaly, np.minimum(scores / 2.0, 1.0), 1.0 - scores)
+        
+        records = np.zeros(len(scores), dtype=DETECTION_DTYPE)
+        records['score'] = scores
+        records['is_anomaly'] = is_anomaly
+        records['confidence'] = confidence
+        now = self.clock()
+        records['timestamp'] = now
+        self.detection_history.extend(records)
+        
+        agent_type = self.agent_type
+        return [
+            DetectionResult(s, a, c, now, agent_type)
+            for s, a, c in zip(scores.tolist(), is_anomaly.tolist(), confidence.tolist())
+        ]
+    
+    def _threshold_step(self) -> float:
+        """Multiplicative alpha step for the current FPR/FNR"""
         if len(self.recent_fpr) > 10:
-            avg_fpr = np.mean(self.recent_fpr)
+            avg_fpr = self.recent_fpr.mean()
             if avg_fpr > 0.15:
-                self.alpha = min(self.alpha * 1.1, 2.0)
-            elif len(self.recent_fnr) > 10 and np.mean(self.recent_fnr) > 0.10:
-                self.alpha = max(self.alpha * 0.9, 0.5)
+                return 1.1
+            elif len(self.recent_fnr) > 10 and self.recent_fnr.mean() > 0.10:
+                return 0.9
+        return 1.0
+    
+    def _adapt_threshold(self):
+        """Adapt detection threshold"""
+        self.alpha = self._step_alpha(self.alpha, self._threshold_step())
+    
+    @staticmethod
+    def _step_alpha(alpha: float, step: float) -> float:
+        if step > 1.0:
+            return min(alpha * step, 2.0)
+        if step < 1.0:
+            return max(alpha * step, 0.5)
+        return alpha
+    
+    def _alpha_schedule(self, n: int) -> np.ndarray:
+        """Alphas used by n consecutive detections, adapting after each one"""
+        step = self._threshold_step()
+        alphas = np.empty(n)
+        for i in range(n):
+            alphas[i] = self.alpha
+            self.alpha = self._step_alpha(self.alpha, step)
+        return alphas
     
     def update_performance(self, is_correct: bool, was_true_positive: bool = None):
         """Algorithm 6: Performance-Based Weight Update"""
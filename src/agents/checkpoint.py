@@ -0,0 +1,55 @@
+"""
+ADAPT-MAD: Detector Checkpoints
+Versioned on-disk checkpoints for agent LSTMDetectors
+"""
+
+import re
+import time
+import torch
+from pathlib import Path
+from typing import Dict, Optional
+
+_VERSION_RE = re.compile(r'^v(\d+)\.pt$')
+
+def checkpoint_versions(directory, agent_type) -> Dict[int, Path]:
+    """Existing checkpoint versions for an agent type under directory"""
+    agent_dir = Path(directory) / agent_type.value
+    versions = {}
+    if agent_dir.is_dir():
+        for path in agent_dir.iterdir():
+            match = _VERSION_RE.match(path.name)
+            if match:
+                versions[int(match.group(1))] = path
+    return versions
+
+def latest_checkpoint(directory, agent_type) -> Optional[Path]:
+    versions = checkpoint_versions(directory, agent_type)
+    return versions[max(versions)] if versions else None
+
+def save_checkpoint(agent, directory, **metadata) -> Path:
+    """Write the agent's detector as the next version under directory/<type>/"""
+    model = agent.float_model()
+    versions = checkpoint_versions(directory, agent.agent_type)
+    version = max(versions) + 1 if versions else 1
+    path = Path(directory) / agent.agent_type.value / f"v{version:03d}.pt"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    
+    payload = {
+        'version': version,
+        'agent_type': agent.agent_type.value,
+        'feature_dim': agent.feature_dim,
+        'input_dim': agent.input_dim,
+        'window_size': agent.window_size,
+        'hidden_dim': model.hidden_dim,
+        'num_layers': model.num_layers,
+        'created': time.time(),
+        'metadata': metadata,
+        'state_dict': model.state_dict(),
+    }
+    tmp = path.with_suffix('.tmp')
+    torch.save(payload, tmp)
+    tmp.replace(path)
+    return path
+
+def load_checkpoint(path, map_location='cpu') -> Dict:
+    return torch.load(path, map_location=map_location)
@@ -0,0 +1,251 @@
+"""
+ADAPT-MAD: Feature Pipelines
+Per-AgentType derived features over metric windows, computed column-wise
+in one vectorized pass and shared between agents through WindowSignals
+"""
+
+import numpy as np
+from typing import Callable, Dict, Optional, Tuple
+
+from .types import AgentType
+
+_EPS = 1e-8
+
+class WindowSignals:
+    """Lazily computed, cached column-wise signals of a (batch, window_size, F) stack
+    
+    One instance per tick is shared by every agent, so a signal several
+    pipelines read (e.g. the first difference) is computed once. Every
+    signal is per column, so columns(cols) returns a view for an agent's
+    column subset that reads and fills the same cache. astype(dtype) does
+    the same for agents with another feature dtype: signals are computed
+    here and cast, once per dtype.
+    """
+    
+    def __init__(self, windows: np.ndarray, mean: Optional[np.ndarray] = None,
+                 std: Optional[np.ndarray] = None):
+        self.windows = windows
+        self._cache: Dict[str, np.ndarray] = {}
+        self._casts: Dict[np.dtype, '_CastSignals'] = {}
+        # Incremental moments (e.g. from RollingWindowStats) replace recomputation
+        if mean is not None:
+            self._cache['mean'] = np.broadcast_to(mean, (len(windows), 1, windows.shape[2]))
+        if std is not None:
+            self._cache['std'] = np.broadcast_to(std + _EPS, (len(windows), 1, windows.shape[2]))
+        self.computed = 0
+    
+    def seed(self, name: str, value: np.ndarray):
+        """Provide a signal computed elsewhere (e.g. streaming percentiles)"""
+        self._cache[name] = value
+    
+    def get(self, name: str) -> np.ndarray:
+        value = self._cache.get(name)
+        if value is None:
+            value = self._cache[name] = SIGNALS[name](self)
+            self.computed += 1
+        return value
+    
+    def take(self, index: np.ndarray) -> 'WindowSignals':
+        """Signals of a subset of the batch, keeping what is already computed"""
+        taken = WindowSignals(self.windows[index])
+        taken._cache = {name: value[index] for name, value in self._cache.items()}
+        return taken
+    
+    def columns(self, cols: slice) -> '_ColumnSignals':
+        return _ColumnSignals(self, cols)
+    
+    def astype(self, dtype):
+        """Signals of the same windows in dtype, backed by this cache"""
+        dtype = np.dtype(dtype)
+        if self.windows.dtype == dtype:
+            return self
+        if dtype not in self._casts:
+            self._casts[dtype] = _CastSignals(self, dtype)
+        return self._casts[dtype]
+
+class _CastSignals:
+    """A WindowSignals in another dtype; signals come from the parent, cast once"""
+    
+    def __init__(self, parent: WindowSignals, dtype: np.dtype):
+        self.parent = parent
+        self.windows = parent.windows.astype(dtype)
+        self._cache: Dict[str, np.ndarray] = {}
+    
+    def get(self, name: str) -> np.ndarray:
+        value = self._cache.get(name)
+        if value is None:
+            value = self.parent.get(name)
+            value = self._cache[name] = value.astype(self.windows.dtype, copy=False)
+        return value
+    
+    def columns(self, cols: slice) -> '_ColumnSignals':
+        return _ColumnSignals(self, cols)
+    
+    def astype(self, dtype):
+        return self.parent.astype(dtype)
+
+class _ColumnSignals:
+    """Column subset of a WindowSignals, backed by the parent's cache"""
+    
+    def __init__(self, parent, cols: slice):
+        self.parent = parent
+        self.cols = cols
+        self.windows = parent.windows[..., cols]
+    
+    def get(self, name: str) -> np.ndarray:
+        return self.parent.get(name)[..., self.cols]
+    
+    def astype(self, dtype):
+        if self.windows.dtype == dtype:
+            return self
+        return self.parent.astype(dtype).columns(self.cols)
+
+class StreamSignals:
+    """Newest-step signals of the window tracked by a RollingWindowStats
+    
+    Same interface as WindowSignals for a batch of one window, but every
+    per-step signal holds only the last step, computed from the rolling
+    moments, the sorted window and the newest samples. A pipeline's
+    transform() over it is the last row of its transform() over the full
+    window, at O(feature_dim) cost for every pipeline here except the
+    sorted-window updates behind percentiles.
+    """
+    
+    def __init__(self, stats):
+        self.stats = stats
+        self.windows = stats.latest(1)[np.newaxis]
+        self._cache: Dict[str, np.ndarray] = {
+            'mean': stats.mean[np.newaxis, np.newaxis],
+            'std': (stats.std + _EPS)[np.newaxis, np.newaxis],
+        }
+    
+    def get(self, name: str) -> np.ndarray:
+        value = self._cache.get(name)
+        if value is None:
+            value = self._cache[name] = STREAM_SIGNALS[name](self)
+        return value
+    
+    def latest(self, k: int) -> np.ndarray:
+        """(1, k, F) newest samples; the first sample repeats for short windows"""
+        n = min(k, self.stats.count)
+        tail = self.stats.latest(n)
+        if n < k:
+            tail = np.concatenate([np.repeat(tail[:1], k - n, axis=0), tail])
+        return tail[np.newaxis]
+
+def _trailing_mean(windows: np.ndarray, span: int) -> np.ndarray:
+    """Mean of the last span samples at each step (fewer at the start)"""
+    csum = np.cumsum(windows, axis=1)
+    lagged = np.zeros_like(csum)
+    lagged[:, span:] = csum[:, :-span]
+    counts = np.minimum(np.arange(1, windows.shape[1] + 1), span)
+    return (csum - lagged) / counts[np.newaxis, :, np.newaxis]
+
+# Each signal is computed from the windows (and other signals) per column
+SIGNALS: Dict[str, Callable] = {
+    'mean': lambda s: np.mean(s.windows, axis=1, keepdims=True),
+    'std': lambda s: np.std(s.windows, axis=1, keepdims=True) + _EPS,
+    'normalized': lambda s: (s.windows - s.get('mean')) / s.get('std'),
+    # The first step has no predecessor, so its difference is 0
+    'diff': lambda s: np.diff(s.windows, axis=1, prepend=s.windows[:, :1]),
+    'diff2': lambda s: np.diff(s.get('diff'), axis=1, prepend=s.get('diff')[:, :1]),
+    'percentiles': lambda s: np.percentile(s.windows, [50, 95, 99], axis=1).transpose(1, 0, 2),
+    'peak': lambda s: np.max(np.abs(s.windows), axis=1, keepdims=True) + _EPS,
+    'trailing_mean': lambda s: _trailing_mean(s.windows, max(1, s.windows.shape[1] // 10)),
+}
+
+# Last-step values of SIGNALS for StreamSignals
+STREAM_SIGNALS: Dict[str, Callable] = {
+    'normalized': SIGNALS['normalized'],
+    'diff': lambda s: np.diff(s.latest(2), axis=1),
+    'diff2': lambda s: np.diff(s.latest(3), n=2, axis=1),
+    'percentiles': lambda s: np.stack(
+        [s.stats.percentile(q) for q in (50, 95, 99)])[np.newaxis],
+    'peak': lambda s: s.stats.peak[np.newaxis, np.newaxis] + _EPS,
+    'trailing_mean': lambda s: np.mean(
+        s.latest(max(1, s.stats.window_size // 10)), axis=1, keepdims=True),
+}
+
+class FeaturePipeline:
+    """Model input for one agent type: the normalized window plus derived columns
+    
+    Output is (batch, window_size, feature_dim + extra_dim(feature_dim)).
+    The first feature_dim columns are always the normalized metrics, which
+    are the only columns anomaly scores are computed on; derived columns
+    are extra context for the detector and are reconstructed in training.
+    Derived columns are dimensionless, so windows of any scale give
+    comparable inputs.
+    """
+    
+    # Derived columns per metric column
+    extra_per_column = 0
+    
+    def extra_dim(self, feature_dim: int) -> int:
+        return self.extra_per_column * feature_dim
+    
+    def derive(self, signals) -> Tuple[np.ndarray, ...]:
+        """(batch, window_size, feature_dim) blocks appended after the normalized window"""
+        return ()
+    
+    def transform(self, signals) -> np.ndarray:
+        normalized = signals.get('normalized')
+        blocks = self.derive(signals)
+        if not blocks:
+            return normalized
+        shape = normalized.shape
+        return np.concatenate(
+            [normalized] + [np.broadcast_to(b, shape) for b in blocks], axis=2)
+
+class LatencyFeatures(FeaturePipeline):
+    """Window p50/p95/p99 in window standard deviations from the mean"""
+    extra_per_column = 3
+    
+    def derive(self, signals):
+        mean, std = signals.get('mean'), signals.get('std')
+        p = signals.get('percentiles')
+        return tuple((p[:, k:k + 1] - mean) / std for k in range(3))
+
+class ThroughputFeatures(FeaturePipeline):
+    """Rate of change and its derivative, in window standard deviations"""
+    extra_per_column = 2
+    
+    def derive(self, signals):
+        std = signals.get('std')
+        return signals.get('diff') / std, signals.get('diff2') / std
+
+class ResourceFeatures(FeaturePipeline):
+    """Saturation: each sample as a fraction of the window's peak magnitude"""
+    extra_per_column = 1
+    
+    def derive(self, signals):
+        return (signals.windows / signals.get('peak'),)
+
+class ErrorRateFeatures(FeaturePipeline):
+    """Rate of change of the error metrics, in window standard deviations"""
+    extra_per_column = 1
+    
+    def derive(self, signals):
+        return (signals.get('diff') / signals.get('std'),)
+
+class SLOFeatures(FeaturePipeline):
+    """Burn rate: short-horizon mean (last tenth of the window) against the window mean
+    
+    For a non-negative SLI such as an error ratio this is burn rate - 1,
+    so a steady SLI gives 0 and 1 means the budget burns twice as fast as
+    over the window. The baseline is at least one standard deviation, which
+    keeps near-zero SLIs bounded.
+    """
+    extra_per_column = 1
+    
+    def derive(self, signals):
+        mean = signals.get('mean')
+        baseline = np.maximum(np.abs(mean), signals.get('std'))
+        return ((signals.get('trailing_mean') - mean) / baseline,)
+
+FEATURE_PIPELINES: Dict[AgentType, FeaturePipeline] = {
+    AgentType.LATENCY: LatencyFeatures(),
+    AgentType.THROUGHPUT: ThroughputFeatures(),
+    AgentType.RESOURCE: ResourceFeatures(),
+    AgentType.ERROR_RATE: ErrorRateFeatures(),
+    AgentType.SLO_COMPLIANCE: SLOFeatures(),
+}
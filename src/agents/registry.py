@@ -0,0 +1,35 @@
+"""
+ADAPT-MAD: Agent Registry
+Agent classes by AgentType, and AgentType lookup from config names
+"""
+
+from typing import Dict, Type, Union
+
+from .types import AgentType
+from .base_agent import DetectionAgent
+from .latency_agent import LatencyDetectionAgent
+from .throughput_agent import ThroughputMonitoringAgent
+from .resource_agent import ResourceUtilizationAgent
+from .error_rate_agent import ErrorRateAgent
+from .slo_agent import SLOComplianceAgent
+
+AGENT_CLASSES: Dict[AgentType, Type[DetectionAgent]] = {
+    AgentType.LATENCY: LatencyDetectionAgent,
+    AgentType.THROUGHPUT: ThroughputMonitoringAgent,
+    AgentType.RESOURCE: ResourceUtilizationAgent,
+    AgentType.ERROR_RATE: ErrorRateAgent,
+    AgentType.SLO_COMPLIANCE: SLOComplianceAgent,
+}
+
+def parse_agent_type(name: Union[str, AgentType]) -> AgentType:
+    """AgentType from a config name ('error_rate'), member name or value ('ERA')"""
+    if isinstance(name, AgentType):
+        return name
+    key = str(name).strip()
+    if key.upper() in AgentType.__members__:
+        return AgentType[key.upper()]
+    try:
+        return AgentType(key.upper())
+    except ValueError:
+        expected = ', '.join(t.name.lower() for t in AgentType)
+        raise ValueError(f"Unknown agent type {name!r}, expected one of {expected}") from None
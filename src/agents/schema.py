@@ -0,0 +1,93 @@
+"""
+ADAPT-MAD: Metric Schema
+Maps metric columns to the agent types that consume them
+"""
+
+import fnmatch
+import numpy as np
+from typing import Dict, List, Sequence
+
+from .types import AgentType
+
+class MetricSchema:
+    """Column layout grouping each agent type's metrics contiguously
+    
+    Columns are ordered group by group (in the order the groups are given),
+    so an agent's subset is one column range. Slicing a window in schema
+    order with view() returns a view without copying. Windows in any other
+    column order are brought into schema order once, with reorder(), before
+    being shared by the agents.
+    """
+    
+    def __init__(self, groups: Dict[AgentType, Sequence[str]]):
+        self.groups: Dict[AgentType, List[str]] = {}
+        self.columns: List[str] = []
+        self._slices: Dict[AgentType, slice] = {}
+        owner: Dict[str, AgentType] = {}
+        
+        for agent_type, columns in groups.items():
+            columns = list(columns)
+            if not columns:
+                raise ValueError(f"No columns for {agent_type.value}")
+            for column in columns:
+                if column in owner:
+                    raise ValueError(f"Column {column!r} is assigned to both "
+                                     f"{owner[column].value} and {agent_type.value}")
+                owner[column] = agent_type
+            start = len(self.columns)
+            self.columns.extend(columns)
+            self.groups[agent_type] = columns
+            self._slices[agent_type] = slice(start, len(self.columns))
+    
+    @classmethod
+    def from_patterns(cls, columns: Sequence[str],
+                      patterns: Dict[AgentType, Sequence[str]]) -> 'MetricSchema':
+        """Group columns by shell-style patterns (e.g. '*latency*', '*_p99')
+        
+        Each column goes to the first agent type with a matching pattern.
+        Columns that match no pattern are left out.
+        """
+        groups = {agent_type: [] for agent_type in patterns}
+        for column in columns:
+            for agent_type, globs in patterns.items():
+                if any(fnmatch.fnmatch(column, glob) for glob in globs):
+                    groups[agent_type].append(column)
+                    break
+        empty = [t.value for t, cols in groups.items() if not cols]
+        if empty:
+            raise ValueError(f"No columns match the patterns for {', '.join(empty)}")
+        return cls(groups)
+    
+    @property
+    def agent_types(self) -> List[AgentType]:
+        return list(self.groups)
+    
+    def __len__(self) -> int:
+        return len(self.columns)
+    
+    def __contains__(self, agent_type: AgentType) -> bool:
+        return agent_type in self._slices
+    
+    def slice(self, agent_type: AgentType) -> slice:
+        if agent_type not in self._slices:
+            raise KeyError(f"MetricSchema has no columns for {agent_type.value}")
+        return self._slices[agent_type]
+    
+    def feature_dim(self, agent_type: AgentType) -> int:
+        return len(self.groups[agent_type])
+    
+    def view(self, window: np.ndarray, agent_type: AgentType) -> np.ndarray:
+        """An agent's columns of schema-ordered (..., len(schema)) data, without copying"""
+        return window[..., self.slice(agent_type)]
+    
+    def permutation(self, source_columns: Sequence[str]) -> np.ndarray:
+        """Indices taking source_columns order to schema order"""
+        index = {column: i for i, column in enumerate(source_columns)}
+        missing = [c for c in self.columns if c not in index]
+        if missing:
+            raise KeyError(f"Columns missing from the source: {missing}")
+        return np.array([index[c] for c in self.columns])
+    
+    def reorder(self, data: np.ndarray, source_columns: Sequence[str]) -> np.ndarray:
+        """Copy (..., len(source_columns)) data into schema column order"""
+        return np.take(data, self.permutation(source_columns), axis=-1)
@@ -1,9 +1,6 @@
-"""${agent^} Agent"""
+"""SLO Compliance Agent"""
 from .base_agent import DetectionAgent, AgentType
 
-class ${agent^}Agent(DetectionAgent):
+class SLOComplianceAgent(DetectionAgent):
     def __init__(self, *args, **kwargs):
-        agent_type = AgentType.${agent^^}
-        if agent_type == AgentType.THROUGHPUT:
-            agent_type = AgentType.THROUGHPUT
-        super().__init__(agent_type, *args, **kwargs)
+        super().__init__(AgentType.SLO_COMPLIANCE, *args, **kwargs)
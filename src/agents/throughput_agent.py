@@ -1,9 +1,6 @@
-"""${agent^} Agent"""
+"""Throughput Monitoring Agent"""
 from .base_agent import DetectionAgent, AgentType
 
-class ${agent^}Agent(DetectionAgent):
+class ThroughputMonitoringAgent(DetectionAgent):
     def __init__(self, *args, **kwargs):
-        agent_type = AgentType.${agent^^}
-        if agent_type == AgentType.THROUGHPUT:
-            agent_type = AgentType.THROUGHPUT
-        super().__init__(agent_type, *args, **kwargs)
+        super().__init__(AgentType.THROUGHPUT, *args, **kwargs)
@@ -0,0 +1,31 @@
+"""
+ADAPT-MAD: Agent Types
+Agent identifiers and detection results, importable without torch
+"""
+
+import numpy as np
+from dataclasses import dataclass
+from enum import Enum
+
+class AgentType(Enum):
+    LATENCY = "LDA"
+    THROUGHPUT = "TMA"
+    RESOURCE = "RUA"
+    ERROR_RATE = "ERA"
+    SLO_COMPLIANCE = "SCA"
+
+@dataclass
+class DetectionResult:
+    __slots__ = ('score', 'is_anomaly', 'confidence', 'timestamp', 'agent_type')
+    
+    score: float
+    is_anomaly: bool
+    confidence: float
+    timestamp: float
+    agent_type: AgentType
+
+# detection_history record; the agent type is implied by the owning agent
+DETECTION_DTYPE = np.dtype([
+    ('score', np.float64), ('is_anomaly', np.bool_),
+    ('confidence', np.float64), ('timestamp', np.float64),
+])
@@ -1,6 +1,30 @@
-"""ADAPT-MAD Coordination Layer"""
-from .coordinator import AdaptiveCoordinator, CollaborationStrategy, SystemState
-from .fusion_engine import DecisionFusionEngine
+"""ADAPT-MAD Coordination Layer
+
+Coordination and fusion are torch-free; the execution engines that run
+agent models (SharedSignalEngine, DetectionRunner) load on first use.
+"""
+from ..utils.lazy import lazy_exports
 
 __all__ = ['AdaptiveCoordinator', 'CollaborationStrategy', 
-           'SystemState', 'DecisionFusionEngine']
+           'SystemState', 'DecisionFusionEngine', 'SharedSignalEngine',
+           'DetectionRunner', 'MultiServiceDetector', 'AsyncDetectionPipeline',
+           'PipelineConfig', 'Pipeline', 'build_pipeline',
+           'IncidentGrouper', 'Incident', 'IncidentEvent', 'PreScreen']
+
+__getattr__, __dir__ = lazy_exports(__name__, {
+    'AdaptiveCoordinator': '.coordinator',
+    'CollaborationStrategy': '.coordinator',
+    'SystemState': '.coordinator',
+    'DecisionFusionEngine': '.fusion_engine',
+    'SharedSignalEngine': '.shared_engine',
+    'DetectionRunner': '.runner',
+    'MultiServiceDetector': '.multi_service',
+    'AsyncDetectionPipeline': '.async_pipeline',
+    'PipelineConfig': '.factory',
+    'Pipeline': '.factory',
+    'build_pipeline': '.factory',
+    'IncidentGrouper': '.incidents',
+    'Incident': '.incidents',
+    'IncidentEvent': '.incidents',
+    'PreScreen': '.prescreen',
+})
@@ -1,13 +1,18 @@
 """
 ADAPT-MAD: Adaptive Coordination Layer
 """
+import asyncio
 import numpy as np
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from enum import Enum
 from collections import deque
 from dataclasses import dataclass
 import time
 
+from .fusion_engine import DecisionFusionEngine
+from ..utils.ring_buffer import RingBuffer
+from ..utils.clock import WallClock, observe_time
+
 class CollaborationStrategy(Enum):
     PEER_TO_PEER = "P2P"
     HIERARCHICAL = "HIER"
@@ -23,35 +28,61 @@ class SystemState:
     deployment_active: bool
     timestamp: float
 
+_STRATEGY_CODES = {s: i for i, s in enumerate(CollaborationStrategy)}
+
+# recent_detections record; strategy is an index into CollaborationStrategy
+DECISION_DTYPE = np.dtype([
+    ('timestamp', np.float64), ('is_anomaly', np.bool_),
+    ('confidence', np.float64), ('strategy', np.int8),
+])
+
 class AdaptiveCoordinator:
     """Tier 2: Adaptive Coordination Layer"""
     
     def __init__(self, agents: List, threshold_high_load: float = 4000.0,
                  threshold_low_load: float = 1000.0, threshold_fpr: float = 0.15,
-                 threshold_fnr: float = 0.10, hysteresis: int = 2):
+                 threshold_fnr: float = 0.10, hysteresis: int = 2,
+                 fixed_strategy: Optional[CollaborationStrategy] = None,
+                 clock: Optional[Callable[[], float]] = None,
+                 schema=None):
         self.agents = agents
+        # agents.MetricSchema routing each agent its own columns; None
+        # gives every agent the full window
+        self.schema = schema
+        # Seconds source for strategy timing, lenient-mode deadlines and
+        # result timestamps, shared with the agents. A SimulatedClock
+        # follows SystemState.timestamp.
+        self.clock = clock or WallClock()
+        for agent in agents:
+            agent.clock = self.clock
+        self.fusion_engine = DecisionFusionEngine(self.agents)
         self.T_high = threshold_high_load
         self.T_low = threshold_low_load
         self.T_FPR = threshold_fpr
         self.T_FNR = threshold_fnr
         self.hysteresis = hysteresis
         
-        self.current_strategy = CollaborationStrategy.HYBRID
+        # Pin one strategy (e.g. for per-strategy evaluation); adaptation still runs
+        self.fixed_strategy = fixed_strategy
+        self.current_strategy = fixed_strategy or CollaborationStrategy.HYBRID
         self.strategy_triggers = deque(maxlen=hysteresis)
-        self.recent_detections = deque(maxlen=1000)
-        self.workload_history = deque(maxlen=100)
+        self.recent_detections = RingBuffer(1000, DECISION_DTYPE)
+        self.workload_history = RingBuffer(100, np.float64)
         self.deployment_mode_until = 0
         self.lenient_mode_duration = 30 * 60
+        # monitoring.Instrumentation when instrumented
+        self.metrics = None
         
         self.strategy_stats = {
             CollaborationStrategy.PEER_TO_PEER: {'time': 0, 'detections': 0},
             CollaborationStrategy.HIERARCHICAL: {'time': 0, 'detections': 0},
             CollaborationStrategy.HYBRID: {'time': 0, 'detections': 0}
         }
-        self.strategy_start_time = time.time()
+        self.strategy_start_time = self.clock()
     
     def select_strategy(self, system_state: SystemState) -> CollaborationStrategy:
         """Algorithm 1 & 4: Strategy Selection"""
+        observe_time(self.clock, system_state.timestamp)
         workload = system_state.workload_intensity
         
         if workload > self.T_high:
@@ -68,38 +99,105 @@ class AdaptiveCoordinator:
         if system_state.deployment_active:
             self.enable_lenient_mode()
         
+        if self.fixed_strategy is not None:
+            return self.current_strategy
+        
         self.strategy_triggers.append(target_strategy)
         
         if len(self.strategy_triggers) == self.hysteresis:
             if all(s == target_strategy for s in self.strategy_triggers):
                 if self.current_strategy != target_strategy:
-                    elapsed = time.time() - self.strategy_start_time
+                    if self.metrics is not None:
+                        self.metrics.strategy_switches.labels(
+                            from_strategy=self.current_strategy.value,
+                            to_strategy=target_strategy.value
+                        ).inc()
+                    elapsed = self.clock() - self.strategy_start_time
                     self.strategy_stats[self.current_strategy]['time'] += elapsed
-                    self.strategy_start_time = time.time()
+                    self.strategy_start_time = self.clock()
                     self.current_strategy = target_strategy
         
         return self.current_strategy
     
+    def register_agent(self, agent):
+        """Add an agent at runtime, keeping the type index consistent"""
+        self.fusion_engine.register_agent(agent)
+        agent.clock = self.clock
+        if self.metrics is not None:
+            self.metrics.instrument_agent(agent)
+    
+    def unregister_agent(self, agent_type):
+        """Remove the agent of the given type at runtime"""
+        agent = self.fusion_engine.unregister_agent(agent_type)
+        if agent is not None and self.metrics is not None:
+            self.metrics.uninstrument_agent(agent)
+        return agent
+    
     def enable_lenient_mode(self):
         """Enable lenient thresholds during deployments"""
-        self.deployment_mode_until = time.time() + self.lenient_mode_duration
+        self.deployment_mode_until = self.clock() + self.lenient_mode_duration
+        if self.metrics is not None:
+            self.metrics.lenient_activations.inc()
         for agent in self.agents:
             agent.alpha = min(agent.alpha * 1.3, 2.0)
     
     def is_lenient_mode(self) -> bool:
-        return time.time() < self.deployment_mode_until
+        return self.clock() < self.deployment_mode_until
     
     def coordinate_detection(self, detection_results: List, 
                            system_state: SystemState) -> Tuple[bool, float, Dict]:
         """Coordinate detection results"""
         strategy = self.select_strategy(system_state)
+        self.workload_history.append(system_state.workload_intensity)
+        start = time.perf_counter() if self.metrics is not None else 0.0
         
         if strategy == CollaborationStrategy.PEER_TO_PEER:
-            return self._peer_to_peer_coordination(detection_results, system_state)
+            decision = self._peer_to_peer_coordination(detection_results, system_state)
         elif strategy == CollaborationStrategy.HIERARCHICAL:
-            return self._hierarchical_coordination(detection_results, system_state)
+            decision = self._hierarchical_coordination(detection_results, system_state)
         else:
-            return self._hybrid_coordination(detection_results, system_state)
+            decision = self._hybrid_coordination(detection_results, system_state)
+        
+        if self.metrics is not None:
+            self.metrics.fusion_timer(strategy.value).observe(time.perf_counter() - start)
+        self.strategy_stats[strategy]['detections'] += 1
+        is_anomaly, confidence, _ = decision
+        self.recent_detections.append(
+            (system_state.timestamp, is_anomaly, confidence, _STRATEGY_CODES[strategy])
+        )
+        return decision
+    
+    def agent_windows(self, window: np.ndarray) -> List[np.ndarray]:
+        """Each agent's input: a zero-copy column view of a schema-ordered window"""
+        if self.schema is None:
+            return [window] * len(self.agents)
+        return [self.schema.view(window, agent.agent_type) for agent in self.agents]
+    
+    def agent_signals(self, signals) -> List:
+        """Each agent's view of a shared agents.WindowSignals (one cache per tick)"""
+        if self.schema is None:
+            return [signals] * len(self.agents)
+        return [signals.columns(self.schema.slice(agent.agent_type)) for agent in self.agents]
+    
+    def detect(self, window: np.ndarray) -> List:
+        """All agents' detections for one window, in agent order"""
+        return [agent.detect(w) for agent, w in zip(self.agents, self.agent_windows(window))]
+    
+    async def adetect(self, window: np.ndarray, executor=None) -> List:
+        """All agents' detections for one window, run concurrently on executor"""
+        return list(await asyncio.gather(
+            *(agent.adetect(w, executor=executor)
+              for agent, w in zip(self.agents, self.agent_windows(window)))
+        ))
+    
+    async def acoordinate_detection(self, detection_results: List,
+                                    system_state: SystemState) -> Tuple[bool, float, Dict]:
+        """coordinate_detection for async callers
+        
+        Fusion is a few microseconds of numpy, so it runs inline on the
+        event loop rather than paying an executor round trip.
+        """
+        return self.coordinate_detection(detection_results, system_state)
     
     def _peer_to_peer_coordination(self, results, state):
         anomaly_votes = sum(1 for r in results if r.is_anomaly)
@@ -109,38 +207,36 @@ class AdaptiveCoordinator:
         return is_anomaly, avg_confidence, metadata
     
     def _hierarchical_coordination(self, results, state):
-        sorted_results = sorted(results, 
-            key=lambda r: self._get_agent_by_type(r.agent_type).weight, reverse=True)
-        leader_result = sorted_results[0]
+        leader_result = max(results, 
+            key=lambda r: self._get_agent_by_type(r.agent_type).weight)
         metadata = {'strategy': 'HIERARCHICAL', 
                    'leader': leader_result.agent_type.value}
         return leader_result.is_anomaly, leader_result.confidence, metadata
     
     def _hybrid_coordination(self, results, state):
-        from .fusion_engine import DecisionFusionEngine
-        fusion = DecisionFusionEngine(self.agents)
-        is_anomaly, score = fusion.fuse_decisions(results, state)
+        is_anomaly, score = self.fusion_engine.fuse_decisions(results, state)
         metadata = {'strategy': 'HYBRID', 'fusion_score': score}
         return is_anomaly, score, metadata
     
     def _get_agent_by_type(self, agent_type):
-        for agent in self.agents:
-            if agent.agent_type == agent_type:
-                return agent
-        return None
+        return self.fusion_engine.get_agent(agent_type)
+    
+    def strategy_times(self) -> Dict[CollaborationStrategy, float]:
+        """Seconds spent in each strategy so far, including the current one"""
+        times = {k: v['time'] for k, v in self.strategy_stats.items()}
+        times[self.current_strategy] += self.clock() - self.strategy_start_time
+        return times
     
     def get_statistics(self) -> Dict:
-        elapsed = time.time() - self.strategy_start_time
-        self.strategy_stats[self.current_strategy]['time'] += elapsed
-        self.strategy_start_time = time.time()
-        
-        total_time = sum(s['time'] for s in self.strategy_stats.values())
+        """Strategy time shares so far; read-only, safe to call at any rate"""
+        times = self.strategy_times()
+        total_time = sum(times.values())
         
         return {
             'current_strategy': self.current_strategy.value,
             'strategy_distribution': {
                 k.value: {
-                    'time_percent': (v['time'] / total_time * 100) if total_time > 0 else 0,
+                    'time_percent': (times[k] / total_time * 100) if total_time > 0 else 0,
                     'detections': v['detections']
                 }
                 for k, v in self.strategy_stats.items()
@@ -0,0 +1,371 @@
+"""
+ADAPT-MAD: Pipeline Factory
+Builds agents, the coordinator and the execution engine from configs/*.yaml
+"""
+
+import importlib.util
+import inspect
+import yaml
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from .coordinator import AdaptiveCoordinator, CollaborationStrategy
+
+ENGINES = ('shared', 'runner')
+DEFAULT_AGENTS = ('latency', 'throughput', 'resource', 'error_rate')
+
+@dataclass
+class AgentSpec:
+    type: str
+    # Column names or shell patterns this agent reads; None reads every column
+    columns: Optional[List[str]] = None
+
+@dataclass
+class ExecutionConfig:
+    device: str = 'cpu'
+    # torch intra-op threads for this process; 0 keeps torch's default
+    num_threads: int = 0
+    # Windows per forward pass in Pipeline.detect_batch
+    batch_size: int = 256
+    backend: str = 'eager'
+    compact: bool = False
+    # Compact agents drop their float weights (no training or checkpoint saving)
+    serving_only: bool = False
+    engine: str = 'shared'
+    # DetectionRunner settings (engine: runner)
+    executor: str = 'thread'
+    max_workers: Optional[int] = None
+    deadline: Optional[float] = None
+
+@dataclass
+class PipelineConfig:
+    """Validated settings for build_pipeline
+    
+    Construction validates every field at once and raises a single
+    ValueError listing all problems, so a bad config fails before any
+    model is built.
+    """
+    window_size: int = 50
+    feature_dim: Optional[int] = None
+    hidden_dim: int = 64
+    num_layers: int = 2
+    dropout: float = 0.2
+    checkpoint_dir: Optional[str] = None
+    agents: List[AgentSpec] = field(
+        default_factory=lambda: [AgentSpec(t) for t in DEFAULT_AGENTS])
+    coordination: Dict = field(default_factory=dict)
+    execution: ExecutionConfig = field(default_factory=ExecutionConfig)
+    
+    def __post_init__(self):
+        errors = self.validate()
+        if errors:
+            raise _invalid(errors)
+    
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'PipelineConfig':
+        """Build from a parsed configs/*.yaml
+        
+        Reads dataset.window_size and features_per_service, the model
+        section (model.checkpoint_dir: trained weights to load, null for
+        untrained agents), coordination (AdaptiveCoordinator arguments),
+        agents (entries with type, enabled and columns) and execution
+        (ExecutionConfig fields). training.checkpoint_dir is where training
+        writes and is not read here.
+        """
+        errors = []
+        dataset = config.get('dataset') or {}
+        model = config.get('model') or {}
+        values = {key: model[key] for key in ('hidden_dim', 'num_layers', 'dropout',
+                                              'checkpoint_dir') if key in model}
+        if 'window_size' in dataset:
+            values['window_size'] = dataset['window_size']
+        if 'features_per_service' in dataset:
+            values['feature_dim'] = dataset['features_per_service']
+        
+        if config.get('agents') is not None:
+            values['agents'] = []
+            for i, entry in enumerate(config['agents']):
+                if isinstance(entry, str):
+                    entry = {'type': entry}
+                unknown = set(entry) - {'type', 'enabled', 'columns'}
+                if unknown or 'type' not in entry:
+                    errors.append(f"agents[{i}]: expected keys type, enabled, columns; "
+                                  f"got {sorted(entry)}")
+                    continue
+                if entry.get('enabled', True):
+                    values['agents'].append(AgentSpec(entry['type'], entry.get('columns')))
+        
+        if 'coordination' in config:
+            values['coordination'] = dict(config['coordination'] or {})
+        
+        execution = dict(config.get('execution') or {})
+        known = {f.name for f in fields(ExecutionConfig)}
+        for key in sorted(set(execution) - known):
+            errors.append(f"execution.{key}: unknown setting, expected one of {sorted(known)}")
+            del execution[key]
+        values['execution'] = ExecutionConfig(**execution)
+        
+        try:
+            pipeline_config = cls(**values)
+        except ValueError as e:
+            errors.extend(getattr(e, 'errors', [str(e)]))
+        if errors:
+            raise _invalid(errors)
+        return pipeline_config
+    
+    @classmethod
+    def from_yaml(cls, *paths: str) -> 'PipelineConfig':
+        """Load and merge config files; later files override earlier ones
+        
+        Sections merge key by key and agents merge by type, e.g.
+        from_yaml('configs/default.yaml', 'configs/train_ticket.yaml') runs
+        the default agents plus the SLO compliance agent.
+        """
+        merged: Dict = {}
+        for path in paths:
+            with open(path) as f:
+                _merge(merged, yaml.safe_load(f) or {})
+        return cls.from_dict(merged)
+    
+    def validate(self) -> List[str]:
+        """Every problem with this config, as readable messages"""
+        from ..agents import parse_agent_type
+        from ..agents.backends import BACKENDS
+        
+        errors = []
+        for name in ('window_size', 'hidden_dim', 'num_layers'):
+            if not _positive_int(getattr(self, name)):
+                errors.append(f"{name} must be a positive integer, got {getattr(self, name)!r}")
+        if self.feature_dim is not None and not _positive_int(self.feature_dim):
+            errors.append(f"feature_dim must be a positive integer, got {self.feature_dim!r}")
+        if not (isinstance(self.dropout, (int, float)) and 0 <= self.dropout < 1):
+            errors.append(f"dropout must be in [0, 1), got {self.dropout!r}")
+        errors.extend(checkpoint_dir_errors(self.checkpoint_dir))
+        
+        if not self.agents:
+            errors.append("at least one agent must be enabled")
+        seen = set()
+        for spec in self.agents:
+            try:
+                agent_type = parse_agent_type(spec.type)
+            except ValueError as e:
+                errors.append(str(e))
+                continue
+            if agent_type in seen:
+                errors.append(f"agent type {spec.type!r} is listed twice")
+            seen.add(agent_type)
+            if spec.columns is not None and not (
+                    isinstance(spec.columns, list) and spec.columns
+                    and all(isinstance(c, str) for c in spec.columns)):
+                errors.append(f"agent {spec.type!r}: columns must be a non-empty list of strings")
+        with_columns = [spec.columns is not None for spec in self.agents]
+        if any(with_columns) and not all(with_columns):
+            errors.append("either every enabled agent lists columns or none does")
+        
+        errors.extend(_coordination_errors(self.coordination))
+        
+        execution = self.execution
+        if execution.backend not in BACKENDS:
+            errors.append(f"execution.backend must be one of {sorted(BACKENDS)}, "
+                          f"got {execution.backend!r}")
+        elif (execution.backend == 'onnxruntime'
+              and importlib.util.find_spec('onnxruntime') is None):
+            errors.append("execution.backend 'onnxruntime' needs onnxruntime "
+                          "(pip install adapt-mad[onnx])")
+        if execution.device != 'cpu' and not str(execution.device).startswith('cuda'):
+            errors.append(f"execution.device must be 'cpu' or 'cuda[:N]', got {execution.device!r}")
+        elif str(execution.device).startswith('cuda'):
+            import torch
+            if not torch.cuda.is_available():
+                errors.append(f"execution.device is {execution.device!r} but CUDA is not available")
+        if not (isinstance(execution.num_threads, int) and execution.num_threads >= 0):
+            errors.append(f"execution.num_threads must be an integer >= 0, "
+                          f"got {execution.num_threads!r}")
+        if not _positive_int(execution.batch_size):
+            errors.append(f"execution.batch_size must be a positive integer, "
+                          f"got {execution.batch_size!r}")
+        if execution.serving_only and not (execution.compact or execution.backend == 'quantized'):
+            errors.append("execution.serving_only needs compact: true or the quantized backend")
+        if execution.engine not in ENGINES:
+            errors.append(f"execution.engine must be one of {list(ENGINES)}, "
+                          f"got {execution.engine!r}")
+        if execution.executor not in ('thread', 'process'):
+            errors.append(f"execution.executor must be 'thread' or 'process', "
+                          f"got {execution.executor!r}")
+        if execution.max_workers is not None and not _positive_int(execution.max_workers):
+            errors.append(f"execution.max_workers must be a positive integer, "
+                          f"got {execution.max_workers!r}")
+        if execution.deadline is not None and not (
+                isinstance(execution.deadline, (int, float)) and execution.deadline > 0):
+            errors.append(f"execution.deadline must be a positive number of seconds, "
+                          f"got {execution.deadline!r}")
+        return errors
+
+def _invalid(errors: List[str]) -> ValueError:
+    error = ValueError("Invalid pipeline config:\n  - " + "\n  - ".join(errors))
+    error.errors = errors
+    return error
+
+def checkpoint_dir_errors(checkpoint_dir: Optional[str]) -> List[str]:
+    """A configured checkpoint directory must exist; None means untrained agents"""
+    if checkpoint_dir is None or Path(checkpoint_dir).is_dir():
+        return []
+    return [f"checkpoint_dir {checkpoint_dir!r} is not a directory "
+            "(train the agents first, or leave it unset for untrained agents)"]
+
+def _positive_int(value) -> bool:
+    return isinstance(value, int) and not isinstance(value, bool) and value > 0
+
+def _coordination_errors(coordination: Dict) -> List[str]:
+    errors = []
+    known = set(inspect.signature(AdaptiveCoordinator).parameters) - {'agents', 'clock', 'schema'}
+    for key in sorted(set(coordination) - known):
+        errors.append(f"coordination.{key}: unknown setting, expected one of {sorted(known)}")
+    
+    numbers = {}
+    for key in ('threshold_high_load', 'threshold_low_load', 'threshold_fpr', 'threshold_fnr'):
+        if key in coordination:
+            value = coordination[key]
+            if isinstance(value, (int, float)) and not isinstance(value, bool):
+                numbers[key] = value
+            else:
+                errors.append(f"coordination.{key} must be a number, got {value!r}")
+    high = numbers.get('threshold_high_load', 4000.0)
+    low = numbers.get('threshold_low_load', 1000.0)
+    if low >= high:
+        errors.append(f"coordination.threshold_low_load ({low}) must be below "
+                      f"threshold_high_load ({high})")
+    for key in ('threshold_fpr', 'threshold_fnr'):
+        if key in numbers and not 0 <= numbers[key] <= 1:
+            errors.append(f"coordination.{key} must be in [0, 1], got {numbers[key]}")
+    if 'hysteresis' in coordination and not _positive_int(coordination['hysteresis']):
+        errors.append(f"coordination.hysteresis must be a positive integer, "
+                      f"got {coordination['hysteresis']!r}")
+    strategy = coordination.get('fixed_strategy')
+    if strategy is not None and not isinstance(strategy, CollaborationStrategy):
+        values = [s.value for s in CollaborationStrategy]
+        if strategy not in values:
+            errors.append(f"coordination.fixed_strategy must be one of {values}, got {strategy!r}")
+    return errors
+
+def _merge(base: Dict, override: Dict):
+    for key, value in override.items():
+        if isinstance(value, dict) and isinstance(base.get(key), dict):
+            _merge(base[key], value)
+        elif key == 'agents' and isinstance(value, list) and isinstance(base.get(key), list):
+            # Agent entries merge by type, so a dataset file can enable or
+            # disable single agents on top of the defaults
+            merged = {_agent_key(entry): entry for entry in base[key]}
+            for entry in value:
+                previous = merged.get(_agent_key(entry))
+                if isinstance(previous, dict) and isinstance(entry, dict):
+                    entry = {**previous, **entry}
+                merged[_agent_key(entry)] = entry
+            base[key] = list(merged.values())
+        else:
+            base[key] = value
+
+def _agent_key(entry) -> str:
+    return entry.get('type') if isinstance(entry, dict) else entry
+
+class Pipeline:
+    """Agents, coordinator and execution engine built from one PipelineConfig
+    
+    With a schema (agents configured with columns), windows must be in
+    schema.columns order; use schema.reorder once per window otherwise.
+    """
+    
+    def __init__(self, config: PipelineConfig, agents: List,
+                 coordinator: AdaptiveCoordinator, engine, schema=None):
+        self.config = config
+        self.agents = agents
+        self.coordinator = coordinator
+        self.engine = engine
+        self.schema = schema
+    
+    def detect(self, window):
+        """Agent results for one window (agents that missed a runner deadline are absent)"""
+        if self.config.execution.engine == 'runner':
+            return self.engine.run(window)[0]
+        return self.engine.detect(window)
+    
+    def detect_batch(self, windows) -> List[List]:
+        """Per-window agent results, execution.batch_size windows per forward pass"""
+        if self.config.execution.engine == 'runner':
+            return [self.detect(window) for window in windows]
+        size = self.config.execution.batch_size
+        results = []
+        for start in range(0, len(windows), size):
+            results.extend(self.engine.detect_batch(windows[start:start + size]))
+        return results
+    
+    def process(self, window, system_state) -> Tuple[bool, float, Dict]:
+        """Detect and coordinate one window"""
+        if self.config.execution.engine == 'runner':
+            return self.engine.run_and_coordinate(window, system_state)
+        return self.coordinator.coordinate_detection(self.engine.detect(window), system_state)
+    
+    def close(self):
+        if self.config.execution.engine == 'runner':
+            self.engine.close()
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+
+def build_pipeline(config: PipelineConfig, feature_dim: Optional[int] = None,
+                   feature_names: Optional[Sequence[str]] = None) -> Pipeline:
+    """Agents, AdaptiveCoordinator and execution engine for a validated config
+    
+    feature_dim overrides config.feature_dim. feature_names (the column
+    order of incoming windows) is required when agents list columns; each
+    agent is then sized to its own columns.
+    """
+    from ..agents import AGENT_CLASSES, MetricSchema, parse_agent_type
+    
+    execution = config.execution
+    if execution.num_threads:
+        import torch
+        torch.set_num_threads(execution.num_threads)
+    
+    agent_types = [parse_agent_type(spec.type) for spec in config.agents]
+    schema = None
+    if config.agents[0].columns is not None:
+        if feature_names is None:
+            raise ValueError("feature_names is required when agents list columns")
+        schema = MetricSchema.from_patterns(feature_names, {
+            agent_type: spec.columns for agent_type, spec in zip(agent_types, config.agents)
+        })
+    else:
+        feature_dim = feature_dim or config.feature_dim or (
+            len(feature_names) if feature_names is not None else None)
+        if feature_dim is None:
+            raise ValueError("feature_dim is not configured (dataset.features_per_service)")
+    
+    agents = [
+        AGENT_CLASSES[agent_type](
+            feature_dim=feature_dim if schema is None else schema.feature_dim(agent_type),
+            window_size=config.window_size, hidden_dim=config.hidden_dim,
+            num_layers=config.num_layers, dropout=config.dropout,
+            device=execution.device, checkpoint=config.checkpoint_dir,
+            backend=execution.backend, compact=execution.compact,
+            serving_only=execution.serving_only)
+        for agent_type in agent_types
+    ]
+    
+    coordination = dict(config.coordination)
+    if isinstance(coordination.get('fixed_strategy'), str):
+        coordination['fixed_strategy'] = CollaborationStrategy(coordination['fixed_strategy'])
+    coordinator = AdaptiveCoordinator(agents, schema=schema, **coordination)
+    
+    if execution.engine == 'runner':
+        from .runner import DetectionRunner
+        engine = DetectionRunner(coordinator, max_workers=execution.max_workers,
+                                 executor=execution.executor, deadline=execution.deadline)
+    else:
+        from .shared_engine import SharedSignalEngine
+        engine = SharedSignalEngine(coordinator)
+    return Pipeline(config, agents, coordinator, engine, schema)
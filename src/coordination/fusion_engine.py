@@ -1,6 +1,6 @@
 """Decision Fusion Engine"""
 import numpy as np
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 class DecisionFusionEngine:
     """Tier 3: Decision Fusion Engine"""
@@ -9,21 +9,47 @@ class DecisionFusionEngine:
         self.agents = agents
         self.base_threshold = 0.6
         self.epsilon = 1e-8
+        self._index: Dict = {}
+        self.reindex()
+    
+    def reindex(self):
+        """Rebuild the AgentType -> agent index from the agent list"""
+        self._index = {}
+        for agent in self.agents:
+            self._index.setdefault(agent.agent_type, agent)
+    
+    def register_agent(self, agent):
+        """Add an agent at runtime"""
+        self.agents.append(agent)
+        self._index.setdefault(agent.agent_type, agent)
+    
+    def unregister_agent(self, agent_type) -> Optional[object]:
+        """Remove the agent indexed for agent_type, returning it"""
+        agent = self._index.get(agent_type)
+        if agent is None:
+            return None
+        self.agents.remove(agent)
+        self.reindex()
+        return agent
+    
+    def get_agent(self, agent_type):
+        return self._index.get(agent_type)
     
     def fuse_decisions(self, detection_results: List, 
                       system_state) -> Tuple[bool, float]:
         """Algorithm 5: Adaptive Weighted Voting"""
-        S = 0.0
-        W = 0.0
-        
-        for result in detection_results:
-            agent = self._get_agent_by_type(result.agent_type)
-            if agent:
-                weight = agent.weight
-                score = result.score if result.is_anomaly else 0.0
-                S += weight * score
-                W += weight
+        n = len(detection_results)
+        agents = [self._index.get(r.agent_type) for r in detection_results]
+        weights = np.fromiter(
+            (a.weight if a is not None else 0.0 for a in agents), dtype=float, count=n
+        )
+        scores = np.fromiter(
+            (r.score if r.is_anomaly else 0.0 for r in detection_results),
+            dtype=float, count=n
+        )
         
+        S = float(weights @ scores)
+        W = float(weights.sum())
         fusion_score = S / max(W, self.epsilon)
         
         delta_fpr = max(0, system_state.recent_fpr - 0.1)
@@ -31,9 +57,3 @@ class DecisionFusionEngine:
         
         is_anomaly = fusion_score > adaptive_threshold
         return is_anomaly, fusion_score
-    
-    def _get_agent_by_type(self, agent_type):
-        for agent in self.agents:
-            if agent.agent_type == agent_type:
-                return agent
-        return None
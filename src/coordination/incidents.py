@@ -0,0 +1,184 @@
+"""
+ADAPT-MAD: Incident Grouping
+Post-fusion stage collapsing positive decisions into incidents with
+open/update/close events
+"""
+
+import heapq
+import numpy as np
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Sequence, Set
+
+@dataclass
+class Incident:
+    incident_id: int
+    services: Set[str]
+    start: float
+    last_seen: float
+    detections: int = 1
+    peak_confidence: float = 0.0
+    # Time of the last emitted open/update event
+    last_event: float = 0.0
+    
+    @property
+    def duration(self) -> float:
+        return self.last_seen - self.start
+
+@dataclass
+class IncidentEvent:
+    kind: str                   # 'open', 'update' or 'close'
+    incident: Incident
+    timestamp: float
+    # For close: 'resolved', 'merged' (into merged_into), 'evicted' or 'flushed'
+    reason: Optional[str] = None
+    merged_into: Optional[int] = None
+
+class IncidentGrouper:
+    """Merges consecutive and related positive decisions into incidents
+    
+    A positive decision joins an open incident of the same service, or of
+    a service adjacent to it in topology, if that incident saw a positive
+    within the last time_window seconds. An incident closes once it has
+    been quiet for time_window. Related incidents that a decision bridges
+    are merged into the oldest one.
+    
+    Open incidents form an interval index: one expiry heap entry
+    (last_seen + time_window) per incident plus a service -> incidents
+    map. Closed incidents are not kept, and at most max_open incidents are
+    open (the stalest is evicted), so memory is bounded whatever the
+    alert volume. Updates are emitted when services join or at most every
+    update_interval seconds, not for every positive tick.
+    
+    Time is taken from the observed timestamps and never moves backwards,
+    so replayed traces group in trace time.
+    """
+    
+    def __init__(self, time_window: float = 300.0,
+                 topology: Optional[Dict[str, Iterable[str]]] = None,
+                 update_interval: float = 60.0, max_open: int = 1024):
+        self.time_window = time_window
+        self.update_interval = update_interval
+        self.max_open = max_open
+        # Undirected adjacency
+        self.neighbors: Dict[str, Set[str]] = {}
+        for service, adjacent in (topology or {}).items():
+            for other in adjacent:
+                self.neighbors.setdefault(service, set()).add(other)
+                self.neighbors.setdefault(other, set()).add(service)
+        
+        self.open: Dict[int, Incident] = {}
+        self._by_service: Dict[str, Set[int]] = {}
+        self._expiry: List = []
+        self._next_id = 1
+        self.now = float('-inf')
+        self.positives = 0
+        self.events = {'open': 0, 'update': 0, 'close': 0}
+    
+    def observe(self, service: str, timestamp: float, is_anomaly: bool,
+                confidence: float = 1.0) -> List[IncidentEvent]:
+        """Feed one fused decision; returns the events it caused"""
+        events = self._advance(timestamp)
+        if is_anomaly:
+            events.extend(self._positive(service, float(confidence)))
+        return self._count(events)
+    
+    def observe_tick(self, services: Sequence[str], timestamps: Sequence[float],
+                     is_anomaly: Sequence[bool],
+                     confidence: Optional[Sequence[float]] = None) -> List[IncidentEvent]:
+        """Feed one MultiServiceDetector tick (arrays in service order)"""
+        events = self._advance(float(np.max(timestamps)) if len(timestamps) else self.now)
+        if confidence is None:
+            confidence = np.ones(len(services))
+        for k in np.flatnonzero(is_anomaly):
+            events.extend(self._positive(services[k], float(confidence[k])))
+        return self._count(events)
+    
+    def flush(self) -> List[IncidentEvent]:
+        """Close every open incident (e.g. at the end of a replay)"""
+        events = [self._close(incident_id, 'flushed') for incident_id in list(self.open)]
+        self._expiry.clear()
+        return self._count(events)
+    
+    @property
+    def reduction(self) -> float:
+        """Positive decisions per emitted event"""
+        emitted = sum(self.events.values())
+        return self.positives / emitted if emitted else 0.0
+    
+    def _count(self, events: List[IncidentEvent]) -> List[IncidentEvent]:
+        for event in events:
+            self.events[event.kind] += 1
+        return events
+    
+    def _advance(self, timestamp: float) -> List[IncidentEvent]:
+        """Move time forward and close incidents quiet for time_window"""
+        self.now = max(self.now, timestamp)
+        events = []
+        while self._expiry and self._expiry[0][0] < self.now:
+            _, incident_id = heapq.heappop(self._expiry)
+            incident = self.open.get(incident_id)
+            if incident is None:
+                continue
+            expires = incident.last_seen + self.time_window
+            if expires < self.now:
+                events.append(self._close(incident_id, 'resolved'))
+            else:
+                # Extended since this entry was pushed
+                heapq.heappush(self._expiry, (expires, incident_id))
+        return events
+    
+    def _positive(self, service: str, confidence: float) -> List[IncidentEvent]:
+        self.positives += 1
+        related = set(self._by_service.get(service, ()))
+        for neighbor in self.neighbors.get(service, ()):
+            related.update(self._by_service.get(neighbor, ()))
+        
+        if not related:
+            events = self._evict() if len(self.open) >= self.max_open else []
+            incident = Incident(self._next_id, {service}, self.now, self.now,
+                                peak_confidence=confidence, last_event=self.now)
+            self._next_id += 1
+            self.open[incident.incident_id] = incident
+            self._by_service.setdefault(service, set()).add(incident.incident_id)
+            heapq.heappush(self._expiry, (self.now + self.time_window, incident.incident_id))
+            events.append(IncidentEvent('open', incident, self.now))
+            return events
+        
+        events = []
+        keep_id = min(related)
+        incident = self.open[keep_id]
+        changed = service not in incident.services
+        for other_id in sorted(related - {keep_id}):
+            other = self.open[other_id]
+            incident.services |= other.services
+            incident.start = min(incident.start, other.start)
+            incident.detections += other.detections
+            incident.peak_confidence = max(incident.peak_confidence, other.peak_confidence)
+            events.append(self._close(other_id, 'merged', merged_into=keep_id))
+            changed = True
+        
+        incident.services.add(service)
+        for member in incident.services:
+            self._by_service.setdefault(member, set()).add(keep_id)
+        incident.last_seen = self.now
+        incident.detections += 1
+        incident.peak_confidence = max(incident.peak_confidence, confidence)
+        if changed or self.now - incident.last_event >= self.update_interval:
+            incident.last_event = self.now
+            events.append(IncidentEvent('update', incident, self.now))
+        return events
+    
+    def _evict(self) -> List[IncidentEvent]:
+        stalest = min(self.open.values(), key=lambda incident: incident.last_seen)
+        return [self._close(stalest.incident_id, 'evicted')]
+    
+    def _close(self, incident_id: int, reason: str,
+               merged_into: Optional[int] = None) -> IncidentEvent:
+        incident = self.open.pop(incident_id)
+        for service in incident.services:
+            ids = self._by_service.get(service)
+            if ids is not None:
+                ids.discard(incident_id)
+                if not ids:
+                    del self._by_service[service]
+        return IncidentEvent('close', incident, self.now, reason, merged_into)
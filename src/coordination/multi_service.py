@@ -0,0 +1,348 @@
+"""
+ADAPT-MAD: Multi-Service Coordination
+One process running detection and coordination for many services
+"""
+
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .coordinator import CollaborationStrategy, SystemState
+from ..agents.features import WindowSignals
+from ..utils.clock import WallClock, observe_time
+
+_STRATEGIES = [
+    CollaborationStrategy.PEER_TO_PEER,
+    CollaborationStrategy.HIERARCHICAL,
+    CollaborationStrategy.HYBRID,
+]
+_P2P, _HIER, _HYBRID = range(3)
+
+class _ColumnarWindow:
+    """Per-cell bounded windows of 0/1 outcomes with O(1) running sums"""
+    
+    def __init__(self, shape: Tuple[int, ...], maxlen: int = 100):
+        self.maxlen = maxlen
+        self.values = np.zeros(shape + (maxlen,), dtype=np.int8)
+        self.pos = np.zeros(shape, dtype=np.int64)
+        self.count = np.zeros(shape, dtype=np.int64)
+        self.total = np.zeros(shape, dtype=np.int64)
+    
+    def append(self, values: np.ndarray, mask: np.ndarray):
+        """Append values[mask] to the windows of the masked cells"""
+        cells = np.nonzero(mask)
+        if len(cells[0]) == 0:
+            return
+        pos = self.pos[cells]
+        slots = cells + (pos,)
+        self.total[cells] += values[cells].astype(np.int64) - self.values[slots]
+        self.values[slots] = values[cells]
+        self.pos[cells] = (pos + 1) % self.maxlen
+        self.count[cells] = np.minimum(self.count[cells] + 1, self.maxlen)
+    
+    def mean(self) -> np.ndarray:
+        return self.total / np.maximum(self.count, 1)
+    
+    def grow(self, rows: int):
+        """Append empty rows along the first (service) axis"""
+        for name in ('values', 'pos', 'count', 'total'):
+            arr = getattr(self, name)
+            pad = np.zeros((rows,) + arr.shape[1:], dtype=arr.dtype)
+            setattr(self, name, np.concatenate([arr, pad]))
+    
+    def keep(self, mask: np.ndarray):
+        """Drop the rows (services) where mask is False"""
+        for name in ('values', 'pos', 'count', 'total'):
+            setattr(self, name, getattr(self, name)[mask])
+
+class MultiServiceDetector:
+    """Detection and coordination for many services in one process
+    
+    Holds one agent per AgentType whose model (and feature extraction) is
+    shared by every service. Per-service adaptive state - alpha, weight,
+    recent FPR/FNR windows, strategy, hysteresis and lenient-mode deadlines -
+    lives in (services, agents) arrays, and each tick runs every agent once
+    over the stacked windows of all services. The agents' own alpha/weight
+    and detection_history are not used.
+    """
+    
+    def __init__(self, agents: List, services: Sequence[str],
+                 threshold_high_load: float = 4000.0,
+                 threshold_low_load: float = 1000.0, threshold_fpr: float = 0.15,
+                 threshold_fnr: float = 0.10, hysteresis: int = 2,
+                 clock: Optional[Callable[[], float]] = None,
+                 schema=None, prescreen=None):
+        agent_types = [agent.agent_type for agent in agents]
+        if len(set(agent_types)) != len(agent_types):
+            raise ValueError("MultiServiceDetector needs at most one agent per AgentType")
+        
+        self.agents = agents
+        self.agent_types = agent_types
+        # agents.MetricSchema: agent k scores only its own columns
+        self.schema = schema
+        # PreScreen: quiet services skip model inference
+        self.prescreen = prescreen
+        # Shared by all services; a SimulatedClock follows the latest state timestamp
+        self.clock = clock or WallClock()
+        self.T_high = threshold_high_load
+        self.T_low = threshold_low_load
+        self.T_FPR = threshold_fpr
+        self.T_FNR = threshold_fnr
+        self.hysteresis = hysteresis
+        self.lenient_mode_duration = 30 * 60
+        self.base_threshold = 0.6
+        self.epsilon = 1e-8
+        
+        self.services: List[str] = []
+        self._service_index: Dict[str, int] = {}
+        
+        A = len(agents)
+        self.alpha = np.ones((0, A))
+        self.weight = np.ones((0, A))
+        self.recent_fpr = _ColumnarWindow((0, A))
+        self.recent_fnr = _ColumnarWindow((0, A))
+        self.current_strategy = np.zeros(0, dtype=np.int8)
+        self._last_target = np.zeros(0, dtype=np.int8)
+        self._target_run = np.zeros(0, dtype=np.int64)
+        self.deployment_mode_until = np.zeros(0)
+        self.strategy_time = np.zeros((0, len(_STRATEGIES)))
+        self.strategy_start_time = np.zeros(0)
+        
+        self.add_services(services)
+    
+    def add_services(self, services: Sequence[str]):
+        """Register new services with fresh adaptive state"""
+        new = [s for s in services if s not in self._service_index]
+        if not new:
+            return
+        for name in new:
+            self._service_index[name] = len(self.services)
+            self.services.append(name)
+        
+        n, A = len(new), len(self.agents)
+        self.alpha = np.concatenate([self.alpha, np.ones((n, A))])
+        self.weight = np.concatenate([self.weight, np.ones((n, A))])
+        self.recent_fpr.grow(n)
+        self.recent_fnr.grow(n)
+        self.current_strategy = np.concatenate(
+            [self.current_strategy, np.full(n, _HYBRID, dtype=np.int8)])
+        self._last_target = np.concatenate(
+            [self._last_target, np.full(n, _HYBRID, dtype=np.int8)])
+        self._target_run = np.concatenate([self._target_run, np.zeros(n, dtype=np.int64)])
+        self.deployment_mode_until = np.concatenate([self.deployment_mode_until, np.zeros(n)])
+        self.strategy_time = np.concatenate(
+            [self.strategy_time, np.zeros((n, len(_STRATEGIES)))])
+        self.strategy_start_time = np.concatenate(
+            [self.strategy_start_time, np.full(n, self.clock())])
+        if self.prescreen is not None:
+            self.prescreen.grow(n)
+    
+    def remove_services(self, services: Sequence[str]):
+        """Forget services and their adaptive state; unknown names are ignored
+        
+        Rows of the remaining services move up, so indices from
+        service_index() are invalidated.
+        """
+        drop = {s for s in services if s in self._service_index}
+        if not drop:
+            return
+        keep = np.array([s not in drop for s in self.services])
+        self.services = [s for s in self.services if s not in drop]
+        self._service_index = {s: i for i, s in enumerate(self.services)}
+        for name in ('alpha', 'weight', 'current_strategy', '_last_target', '_target_run',
+                     'deployment_mode_until', 'strategy_time', 'strategy_start_time'):
+            setattr(self, name, getattr(self, name)[keep])
+        self.recent_fpr.keep(keep)
+        self.recent_fnr.keep(keep)
+        if self.prescreen is not None:
+            self.prescreen.keep(keep)
+    
+    def service_index(self, service: str) -> int:
+        return self._service_index[service]
+    
+    def process_tick(self, windows: np.ndarray, states: Sequence[SystemState],
+                     services: Optional[Sequence[str]] = None
+                     ) -> Tuple[np.ndarray, np.ndarray, Dict]:
+        """Detect and coordinate one tick for every service
+        
+        windows is (services, window_size, feature_dim) in service order and
+        states holds one SystemState per service. Returns per-service
+        is_anomaly and confidence arrays plus metadata with the strategy
+        used and the (services, agents) agent scores.
+        
+        With a prescreen, only the services it escalates run the agents
+        (metadata['escalated']); the others are scored by the pre-screen
+        alone, which keeps them below the anomaly threshold.
+        
+        When services (distinct registered names) is given, the tick covers
+        only those services, with windows and states in that order; the
+        other services' state is untouched.
+        """
+        windows = np.asarray(windows)
+        if services is None:
+            rows = np.arange(len(self.services))
+        else:
+            rows = np.fromiter((self._service_index[s] for s in services),
+                               dtype=np.int64, count=len(services))
+            if len(np.unique(rows)) != len(rows):
+                raise ValueError("process_tick services must be distinct")
+        if len(windows) != len(rows) or len(states) != len(rows):
+            raise ValueError(f"Expected one window and state per service ({len(rows)})")
+        
+        if len(states):
+            observe_time(self.clock, max(s.timestamp for s in states))
+        signals = WindowSignals(windows)
+        if self.prescreen is None:
+            escalated = np.ones(len(rows), dtype=bool)
+            scores = self._detect(signals, rows)
+        else:
+            escalated, screen_score = self.prescreen.screen(signals, rows)
+            scores = np.repeat(screen_score[:, np.newaxis], len(self.agents), axis=1)
+            if escalated.all():
+                scores = self._detect(signals, rows)
+            elif escalated.any():
+                scores[escalated] = self._detect(signals.take(escalated), rows[escalated])
+        self._adapt_thresholds(rows)
+        is_agent_anomaly = scores > 1.0
+        confidence = np.where(
+            is_agent_anomaly, np.minimum(scores / 2.0, 1.0), 1.0 - scores
+        )
+        
+        strategy = self._select_strategy(states, rows)
+        recent_fpr = np.fromiter((s.recent_fpr for s in states), dtype=float, count=len(states))
+        
+        # Peer-to-peer: majority vote, mean confidence
+        p2p_anomaly = is_agent_anomaly.sum(axis=1) > len(self.agents) / 2
+        p2p_conf = confidence.mean(axis=1)
+        
+        # Hierarchical: follow the highest-weight agent
+        weight = self.weight[rows]
+        leader = np.argmax(weight, axis=1)
+        batch = np.arange(len(rows))
+        hier_anomaly = is_agent_anomaly[batch, leader]
+        hier_conf = confidence[batch, leader]
+        
+        # Hybrid: Algorithm 5 adaptive weighted voting
+        S = (weight * np.where(is_agent_anomaly, scores, 0.0)).sum(axis=1)
+        W = weight.sum(axis=1)
+        fusion_score = S / np.maximum(W, self.epsilon)
+        threshold = np.clip(self.base_threshold + np.maximum(0, recent_fpr - 0.1), 0.4, 0.8)
+        hybrid_anomaly = fusion_score > threshold
+        
+        is_anomaly = np.choose(strategy, [p2p_anomaly, hier_anomaly, hybrid_anomaly])
+        fused_conf = np.choose(strategy, [p2p_conf, hier_conf, fusion_score])
+        if self.prescreen is not None:
+            self.prescreen.resolve(rows[escalated], is_anomaly[escalated])
+        
+        metadata = {
+            'strategy': [_STRATEGIES[k].value for k in strategy],
+            'scores': scores,
+            'leader': [self.agent_types[k].value for k in leader],
+            'escalated': escalated,
+        }
+        return is_anomaly, fused_conf, metadata
+    
+    def _detect(self, signals: WindowSignals, rows: np.ndarray) -> np.ndarray:
+        """(services, agents) scores from one batched pass per agent type"""
+        scores = np.empty((len(signals.windows), len(self.agents)))
+        for k, agent in enumerate(self.agents):
+            agent_signals = signals
+            if self.schema is not None:
+                agent_signals = signals.columns(self.schema.slice(agent.agent_type))
+            features = agent.extract_features_batch(agent_signals.windows, agent_signals)
+            y_pred = agent._forward_last(features)
+            # Scores cover the metric columns, not the derived ones
+            F = agent.feature_dim
+            error = np.abs(features[:, -1, :F] - y_pred[:, :F])
+            threshold = self.alpha[rows, k, np.newaxis] * agent_signals.get('std')[:, 0]
+            scores[:, k] = np.mean(error / threshold, axis=1)
+        return scores
+    
+    def _adapt_thresholds(self, rows: np.ndarray):
+        """Vectorized DetectionAgent._adapt_threshold"""
+        fpr_ready = self.recent_fpr.count[rows] > 10
+        fnr_ready = self.recent_fnr.count[rows] > 10
+        raise_alpha = fpr_ready & (self.recent_fpr.mean()[rows] > 0.15)
+        lower_alpha = fpr_ready & ~raise_alpha & fnr_ready & (self.recent_fnr.mean()[rows] > 0.10)
+        alpha = self.alpha[rows]
+        alpha = np.where(raise_alpha, np.minimum(alpha * 1.1, 2.0), alpha)
+        self.alpha[rows] = np.where(lower_alpha, np.maximum(alpha * 0.9, 0.5), alpha)
+    
+    def _select_strategy(self, states: Sequence[SystemState], rows: np.ndarray) -> np.ndarray:
+        """Vectorized AdaptiveCoordinator.select_strategy"""
+        n = len(states)
+        workload = np.fromiter((s.workload_intensity for s in states), dtype=float, count=n)
+        recent_fnr = np.fromiter((s.recent_fnr for s in states), dtype=float, count=n)
+        deploying = np.fromiter((s.deployment_active for s in states), dtype=bool, count=n)
+        
+        target = np.full(n, _HYBRID, dtype=np.int8)
+        target[workload > self.T_high] = _HIER
+        target[workload < self.T_low] = _P2P
+        
+        high_fnr = rows[recent_fnr > self.T_FNR]
+        self.alpha[high_fnr] = np.maximum(self.alpha[high_fnr] * 0.9, 0.5)
+        if deploying.any():
+            mask = np.zeros(len(self.services), dtype=bool)
+            mask[rows[deploying]] = True
+            self.enable_lenient_mode(mask)
+        
+        self._target_run[rows] = np.where(
+            target == self._last_target[rows], self._target_run[rows] + 1, 1)
+        self._last_target[rows] = target
+        switch = ((self._target_run[rows] >= self.hysteresis)
+                  & (self.current_strategy[rows] != target))
+        if switch.any():
+            now = self.clock()
+            idx = rows[switch]
+            self.strategy_time[idx, self.current_strategy[idx]] += now - self.strategy_start_time[idx]
+            self.strategy_start_time[idx] = now
+            self.current_strategy[idx] = target[switch]
+        
+        return self.current_strategy[rows]
+    
+    def enable_lenient_mode(self, mask: np.ndarray):
+        """Enable lenient thresholds for the masked services"""
+        self.deployment_mode_until[mask] = self.clock() + self.lenient_mode_duration
+        self.alpha[mask] = np.minimum(self.alpha[mask] * 1.3, 2.0)
+    
+    def is_lenient_mode(self) -> np.ndarray:
+        return self.clock() < self.deployment_mode_until
+    
+    def update_performance(self, is_correct: np.ndarray,
+                           false_positive: Optional[np.ndarray] = None,
+                           false_negative: Optional[np.ndarray] = None):
+        """Algorithm 6 over (services, agents) outcome arrays
+        
+        is_correct drives the weight update; false_positive/false_negative
+        masks append to the recent FPR/FNR windows used by threshold
+        adaptation.
+        """
+        beta = 0.95
+        new_weight = np.where(
+            is_correct, np.minimum(1.1 * self.weight, 2.0), np.maximum(0.9 * self.weight, 0.5)
+        )
+        self.weight = beta * self.weight + (1 - beta) * new_weight
+        
+        ones = np.ones(self.weight.shape, dtype=np.int8)
+        if false_positive is not None:
+            self.recent_fpr.append(ones, np.asarray(false_positive, dtype=bool))
+        if false_negative is not None:
+            self.recent_fnr.append(ones, np.asarray(false_negative, dtype=bool))
+    
+    def get_statistics(self) -> Dict:
+        elapsed = self.clock() - self.strategy_start_time
+        strategy_time = self.strategy_time.copy()
+        strategy_time[np.arange(len(self.services)), self.current_strategy] += elapsed
+        total = strategy_time.sum()
+        
+        return {
+            'services': len(self.services),
+            'current_strategy': {
+                s: _STRATEGIES[k].value for s, k in zip(self.services, self.current_strategy)
+            },
+            'strategy_distribution': {
+                strategy.value: (strategy_time[:, k].sum() / total * 100) if total > 0 else 0
+                for k, strategy in enumerate(_STRATEGIES)
+            },
+            'lenient_services': int(self.is_lenient_mode().sum()),
+            'prescreen': None if self.prescreen is None else self.prescreen.get_statistics(),
+        }
@@ -0,0 +1,98 @@
+"""
+ADAPT-MAD: Tiered Detection
+Cheap vectorized pre-screen deciding which services need model inference
+"""
+
+import numpy as np
+from typing import Dict, Optional
+
+class PreScreen:
+    """Per-service z-score gate in front of LSTM inference
+    
+    Each tick, the latest sample of every window is compared with the
+    window's own mean and standard deviation (the moments the agents
+    normalize by, shared through agents.WindowSignals). Services whose
+    largest per-column |z| stays below z_threshold are quiet and skip
+    inference. The rest are escalated, as is every service:
+    
+    - on its first tick and every escalate_every ticks (0 disables the
+      schedule), so slow drifts the z-score cannot see still reach the
+      models;
+    - while its last escalated decision was anomalous (see resolve), so
+      an ongoing incident is followed by the models until it clears.
+    
+    score() is |z| / z_threshold, so a quiet service has a score below 1,
+    in the same units as agent anomaly scores.
+    """
+    
+    def __init__(self, z_threshold: float = 3.0, escalate_every: int = 10,
+                 services: int = 0):
+        if z_threshold <= 0:
+            raise ValueError("z_threshold must be positive")
+        self.z_threshold = z_threshold
+        self.escalate_every = escalate_every
+        
+        self._since = np.zeros(0, dtype=np.int64)
+        self._hot = np.zeros(0, dtype=bool)
+        self.ticks = np.zeros(0, dtype=np.int64)
+        self.escalations = np.zeros(0, dtype=np.int64)
+        self.grow(services)
+    
+    def __len__(self) -> int:
+        return len(self._since)
+    
+    def grow(self, rows: int):
+        """Add state for rows new services; each escalates on its first tick"""
+        self._since = np.concatenate([self._since, np.zeros(rows, dtype=np.int64)])
+        # Nothing is known about a new service yet
+        self._hot = np.concatenate([self._hot, np.ones(rows, dtype=bool)])
+        self.ticks = np.concatenate([self.ticks, np.zeros(rows, dtype=np.int64)])
+        self.escalations = np.concatenate([self.escalations, np.zeros(rows, dtype=np.int64)])
+    
+    def keep(self, mask: np.ndarray):
+        """Drop the state of services where mask is False"""
+        for name in ('_since', '_hot', 'ticks', 'escalations'):
+            setattr(self, name, getattr(self, name)[mask])
+    
+    def score(self, signals) -> np.ndarray:
+        """(batch,) largest |z| of the latest sample over z_threshold"""
+        latest = signals.windows[:, -1]
+        z = np.abs(latest - signals.get('mean')[:, 0]) / signals.get('std')[:, 0]
+        return z.max(axis=1) / self.z_threshold
+    
+    def screen(self, signals, rows: Optional[np.ndarray] = None):
+        """Escalation mask and pre-screen scores for one tick
+        
+        signals is an agents.WindowSignals over the (batch, window_size,
+        feature_dim) windows of the services at rows (all services, in
+        order, when None).
+        """
+        if rows is None:
+            rows = np.arange(len(self))
+        score = self.score(signals)
+        since = self._since[rows] + 1
+        escalate = (score >= 1.0) | self._hot[rows]
+        if self.escalate_every > 0:
+            escalate |= since >= self.escalate_every
+        
+        self._since[rows] = np.where(escalate, 0, since)
+        self.ticks[rows] += 1
+        self.escalations[rows] += escalate
+        return escalate, score
+    
+    def resolve(self, rows: np.ndarray, is_anomaly: np.ndarray):
+        """Record the fused decisions of the escalated rows"""
+        self._hot[rows] = is_anomaly
+    
+    @property
+    def escalation_rate(self) -> float:
+        ticks = self.ticks.sum()
+        return float(self.escalations.sum() / ticks) if ticks else 0.0
+    
+    def get_statistics(self) -> Dict:
+        return {
+            'ticks': int(self.ticks.sum()),
+            'escalations': int(self.escalations.sum()),
+            'escalation_rate': self.escalation_rate,
+            'hot_services': int(self._hot.sum()),
+        }
@@ -0,0 +1,163 @@
+"""
+ADAPT-MAD: Parallel Detection Runner
+Runs the coordinator's agents on a worker pool with a per-tick deadline
+"""
+
+import os
+import multiprocessing
+import numpy as np
+import torch
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Tuple
+
+_WORKER_AGENTS = None
+
+def _init_worker(agents: List, num_threads: int):
+    global _WORKER_AGENTS
+    torch.set_num_threads(num_threads)
+    _WORKER_AGENTS = agents
+
+def _forward(agent, window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Feature extraction + model forward; leaves the agent's state untouched"""
+    t = agent._clock()
+    features = agent.extract_features(window)
+    t = agent._observe('extract_features', t)
+    y_pred = agent._forward_last(features[np.newaxis])
+    agent._observe('forward', t)
+    return features[-1], y_pred[0]
+
+def _worker_forward(index: int, window: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """_forward in a worker process"""
+    return _forward(_WORKER_AGENTS[index], window)
+
+class DetectionRunner:
+    """Fans agent detection out over a thread or process pool
+    
+    Intra-op torch threads are partitioned so that workers x threads does
+    not exceed the available cores. With a deadline, agents that have not
+    reported when it expires are skipped for that tick (and not resubmitted
+    until their previous call finishes), and fusion runs on the rest.
+    
+    Workers only extract features and run the model. Scoring, which moves
+    an agent's alpha and detection history, happens in the calling thread
+    and only for agents that reported in time, so a late call finishing in
+    the background leaves no trace on the next tick. In process mode each
+    worker holds a copy of the agents' models taken when the pool starts;
+    call refresh() after changing agents or weights.
+    
+    Thread mode sets torch's intra-op thread count, which is process-wide,
+    so other torch work in the process also runs with threads_per_worker
+    threads until close() (or leaving the with block) restores the previous
+    count. Process mode only sets it in the workers.
+    """
+    
+    def __init__(self, coordinator, max_workers: Optional[int] = None,
+                 executor: str = 'thread', deadline: Optional[float] = None):
+        if executor not in ('thread', 'process'):
+            raise ValueError(f"executor must be 'thread' or 'process', got {executor!r}")
+        
+        self.coordinator = coordinator
+        self.executor = executor
+        self.deadline = deadline
+        
+        cores = os.cpu_count() or 1
+        self.max_workers = max_workers or max(1, min(len(coordinator.agents), cores))
+        self.threads_per_worker = max(1, cores // self.max_workers)
+        
+        self._pool = None
+        self._inflight: Dict[int, object] = {}
+        self._saved_threads: Optional[int] = None
+        self.refresh()
+    
+    @property
+    def agents(self) -> List:
+        return self.coordinator.agents
+    
+    def refresh(self):
+        """(Re)start the worker pool with the current agents"""
+        self.close()
+        if self.executor == 'thread':
+            self._saved_threads = torch.get_num_threads()
+            torch.set_num_threads(self.threads_per_worker)
+            self._pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        else:
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context('spawn'),
+                initializer=_init_worker,
+                initargs=(list(self.agents), self.threads_per_worker)
+            )
+    
+    def close(self):
+        for future in self._inflight.values():
+            future.cancel()
+        if self._pool is not None:
+            self._pool.shutdown(wait=False)
+            self._pool = None
+        self._inflight = {}
+        if self._saved_threads is not None:
+            torch.set_num_threads(self._saved_threads)
+            self._saved_threads = None
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc):
+        self.close()
+    
+    def run(self, window: np.ndarray) -> Tuple[List, List]:
+        """Run all agents on a window
+        
+        Returns (results, missed) where results are in agent order and
+        missed lists the AgentTypes that did not report within the deadline.
+        """
+        submitted = {}
+        missed = []
+        agent_windows = self.coordinator.agent_windows(window)
+        for k, agent in enumerate(self.agents):
+            previous = self._inflight.get(k)
+            if previous is not None and not previous.done():
+                missed.append(agent.agent_type)
+                continue
+            if self.executor == 'thread':
+                future = self._pool.submit(_forward, agent, agent_windows[k])
+            else:
+                future = self._pool.submit(_worker_forward, k, agent_windows[k])
+            submitted[k] = future
+        self._inflight.update(submitted)
+        
+        wait(submitted.values(), timeout=self.deadline)
+        
+        window_std = None
+        results = []
+        for k, future in submitted.items():
+            agent = self.agents[k]
+            if not future.done():
+                # A running call cannot be cancelled; its result is dropped
+                future.cancel()
+                missed.append(agent.agent_type)
+                continue
+            if window_std is None:
+                window_std = self.coordinator.agent_windows(np.std(window, axis=0) + 1e-8)
+            y_true, y_pred = future.result()
+            t = agent._clock()
+            results.append(agent._score_batch(
+                y_true[np.newaxis], y_pred[np.newaxis], window_std[k]
+            )[0])
+            agent._observe('score', t)
+        
+        return results, missed
+    
+    def run_and_coordinate(self, window: np.ndarray,
+                           system_state) -> Tuple[bool, float, Dict]:
+        """Run agents within the deadline, then fuse whatever reported"""
+        results, missed = self.run(window)
+        missed_agents = [agent_type.value for agent_type in missed]
+        if not results:
+            return False, 0.0, {'strategy': None, 'missed_agents': missed_agents}
+        
+        is_anomaly, confidence, metadata = self.coordinator.coordinate_detection(
+            results, system_state
+        )
+        metadata['missed_agents'] = missed_agents
+        return is_anomaly, confidence, metadata
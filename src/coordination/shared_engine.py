@@ -0,0 +1,68 @@
+"""
+ADAPT-MAD: Shared-Signal Execution Engine
+Runs every agent over a tick's windows with shared feature signals
+"""
+
+import numpy as np
+from typing import List, Optional
+
+from ..agents.features import WindowSignals
+
+class SharedSignalEngine:
+    """Detection for all coordinator agents with one feature pass per tick
+    
+    The windows of a tick are wrapped in one WindowSignals, so moments,
+    differences and percentiles are computed once and shared by every
+    agent that reads them. Each agent then runs its own detector (on its
+    own backend) over the whole batch in a single call. With a
+    coordinator schema, each agent reads only its own column view.
+    
+    Agents are read from the coordinator on every call, so registered,
+    unregistered and swapped models (DetectionAgent.swap_model) take
+    effect on the next tick with nothing to rebuild.
+    
+    Agents still run one model call each: a single forward over all
+    detectors was slower, whether packed into one block-diagonal LSTM
+    (FLOPs grow with the square of the agent count) or grouped with bmm
+    and a Python step loop; see experiments/benchmark_engine.py.
+    """
+    
+    def __init__(self, coordinator):
+        self.coordinator = coordinator
+    
+    @property
+    def agents(self) -> List:
+        return self.coordinator.agents
+    
+    def detect(self, window: np.ndarray, signals: Optional[WindowSignals] = None) -> List:
+        """Detection results of every agent for one window, in agent order
+        
+        signals may carry WindowSignals of window[np.newaxis] computed
+        earlier in the tick (e.g. by a PreScreen), which are reused.
+        """
+        return [results[0] for results in self._detect(np.asarray(window)[np.newaxis], signals)]
+    
+    def detect_batch(self, windows: np.ndarray) -> List[List]:
+        """Per-window lists of agent results for a (batch, window_size, feature_dim) stack"""
+        per_agent = self._detect(np.asarray(windows))
+        return [list(results) for results in zip(*per_agent)]
+    
+    def _detect(self, windows: np.ndarray,
+                signals: Optional[WindowSignals] = None) -> List[List]:
+        if not self.agents or len(windows) == 0:
+            return [[] for _ in self.agents]
+        
+        # Derived signals (moments, differences, ...) are computed once per
+        # tick and shared by every agent that reads them
+        agent_signals = self.coordinator.agent_signals(
+            WindowSignals(windows) if signals is None else signals)
+        results = []
+        for agent, signals in zip(self.agents, agent_signals):
+            t = agent._clock()
+            features = agent.extract_features_batch(signals.windows, signals)
+            t = agent._observe('extract_features', t)
+            y_pred = agent._forward_last(features)
+            t = agent._observe('forward', t)
+            results.append(agent._score_batch(features[:, -1], y_pred, signals.get('std')[:, 0]))
+            agent._observe('score', t)
+        return results
@@ -0,0 +1,4 @@
+"""ADAPT-MAD Datasets"""
+from .columnar import ColumnarDataset, ServiceTrace, convert_csv_traces, open_dataset
+
+__all__ = ['ColumnarDataset', 'ServiceTrace', 'convert_csv_traces', 'open_dataset']
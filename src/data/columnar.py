@@ -0,0 +1,177 @@
+"""
+ADAPT-MAD: Columnar Trace Storage
+One-time conversion of raw traces to memory-mapped per-service arrays
+"""
+
+import json
+import numpy as np
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Union
+
+FORMAT_VERSION = 1
+
+class ServiceTrace:
+    """Memory-mapped features, labels and timestamps of one service
+    
+    Arrays are opened read-only with mmap, so only the pages a window
+    touches are read from disk; windows are views, never copies.
+    """
+    
+    def __init__(self, path: Path, feature_names: List[str]):
+        self.path = Path(path)
+        self.feature_names = feature_names
+        self.features = np.load(self.path / 'features.npy', mmap_mode='r')
+        self.labels = np.load(self.path / 'labels.npy', mmap_mode='r')
+        self.timestamps = np.load(self.path / 'timestamps.npy', mmap_mode='r')
+    
+    def __len__(self) -> int:
+        return len(self.features)
+    
+    @property
+    def feature_dim(self) -> int:
+        return self.features.shape[1]
+    
+    def num_windows(self, window_size: int, stride: int = 1) -> int:
+        return max(0, (len(self) - window_size) // stride + 1)
+    
+    def window(self, index: int, window_size: int, stride: int = 1) -> np.ndarray:
+        """(window_size, feature_dim) view of the index-th window"""
+        if not 0 <= index < self.num_windows(window_size, stride):
+            raise IndexError(f"window {index} out of range")
+        start = index * stride
+        return self.features[start:start + window_size]
+    
+    def windows(self, window_size: int, stride: int = 1) -> np.ndarray:
+        """(num_windows, window_size, feature_dim) view of all windows"""
+        view = np.lib.stride_tricks.sliding_window_view(self.features, window_size, axis=0)
+        return view[::stride].transpose(0, 2, 1)
+    
+    def window_labels(self, window_size: int, stride: int = 1) -> np.ndarray:
+        """Label of the newest sample of each window"""
+        return self.labels[window_size - 1::stride][:self.num_windows(window_size, stride)]
+    
+    def window_timestamps(self, window_size: int, stride: int = 1) -> np.ndarray:
+        return self.timestamps[window_size - 1::stride][:self.num_windows(window_size, stride)]
+
+class ColumnarDataset:
+    """A converted dataset directory (see convert_csv_traces)"""
+    
+    def __init__(self, root: Union[str, Path]):
+        self.root = Path(root)
+        with open(self.root / 'meta.json') as f:
+            self.meta = json.load(f)
+        if self.meta.get('format_version') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported columnar format in {self.root}")
+        self.services: List[str] = self.meta['services']
+        self._traces: Dict[str, ServiceTrace] = {}
+    
+    def __len__(self) -> int:
+        return len(self.services)
+    
+    def trace(self, service: str) -> ServiceTrace:
+        if service not in self._traces:
+            if service not in self.services:
+                raise KeyError(service)
+            self._traces[service] = ServiceTrace(
+                self.root / service, self.meta['feature_names'][service]
+            )
+        return self._traces[service]
+    
+    def traces(self):
+        for service in self.services:
+            yield self.trace(service)
+
+def convert_csv_traces(csv_paths: Dict[str, Union[str, Path]], out_dir: Union[str, Path],
+                       timestamp_col: str = 'timestamp', label_col: str = 'label',
+                       dtype: str = 'float32', chunksize: int = 100_000) -> ColumnarDataset:
+    """Convert per-service CSV traces to the columnar format
+    
+    Each CSV has a timestamp column, an optional 0/1 label column and one
+    column per metric; rows must be in timestamp order. CSVs are streamed
+    in chunks straight into .npy memmaps, so traces larger than RAM work.
+    
+    Converting into a directory that already holds a dataset adds (or
+    replaces) the given services and keeps the others.
+    """
+    import pandas as pd
+    
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    feature_names = {}
+    
+    for service, csv_path in csv_paths.items():
+        header = pd.read_csv(csv_path, nrows=0).columns
+        if timestamp_col not in header:
+            raise ValueError(f"{csv_path} has no {timestamp_col!r} column")
+        names = [c for c in header if c not in (timestamp_col, label_col)]
+        n_rows = sum(len(chunk) for chunk in pd.read_csv(
+            csv_path, usecols=[timestamp_col], chunksize=chunksize))
+        
+        service_dir = out_dir / service
+        service_dir.mkdir(exist_ok=True)
+        open_memmap = np.lib.format.open_memmap
+        features = open_memmap(service_dir / 'features.npy', mode='w+',
+                               dtype=dtype, shape=(n_rows, len(names)))
+        labels = open_memmap(service_dir / 'labels.npy', mode='w+',
+                             dtype=np.int8, shape=(n_rows,))
+        timestamps = open_memmap(service_dir / 'timestamps.npy', mode='w+',
+                                 dtype=np.float64, shape=(n_rows,))
+        
+        row = 0
+        for chunk in pd.read_csv(csv_path, chunksize=chunksize):
+            end = row + len(chunk)
+            features[row:end] = chunk[names].to_numpy(dtype=dtype)
+            timestamps[row:end] = _to_seconds(chunk[timestamp_col])
+            if label_col in chunk:
+                labels[row:end] = chunk[label_col].to_numpy(dtype=np.int8)
+            row = end
+        
+        for arr in (features, labels, timestamps):
+            arr.flush()
+        del features, labels, timestamps
+        feature_names[service] = names
+    
+    meta = {'format_version': FORMAT_VERSION, 'services': [], 'feature_names': {}}
+    if (out_dir / 'meta.json').exists():
+        meta = ColumnarDataset(out_dir).meta
+    meta['services'] += [s for s in csv_paths if s not in meta['services']]
+    meta['feature_names'].update(feature_names)
+    # Written last and atomically: meta.json only lists fully converted services
+    tmp = out_dir / 'meta.json.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(meta, f, indent=2)
+    tmp.replace(out_dir / 'meta.json')
+    return ColumnarDataset(out_dir)
+
+def _to_seconds(column) -> np.ndarray:
+    """Numeric timestamps pass through; date strings become epoch seconds"""
+    import pandas as pd
+    
+    if pd.api.types.is_numeric_dtype(column):
+        return column.to_numpy(dtype=np.float64)
+    parsed = pd.to_datetime(column, utc=True)
+    return (parsed - pd.Timestamp(0, tz='UTC')).dt.total_seconds().to_numpy()
+
+def open_dataset(name: str, data_root: Union[str, Path] = 'data',
+                 services: Optional[Sequence[str]] = None) -> ColumnarDataset:
+    """Open data/<name>/columnar, converting data/<name>/raw/*.csv on first use
+    
+    Only the requested services (all when None) are converted; services
+    requested later are converted then and appended to the cache.
+    """
+    base = Path(data_root) / name
+    columnar = base / 'columnar'
+    raw = {p.stem: p for p in sorted((base / 'raw').glob('*.csv'))}
+    if services is not None:
+        raw = {s: p for s, p in raw.items() if s in services}
+    
+    if (columnar / 'meta.json').exists():
+        dataset = ColumnarDataset(columnar)
+        missing = {s: p for s, p in raw.items() if s not in dataset.services}
+        return convert_csv_traces(missing, columnar) if missing else dataset
+    
+    if not raw:
+        raise FileNotFoundError(
+            f"No converted data in {columnar} and no raw CSVs in {base / 'raw'}; "
+            f"see scripts/download_datasets.sh")
+    return convert_csv_traces(raw, columnar)
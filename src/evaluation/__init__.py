@@ -0,0 +1,9 @@
+"""ADAPT-MAD Evaluation"""
+from .replay import (ReplayConfig, ReplayResult, replay, replay_trace,
+                     run_replay, write_results, STRATEGIES)
+from .compact import compact_report
+from .tiered import prescreen_report
+
+__all__ = ['ReplayConfig', 'ReplayResult', 'replay', 'replay_trace',
+           'run_replay', 'write_results', 'compact_report', 'prescreen_report',
+           'STRATEGIES']
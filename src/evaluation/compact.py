@@ -0,0 +1,55 @@
+"""
+ADAPT-MAD: Compact Mode Report
+Model memory and detection quality of int8 compact agents against the
+float32 agents on a replay dataset
+"""
+
+import dataclasses
+from typing import Dict, List
+
+from ..data import open_dataset
+from .replay import ReplayConfig, build_agents, build_schema, run_replay
+
+def compact_report(config: ReplayConfig, strategies: List[str] = ('ADAPTIVE',),
+                   isolate: bool = False) -> Dict:
+    """Replay the same agents in float32 and compact mode
+    
+    Both runs use the same weights (checkpoints, or a fixed seed when
+    none are configured), so F1 differences come from quantization only.
+    """
+    seed = 0 if config.seed is None else config.seed
+    full = dataclasses.replace(config, compact=False, seed=seed)
+    compact = dataclasses.replace(config, compact=True, seed=seed)
+    
+    dataset = open_dataset(config.dataset, config.data_root, config.services)
+    service = (config.services or dataset.services)[0]
+    trace = dataset.trace(service)
+    schema = build_schema(trace.feature_names, config)
+    float_bytes = sum(a.model_nbytes()['resident']
+                      for a in build_agents(trace.feature_dim, full, schema))
+    compact_bytes = sum(a.model_nbytes()['resident']
+                        for a in build_agents(trace.feature_dim, compact, schema))
+    
+    full_results = run_replay(full, list(strategies), isolate)
+    compact_results = run_replay(compact, list(strategies), isolate)
+    
+    rows = []
+    for f, c in zip(full_results, compact_results):
+        rows.append({
+            'strategy': f.strategy,
+            'f1_float': f.f1,
+            'f1_compact': c.f1,
+            'f1_delta': c.f1 - f.f1,
+            'windows_per_sec_float': f.windows_per_sec,
+            'windows_per_sec_compact': c.windows_per_sec,
+            'speedup': (c.windows_per_sec / f.windows_per_sec
+                        if f.windows_per_sec > 0 else 0.0),
+        })
+    
+    return {
+        'dataset': config.dataset,
+        'model_bytes_float': float_bytes,
+        'model_bytes_compact': compact_bytes,
+        'compression': float_bytes / compact_bytes if compact_bytes else 0.0,
+        'strategies': rows,
+    }
@@ -0,0 +1,352 @@
+"""
+ADAPT-MAD: Replay Evaluation
+Streams labeled traces through agents and the coordinator in timestamp
+order, measuring detection quality and runtime cost per strategy
+"""
+
+import json
+import multiprocessing
+import resource
+import sys
+import time
+import numpy as np
+import torch
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from ..agents import AGENT_CLASSES, AgentType, MetricSchema
+from ..agents.features import WindowSignals
+from ..coordination import (AdaptiveCoordinator, CollaborationStrategy, IncidentGrouper,
+                            SharedSignalEngine, PreScreen, SystemState)
+from ..coordination.factory import checkpoint_dir_errors
+from ..data import open_dataset
+from ..utils.ring_buffer import RollingRate
+from ..utils.clock import SimulatedClock
+
+STRATEGIES = ['P2P', 'HIER', 'HYBRID', 'ADAPTIVE']
+
+DEFAULT_AGENT_TYPES = ['LDA', 'TMA', 'RUA', 'ERA']
+
+@dataclass
+class ReplayConfig:
+    dataset: str
+    services: Optional[List[str]] = None
+    data_root: str = 'data'
+    window_size: int = 50
+    stride: int = 1
+    hidden_dim: int = 64
+    num_layers: int = 2
+    checkpoint_dir: Optional[str] = None
+    backend: str = 'eager'
+    compact: bool = False
+    seed: Optional[int] = None
+    max_windows: Optional[int] = None
+    workload_column: Optional[str] = None
+    deployment_column: Optional[str] = None
+    # Agent type value -> column names or shell patterns, e.g.
+    # {'LDA': ['*latency*'], 'ERA': ['*error*']}; each listed agent sees only
+    # its columns, and unlisted agent types are not run
+    feature_groups: Optional[Dict[str, List[str]]] = None
+    # Agent type values to run when feature_groups is not set
+    agents: List[str] = field(default_factory=lambda: list(DEFAULT_AGENT_TYPES))
+    feedback: bool = True
+    coordination: Dict = field(default_factory=dict)
+    # Positives this close in trace time form one alert incident
+    incident_window: float = 300.0
+    # Tiered detection: a coordination.PreScreen gates model inference
+    prescreen: bool = False
+    prescreen_z: float = 3.0
+    prescreen_every: int = 10
+    
+    def __post_init__(self):
+        # Scores from random weights must not pass for a trained replay
+        errors = checkpoint_dir_errors(self.checkpoint_dir)
+        if errors:
+            raise ValueError("Invalid replay config: " + "; ".join(errors))
+    
+    @classmethod
+    def from_pipeline_config(cls, pipeline_config, dataset: str, **overrides) -> 'ReplayConfig':
+        """Replay settings from a validated coordination.PipelineConfig"""
+        from ..agents import parse_agent_type
+        
+        execution = pipeline_config.execution
+        agent_types = [parse_agent_type(spec.type).value for spec in pipeline_config.agents]
+        feature_groups = None
+        if pipeline_config.agents[0].columns is not None:
+            feature_groups = {t: spec.columns
+                              for t, spec in zip(agent_types, pipeline_config.agents)}
+        values = dict(
+            dataset=dataset, window_size=pipeline_config.window_size,
+            hidden_dim=pipeline_config.hidden_dim, num_layers=pipeline_config.num_layers,
+            checkpoint_dir=pipeline_config.checkpoint_dir, backend=execution.backend,
+            compact=execution.compact, feature_groups=feature_groups, agents=agent_types,
+            # Replay pins each strategy itself
+            coordination={k: v for k, v in pipeline_config.coordination.items()
+                          if k != 'fixed_strategy'},
+        )
+        values.update(overrides)
+        return cls(**values)
+
+@dataclass
+class ReplayResult:
+    strategy: str
+    precision: float
+    recall: float
+    f1: float
+    mttd_minutes: Optional[float]
+    incidents: int
+    detected_incidents: int
+    windows: int
+    windows_per_sec: float
+    latency_p50_ms: float
+    latency_p99_ms: float
+    peak_rss_mb: float
+    # Share of trace time (not wall time) spent in each strategy
+    strategy_time_percent: Dict[str, float] = field(default_factory=dict)
+    # Alert volume before and after incident grouping
+    positive_decisions: int = 0
+    alert_incidents: int = 0
+    # Share of windows that ran model inference, and of labelled anomalous
+    # windows among them (the recall bound of the pre-screen)
+    escalation_rate: float = 1.0
+    escalated_anomaly_rate: Optional[float] = None
+    
+    def to_dict(self) -> Dict:
+        return asdict(self)
+
+class _Tally:
+    """Confusion counts, incident delays and tick latencies"""
+    
+    def __init__(self):
+        self.tp = self.fp = self.tn = self.fn = 0
+        self.delays: List[float] = []
+        self.incidents = 0
+        self.latencies: List[float] = []
+        self.busy_seconds = 0.0
+        self.strategy_seconds: Dict[str, float] = {}
+        self.alert_incidents = 0
+        self.escalated = 0
+        self.anomalous = 0
+        self.escalated_anomalous = 0
+        self.screened = False
+    
+    def result(self, strategy: str) -> ReplayResult:
+        precision = self.tp / (self.tp + self.fp) if (self.tp + self.fp) > 0 else 0.0
+        recall = self.tp / (self.tp + self.fn) if (self.tp + self.fn) > 0 else 0.0
+        f1 = 2 * precision * recall / (precision + recall) if (precision + recall) > 0 else 0.0
+        latencies_ms = np.asarray(self.latencies) * 1000.0
+        windows = len(self.latencies)
+        total_seconds = sum(self.strategy_seconds.values())
+        
+        return ReplayResult(
+            strategy=strategy, precision=precision, recall=recall, f1=f1,
+            mttd_minutes=float(np.mean(self.delays)) / 60.0 if self.delays else None,
+            incidents=self.incidents, detected_incidents=len(self.delays),
+            windows=windows,
+            windows_per_sec=windows / self.busy_seconds if self.busy_seconds > 0 else 0.0,
+            latency_p50_ms=float(np.percentile(latencies_ms, 50)) if windows else 0.0,
+            latency_p99_ms=float(np.percentile(latencies_ms, 99)) if windows else 0.0,
+            peak_rss_mb=_peak_rss_mb(),
+            strategy_time_percent={
+                k: v / total_seconds * 100 if total_seconds > 0 else 0.0
+                for k, v in self.strategy_seconds.items()
+            },
+            positive_decisions=self.tp + self.fp,
+            alert_incidents=self.alert_incidents,
+            escalation_rate=self.escalated / windows if self.screened and windows else 1.0,
+            escalated_anomaly_rate=(self.escalated_anomalous / self.anomalous
+                                    if self.screened and self.anomalous else None),
+        )
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is bytes on macOS, kilobytes elsewhere
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def build_schema(feature_names: List[str], config: ReplayConfig) -> Optional[MetricSchema]:
+    """MetricSchema from config.feature_groups, or None when not configured"""
+    if not config.feature_groups:
+        return None
+    patterns = {AgentType(k): v for k, v in config.feature_groups.items()}
+    return MetricSchema.from_patterns(feature_names, patterns)
+
+def build_agents(feature_dim: int, config: ReplayConfig,
+                 schema: Optional[MetricSchema] = None) -> List:
+    """Default agent set, loading checkpoints when a directory is configured
+    
+    With a schema, only its agent types are built, each sized to its columns.
+    """
+    if schema is None:
+        agent_types = [AgentType(t) for t in config.agents]
+    else:
+        agent_types = schema.agent_types
+    return [
+        AGENT_CLASSES[t](
+            feature_dim=feature_dim if schema is None else schema.feature_dim(t),
+            window_size=config.window_size, hidden_dim=config.hidden_dim,
+            num_layers=config.num_layers, checkpoint=config.checkpoint_dir,
+            # Replay never trains, so compact agents keep only int8 weights
+            backend=config.backend, compact=config.compact, serving_only=True)
+        for t in agent_types
+    ]
+
+def replay_trace(trace, config: ReplayConfig, strategy: str,
+                 tally: Optional[_Tally] = None) -> _Tally:
+    """Replay one service trace window by window in timestamp order
+    
+    Coordination runs on a SimulatedClock driven by the window timestamps,
+    so lenient-mode windows and strategy time follow trace time while the
+    replay itself runs as fast as the CPU allows.
+    """
+    tally = tally or _Tally()
+    n_windows = trace.num_windows(config.window_size, config.stride)
+    if config.max_windows is not None:
+        n_windows = min(n_windows, config.max_windows)
+    labels = trace.window_labels(config.window_size, config.stride)
+    timestamps = trace.window_timestamps(config.window_size, config.stride)
+    
+    clock = SimulatedClock(float(timestamps[0]) if n_windows else 0.0)
+    fixed = None if strategy == 'ADAPTIVE' else CollaborationStrategy(strategy)
+    schema = build_schema(trace.feature_names, config)
+    permutation = None if schema is None else schema.permutation(trace.feature_names)
+    agents = build_agents(trace.feature_dim, config, schema)
+    coordinator = AdaptiveCoordinator(agents, fixed_strategy=fixed, clock=clock,
+                                      schema=schema, **config.coordination)
+    engine = SharedSignalEngine(coordinator)
+    
+    workload_index = deployment_index = None
+    if config.workload_column in trace.feature_names:
+        workload_index = trace.feature_names.index(config.workload_column)
+    if config.deployment_column in trace.feature_names:
+        deployment_index = trace.feature_names.index(config.deployment_column)
+    
+    grouper = IncidentGrouper(time_window=config.incident_window)
+    prescreen = None
+    if config.prescreen:
+        prescreen = PreScreen(config.prescreen_z, config.prescreen_every, services=1)
+        tally.screened = True
+    recent_fp = RollingRate(100)
+    recent_fn = RollingRate(100)
+    incident_start = None
+    incident_detected = False
+    
+    for i in range(n_windows):
+        window = np.asarray(trace.window(i, config.window_size, config.stride), dtype=float)
+        label = bool(labels[i])
+        workload = float(window[-1, workload_index]) if workload_index is not None else 2000.0
+        deploying = deployment_index is not None and bool(window[-1, deployment_index])
+        if permutation is not None:
+            # The one copy per tick; agents get views of the reordered window
+            window = window[:, permutation]
+        state = SystemState(
+            workload_intensity=workload, cpu_utilization=0.0, memory_utilization=0.0,
+            recent_fpr=recent_fp.mean(), recent_fnr=recent_fn.mean(),
+            deployment_active=deploying, timestamp=float(timestamps[i])
+        )
+        clock.observe(state.timestamp)
+        
+        start = time.perf_counter()
+        escalate, signals = True, None
+        if prescreen is not None:
+            signals = WindowSignals(window[np.newaxis])
+            escalate, screen_score = prescreen.screen(signals)
+            escalate = bool(escalate[0])
+        if escalate:
+            agent_results = engine.detect(window, signals)
+            is_anomaly, confidence, _ = coordinator.coordinate_detection(agent_results, state)
+            if prescreen is not None:
+                prescreen.resolve(np.array([0]), np.array([bool(is_anomaly)]))
+        else:
+            # Quiet: keep strategy state and timing in step, skip the models
+            agent_results = []
+            coordinator.select_strategy(state)
+            is_anomaly, confidence = False, 1.0 - float(screen_score[0])
+        elapsed = time.perf_counter() - start
+        tally.latencies.append(elapsed)
+        tally.busy_seconds += elapsed
+        
+        is_anomaly = bool(is_anomaly)
+        tally.escalated += escalate
+        if label:
+            tally.anomalous += 1
+            tally.escalated_anomalous += escalate
+        events = grouper.observe(trace.path.name, state.timestamp, is_anomaly, confidence)
+        tally.alert_incidents += sum(event.kind == 'open' for event in events)
+        if is_anomaly and label:
+            tally.tp += 1
+        elif is_anomaly:
+            tally.fp += 1
+        elif label:
+            tally.fn += 1
+        else:
+            tally.tn += 1
+        if not label:
+            recent_fp.append(int(is_anomaly))
+        else:
+            recent_fn.append(int(not is_anomaly))
+        
+        if label and incident_start is None:
+            incident_start = timestamps[i]
+            incident_detected = False
+            tally.incidents += 1
+        elif not label:
+            incident_start = None
+        if label and is_anomaly and not incident_detected:
+            tally.delays.append(float(timestamps[i] - incident_start))
+            incident_detected = True
+        
+        if config.feedback:
+            for agent, result in zip(agents, agent_results):
+                agent.update_performance(
+                    is_correct=result.is_anomaly == label,
+                    was_true_positive=label if result.is_anomaly else None
+                )
+    
+    for k, seconds in coordinator.strategy_times().items():
+        tally.strategy_seconds[k.value] = tally.strategy_seconds.get(k.value, 0.0) + seconds
+    return tally
+
+def replay(config: ReplayConfig, strategy: str) -> ReplayResult:
+    """Replay every selected service of a dataset under one strategy"""
+    if config.seed is not None:
+        # Same initial weights across runs when no checkpoints are loaded
+        torch.manual_seed(config.seed)
+    dataset = open_dataset(config.dataset, config.data_root, config.services)
+    services = config.services or dataset.services
+    tally = _Tally()
+    for service in services:
+        replay_trace(dataset.trace(service), config, strategy, tally)
+    return tally.result(strategy)
+
+def run_replay(config: ReplayConfig, strategies: List[str] = STRATEGIES,
+               isolate: bool = True) -> List[ReplayResult]:
+    """Replay under each strategy; isolate runs each in a fresh process
+    so peak RSS is measured per strategy"""
+    for strategy in strategies:
+        if strategy not in STRATEGIES:
+            raise ValueError(f"Unknown strategy {strategy!r}, expected one of {STRATEGIES}")
+    if not isolate:
+        return [replay(config, strategy) for strategy in strategies]
+    
+    ctx = multiprocessing.get_context('spawn')
+    results = []
+    for strategy in strategies:
+        with ctx.Pool(processes=1) as pool:
+            results.append(pool.apply(replay, (config, strategy)))
+    return results
+
+def write_results(results: List[ReplayResult], config: ReplayConfig,
+                  output_dir: str = 'results/') -> Path:
+    """Write a machine-readable replay report for regression tracking"""
+    path = Path(output_dir) / f"replay_{config.dataset}.json"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    report = {
+        'dataset': config.dataset,
+        'created': time.time(),
+        'config': asdict(config),
+        'results': [r.to_dict() for r in results],
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    return path
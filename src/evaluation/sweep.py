@@ -0,0 +1,139 @@
+"""
+ADAPT-MAD: Parameter Sweeps
+Datasets x configuration grid runs on a CPU-pinned process pool, cached
+by configuration hash
+"""
+
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+import time
+import torch
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence
+
+from .replay import ReplayConfig, replay, STRATEGIES
+
+# Grid keys passed to AdaptiveCoordinator rather than ReplayConfig
+COORDINATION_KEYS = ('threshold_high_load', 'threshold_low_load',
+                     'threshold_fpr', 'threshold_fnr', 'hysteresis')
+
+_WORKER_CORE = None
+_CORES = None
+
+def expand_grid(grid: Dict[str, Sequence]) -> List[Dict]:
+    """Cartesian product of a {parameter: values} grid"""
+    keys = sorted(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+def config_hash(cell: Dict) -> str:
+    payload = json.dumps(cell, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class SweepCache:
+    """One JSON file per finished cell, keyed by its configuration hash"""
+    
+    def __init__(self, cache_dir: str = 'results/cache'):
+        self.cache_dir = Path(cache_dir)
+    
+    def _path(self, cell: Dict) -> Path:
+        return self.cache_dir / f"{config_hash(cell)}.json"
+    
+    def get(self, cell: Dict) -> Optional[Dict]:
+        path = self._path(cell)
+        if not path.exists():
+            return None
+        with open(path) as f:
+            return json.load(f)
+    
+    def put(self, cell: Dict, results: List[Dict]) -> Dict:
+        entry = {'hash': config_hash(cell), 'cell': cell,
+                 'created': time.time(), 'results': results}
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        tmp = self._path(cell).with_suffix('.tmp')
+        with open(tmp, 'w') as f:
+            json.dump(entry, f, indent=2)
+        tmp.replace(self._path(cell))
+        return entry
+    
+    def entries(self) -> List[Dict]:
+        if not self.cache_dir.is_dir():
+            return []
+        entries = []
+        for path in sorted(self.cache_dir.glob('*.json')):
+            with open(path) as f:
+                entries.append(json.load(f))
+        return entries
+
+def cell_config(cell: Dict) -> ReplayConfig:
+    """ReplayConfig for one sweep cell"""
+    params = dict(cell)
+    coordination = {k: params.pop(k) for k in COORDINATION_KEYS if k in params}
+    params.pop('strategies', None)
+    return ReplayConfig(coordination=coordination, **params)
+
+def _init_worker(cores):
+    """Pin this worker to a free core (Linux) and use one torch thread"""
+    global _WORKER_CORE, _CORES
+    _CORES = cores
+    _WORKER_CORE = cores.get()
+    if hasattr(os, 'sched_setaffinity'):
+        os.sched_setaffinity(0, {_WORKER_CORE})
+    torch.set_num_threads(1)
+
+def _run_cell(cell: Dict) -> List[Dict]:
+    try:
+        config = cell_config(cell)
+        return [replay(config, strategy).to_dict() for strategy in cell['strategies']]
+    finally:
+        # Workers exit after one cell; hand the core to the next one
+        if _CORES is not None:
+            _CORES.put(_WORKER_CORE)
+
+def run_sweep(datasets: Sequence[str], grid: Dict[str, Sequence],
+              base: Optional[Dict] = None, strategies: Sequence[str] = STRATEGIES,
+              cache_dir: str = 'results/cache',
+              max_workers: Optional[int] = None) -> List[Dict]:
+    """Run every dataset x grid cell not already cached
+    
+    Each cell runs in its own single-threaded worker process pinned to
+    one core (one process per cell, so peak RSS stays per cell). Returns
+    the cache entries of all requested cells.
+    """
+    cache = SweepCache(cache_dir)
+    cells = [
+        dict(base or {}, dataset=dataset, strategies=list(strategies), **params)
+        for dataset in datasets for params in expand_grid(grid)
+    ]
+    todo = [cell for cell in cells if cache.get(cell) is None]
+    
+    if todo:
+        if hasattr(os, 'sched_getaffinity'):
+            cores = sorted(os.sched_getaffinity(0))
+        else:
+            cores = list(range(os.cpu_count() or 1))
+        workers = min(max_workers or len(cores), len(cores), len(todo))
+        
+        ctx = multiprocessing.get_context('spawn')
+        with ctx.Manager() as manager:
+            core_queue = manager.Queue()
+            for core in cores[:workers]:
+                core_queue.put(core)
+            
+            with ctx.Pool(processes=workers, initializer=_init_worker,
+                          initargs=(core_queue,), maxtasksperchild=1) as pool:
+                for cell, results in zip(todo, pool.imap(_run_cell, todo)):
+                    cache.put(cell, results)
+    
+    return [cache.get(cell) for cell in cells]
+
+def load_sweep_results(cache_dir: str = 'results/cache') -> List[Dict]:
+    """Flatten cached sweep entries to one row per (cell, strategy)"""
+    rows = []
+    for entry in SweepCache(cache_dir).entries():
+        cell = {k: v for k, v in entry['cell'].items() if k != 'strategies'}
+        for result in entry['results']:
+            rows.append(dict(cell, hash=entry['hash'], **result))
+    return rows
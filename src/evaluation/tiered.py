@@ -0,0 +1,50 @@
+"""
+ADAPT-MAD: Tiered Detection Report
+Inference cost and detection quality of pre-screened replay against
+running the models on every window
+"""
+
+import dataclasses
+from typing import Dict, List
+
+from .replay import ReplayConfig, run_replay
+
+def prescreen_report(config: ReplayConfig, strategies: List[str] = ('ADAPTIVE',),
+                     isolate: bool = False) -> Dict:
+    """Replay the same agents with and without the pre-screen
+    
+    Both runs use the same weights (checkpoints, or a fixed seed when
+    none are configured), so recall differences come from the windows the
+    pre-screen kept away from the models.
+    """
+    seed = 0 if config.seed is None else config.seed
+    full = dataclasses.replace(config, prescreen=False, seed=seed)
+    tiered = dataclasses.replace(config, prescreen=True, seed=seed)
+    
+    full_results = run_replay(full, list(strategies), isolate)
+    tiered_results = run_replay(tiered, list(strategies), isolate)
+    
+    rows = []
+    for f, t in zip(full_results, tiered_results):
+        rows.append({
+            'strategy': f.strategy,
+            'escalation_rate': t.escalation_rate,
+            'escalated_anomaly_rate': t.escalated_anomaly_rate,
+            'recall_full': f.recall,
+            'recall_tiered': t.recall,
+            'recall_delta': t.recall - f.recall,
+            'f1_full': f.f1,
+            'f1_tiered': t.f1,
+            'f1_delta': t.f1 - f.f1,
+            'windows_per_sec_full': f.windows_per_sec,
+            'windows_per_sec_tiered': t.windows_per_sec,
+            'speedup': (t.windows_per_sec / f.windows_per_sec
+                        if f.windows_per_sec > 0 else 0.0),
+        })
+    
+    return {
+        'dataset': config.dataset,
+        'prescreen_z': config.prescreen_z,
+        'prescreen_every': config.prescreen_every,
+        'strategies': rows,
+    }
@@ -0,0 +1,4 @@
+"""ADAPT-MAD Monitoring"""
+from .metrics import Instrumentation, StageTimers
+
+__all__ = ['Instrumentation', 'StageTimers']
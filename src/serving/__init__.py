@@ -0,0 +1,6 @@
+"""ADAPT-MAD Serving"""
+from .server import (DetectionServicer, DetectionClient, add_detection_servicer,
+                     serve, SERVICE_NAME)
+
+__all__ = ['DetectionServicer', 'DetectionClient', 'add_detection_servicer',
+           'serve', 'SERVICE_NAME']
@@ -0,0 +1,325 @@
+"""
+ADAPT-MAD: gRPC Detection Service
+Bidirectional streams of per-service metric samples in, fused decisions
+out, micro-batched across clients on one MultiServiceDetector
+"""
+
+import json
+import queue
+import threading
+import time
+import numpy as np
+from collections import OrderedDict
+from concurrent import futures
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from ..coordination.coordinator import SystemState
+
+SERVICE_NAME = 'adaptmad.Detection'
+DETECT_METHOD = f'/{SERVICE_NAME}/Detect'
+
+# Messages are JSON objects, so clients need no generated stubs:
+#   request:  {"service", "values": [feature_dim floats], "timestamp",
+#              optional "workload", "cpu", "memory", "recent_fpr",
+#              "recent_fnr", "deployment_active"}
+#   response: {"service", "timestamp", "is_anomaly", "confidence",
+#              "strategy", "scores": {agent_type: score}}
+def serialize(message: Dict) -> bytes:
+    return json.dumps(message, separators=(',', ':')).encode()
+
+def deserialize(payload: bytes) -> Dict:
+    return json.loads(payload)
+
+class _ServiceWindow:
+    """Last window_size samples of one service"""
+    
+    def __init__(self, window_size: int, feature_dim: int):
+        self.buffer = np.zeros((window_size, feature_dim))
+        self.head = 0
+        self.count = 0
+    
+    def push(self, values) -> Optional[np.ndarray]:
+        """Add a sample; returns the ordered window once it is full"""
+        size = len(self.buffer)
+        self.buffer[self.head] = values
+        self.head = (self.head + 1) % size
+        self.count = min(self.count + 1, size)
+        if self.count < size:
+            return None
+        return np.concatenate([self.buffer[self.head:], self.buffer[:self.head]])
+
+class _Pending:
+    __slots__ = ('service', 'window', 'state', 'replies', 'seq')
+    
+    def __init__(self, service: str, window: np.ndarray, state: SystemState,
+                 replies: queue.Queue, seq: int):
+        self.service = service
+        self.window = window
+        self.state = state
+        self.replies = replies
+        # Position among the stream's submitted windows
+        self.seq = seq
+
+_END = object()
+
+class DetectionServicer:
+    """Stream handler and micro-batcher around a MultiServiceDetector
+    
+    Each full window is queued; a single batcher thread drains up to
+    max_batch windows (waiting at most max_delay for stragglers) and runs
+    them through one process_tick. The queue holds at most max_pending
+    windows: when it is full, stream handlers stop reading their request
+    streams, and gRPC flow control pushes back on the clients. Services
+    are registered on first use. Decisions are only emitted once a
+    service has window_size samples.
+    
+    Per-service state (the sample window here and the detector's adaptive
+    state) is forgotten for services that sent nothing for service_ttl
+    seconds, and for the least recently seen ones beyond max_services, so
+    memory stays bounded whatever service names clients send. A forgotten
+    service starts over with a fresh window.
+    """
+    
+    def __init__(self, detector, feature_dim: int, window_size: int = 50,
+                 max_batch: int = 256, max_delay: float = 0.005,
+                 max_pending: int = 1024, max_services: int = 10_000,
+                 service_ttl: Optional[float] = 3600.0):
+        self.detector = detector
+        self.feature_dim = feature_dim
+        self.window_size = window_size
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.default_workload = (detector.T_low + detector.T_high) / 2
+        
+        self._pending: queue.Queue = queue.Queue(maxsize=max_pending)
+        self.max_services = max_services
+        self.service_ttl = service_ttl
+        self._windows: Dict[str, _ServiceWindow] = {}
+        # Monotonic time of each service's last sample, least recent first
+        self._last_seen: 'OrderedDict[str, float]' = OrderedDict()
+        # Queued or in-process windows per service; such services are not evicted
+        self._inflight: Dict[str, int] = {}
+        self.services_evicted = 0
+        self._ingest_lock = threading.Lock()
+        # Separate from _ingest_lock, which is held while blocking on a full
+        # queue: the batcher must be able to release windows to drain it
+        self._inflight_lock = threading.Lock()
+        self._detector_lock = threading.Lock()
+        self._stopped = threading.Event()
+        self.ticks = 0
+        self.windows_processed = 0
+        self._batcher = threading.Thread(target=self._run_batcher, daemon=True)
+        self._batcher.start()
+    
+    def stop(self):
+        self._stopped.set()
+        self._batcher.join()
+    
+    @property
+    def mean_batch_size(self) -> float:
+        return self.windows_processed / self.ticks if self.ticks else 0.0
+    
+    def Detect(self, request_iterator: Iterable[Dict], context) -> Iterator[Dict]:
+        """Bidirectional stream handler; decisions arrive in request order"""
+        replies: queue.Queue = queue.Queue()
+        reader = threading.Thread(
+            target=self._read_stream, args=(request_iterator, replies), daemon=True
+        )
+        reader.start()
+        
+        # Windows of different services may finish in different ticks, so
+        # replies are held until every earlier one has been sent
+        ready: Dict[int, object] = {}
+        sent, expected, error = 0, None, None
+        while expected is None or sent < expected:
+            item = replies.get()
+            if item[0] is _END:
+                _, expected, error = item
+                continue
+            seq, reply = item
+            ready[seq] = reply
+            while sent in ready:
+                reply = ready.pop(sent)
+                sent += 1
+                if isinstance(reply, Exception):
+                    error = error or reply
+                    continue
+                yield reply
+        
+        if error is not None:
+            import grpc
+            code = (grpc.StatusCode.INVALID_ARGUMENT
+                    if isinstance(error, (KeyError, TypeError, ValueError))
+                    else grpc.StatusCode.INTERNAL)
+            context.abort(code, f"{type(error).__name__}: {error}")
+    
+    def _read_stream(self, request_iterator: Iterable[Dict], replies: queue.Queue):
+        submitted, error = 0, None
+        try:
+            for message in request_iterator:
+                if self._ingest(message, replies, submitted):
+                    submitted += 1
+        except Exception as e:
+            # Includes the client cancelling the stream
+            error = e
+        finally:
+            replies.put((_END, submitted, error))
+    
+    def _ingest(self, message: Dict, replies: queue.Queue, seq: int) -> bool:
+        service = message['service']
+        values = np.asarray(message['values'], dtype=float)
+        if values.shape != (self.feature_dim,):
+            raise ValueError(f"Expected {self.feature_dim} values for {service!r}, "
+                             f"got shape {values.shape}")
+        state = SystemState(
+            workload_intensity=float(message.get('workload', self.default_workload)),
+            cpu_utilization=float(message.get('cpu', 0.0)),
+            memory_utilization=float(message.get('memory', 0.0)),
+            recent_fpr=float(message.get('recent_fpr', 0.0)),
+            recent_fnr=float(message.get('recent_fnr', 0.0)),
+            deployment_active=bool(message.get('deployment_active', False)),
+            timestamp=float(message.get('timestamp', time.time())),
+        )
+        
+        # Held while enqueueing so each service's windows stay in order
+        with self._ingest_lock:
+            now = time.monotonic()
+            if service not in self._windows:
+                with self._detector_lock:
+                    self.detector.add_services([service])
+                self._windows[service] = _ServiceWindow(self.window_size, self.feature_dim)
+            self._last_seen[service] = now
+            self._last_seen.move_to_end(service)
+            self._evict(now, service)
+            window = self._windows[service].push(values)
+            if window is None:
+                return False
+            with self._inflight_lock:
+                self._inflight[service] = self._inflight.get(service, 0) + 1
+            self._pending.put(_Pending(service, window, state, replies, seq))
+        return True
+    
+    def _evict(self, now: float, current: str):
+        """Forget idle services and the least recently seen beyond max_services
+        
+        Services with windows in flight, and the one being ingested, are kept
+        even if that leaves more than max_services for a while.
+        """
+        stale = []
+        with self._inflight_lock:
+            for service, seen in self._last_seen.items():
+                over = len(self._last_seen) - len(stale) > self.max_services
+                expired = self.service_ttl is not None and now - seen > self.service_ttl
+                if not (over or expired):
+                    break
+                if service != current and not self._inflight.get(service):
+                    stale.append(service)
+        if not stale:
+            return
+        for service in stale:
+            del self._windows[service], self._last_seen[service]
+        with self._detector_lock:
+            self.detector.remove_services(stale)
+        self.services_evicted += len(stale)
+    
+    def _run_batcher(self):
+        while not self._stopped.is_set():
+            try:
+                first = self._pending.get(timeout=0.1)
+            except queue.Empty:
+                continue
+            batch = [first]
+            deadline = time.monotonic() + self.max_delay
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._pending.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            self._process(batch)
+    
+    def _process(self, batch: List[_Pending]):
+        # A tick may hold each service once; later windows of a service go
+        # to the next tick so its adaptive state advances in order
+        while batch:
+            tick, rest, seen = [], [], set()
+            for item in batch:
+                if item.service in seen:
+                    rest.append(item)
+                else:
+                    seen.add(item.service)
+                    tick.append(item)
+            self._process_tick(tick)
+            batch = rest
+    
+    def _process_tick(self, tick: List[_Pending]):
+        self.ticks += 1
+        self.windows_processed += len(tick)
+        try:
+            with self._detector_lock:
+                is_anomaly, confidence, metadata = self.detector.process_tick(
+                    np.stack([item.window for item in tick]),
+                    [item.state for item in tick],
+                    services=[item.service for item in tick],
+                )
+        except Exception as e:
+            results = [e] * len(tick)
+        else:
+            agent_types = [t.value for t in self.detector.agent_types]
+            results = [{
+                'service': item.service,
+                'timestamp': item.state.timestamp,
+                'is_anomaly': bool(is_anomaly[k]),
+                'confidence': float(confidence[k]),
+                'strategy': metadata['strategy'][k],
+                'scores': dict(zip(agent_types, metadata['scores'][k].tolist())),
+            } for k, item in enumerate(tick)]
+        
+        # Released before replying, so a client holding its replies can
+        # rely on those services being evictable
+        with self._inflight_lock:
+            for item in tick:
+                self._inflight[item.service] -= 1
+                if not self._inflight[item.service]:
+                    del self._inflight[item.service]
+        for item, result in zip(tick, results):
+            item.replies.put((item.seq, result))
+
+def add_detection_servicer(servicer: DetectionServicer, server):
+    """Register the Detect stream on a grpc.Server via a generic handler"""
+    import grpc
+    
+    handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        'Detect': grpc.stream_stream_rpc_method_handler(
+            servicer.Detect, request_deserializer=deserialize,
+            response_serializer=serialize,
+        ),
+    })
+    server.add_generic_rpc_handlers((handler,))
+
+def serve(servicer: DetectionServicer, address: str = '[::]:50051',
+          max_streams: int = 64):
+    """Start a gRPC server; each open stream holds one of max_streams threads
+    
+    Returns (server, bound_port); stop with server.stop(grace).
+    """
+    import grpc
+    
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_streams))
+    add_detection_servicer(servicer, server)
+    port = server.add_insecure_port(address)
+    server.start()
+    return server, port
+
+class DetectionClient:
+    """Thin client: stream samples for any number of services, read decisions"""
+    
+    def __init__(self, channel):
+        self._detect = channel.stream_stream(
+            DETECT_METHOD, request_serializer=serialize, response_deserializer=deserialize
+        )
+    
+    def detect(self, samples: Iterable[Dict]) -> Iterator[Dict]:
+        return self._detect(iter(samples))
@@ -0,0 +1,6 @@
+"""ADAPT-MAD Training"""
+from .trainer import SlidingWindowDataset, Trainer, TrainingConfig, train_agents
+from .online import OnlineUpdater
+
+__all__ = ['SlidingWindowDataset', 'Trainer', 'TrainingConfig', 'train_agents',
+           'OnlineUpdater']
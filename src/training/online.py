@@ -0,0 +1,181 @@
+"""
+ADAPT-MAD: Online Model Updating
+Background fine-tuning of agent detectors on recent normal windows
+"""
+
+import copy
+import threading
+import time
+import numpy as np
+import torch
+import torch.nn as nn
+from typing import Dict, List, Optional
+
+class OnlineUpdater:
+    """Continual fine-tuning for a set of agents off the detection thread
+    
+    The detection thread calls observe() once per tick. Windows the
+    coordinator classified as normal are copied into a bounded replay
+    buffer (preallocated and shared by all agents). A background thread
+    trains a private shadow copy of each agent's detector, a few
+    mini-batches at a time, and publishes the result with
+    DetectionAgent.swap_model. Detection never waits on training. The only
+    shared step is a short lock around one window copy into the buffer.
+    
+    In background mode, training sleeps between steps so it uses at most
+    duty_cycle of a core. This keeps detection tail latency flat when the
+    two share CPUs.
+    
+    A deployment invalidates the old baseline: the first tick with
+    deployment_active clears the buffer, so updates fit the new behaviour
+    as soon as min_windows post-deployment windows have been seen.
+    
+    With a schema (agents.MetricSchema, e.g. the coordinator's), observed
+    windows are in schema column order (feature_dim == len(schema)) and are
+    buffered once; each agent trains on its own column view of them.
+    """
+    
+    def __init__(self, agents: List, window_size: int, feature_dim: int,
+                 buffer_size: int = 2048, batch_size: int = 32,
+                 steps_per_update: int = 4, learning_rate: float = 1e-4,
+                 min_windows: int = 64, min_interval: float = 1.0,
+                 duty_cycle: float = 0.25, seed: Optional[int] = None,
+                 schema=None):
+        if schema is not None and feature_dim != len(schema):
+            raise ValueError(f"feature_dim ({feature_dim}) must equal the schema width "
+                             f"({len(schema)}) when a schema is given")
+        self.agents = agents
+        self.schema = schema
+        self.batch_size = batch_size
+        self.steps_per_update = steps_per_update
+        self.learning_rate = learning_rate
+        self.min_windows = min_windows
+        self.min_interval = min_interval
+        self.duty_cycle = duty_cycle
+        
+        self._buffer = np.zeros((buffer_size, window_size, feature_dim))
+        self._head = 0
+        self._count = 0
+        self._lock = threading.Lock()
+        self._rng = np.random.default_rng(seed)
+        self._deploying = False
+        
+        self._shadows: Dict[int, nn.Module] = {}
+        self._optimizers: Dict[int, torch.optim.Optimizer] = {}
+        self.updates = 0
+        self.last_loss: Dict[str, float] = {}
+        
+        self._new_data = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def observe(self, window: np.ndarray, is_anomaly: bool,
+                deployment_active: bool = False):
+        """Record one tick's window and fused decision"""
+        if deployment_active and not self._deploying:
+            self.clear()
+        self._deploying = deployment_active
+        if is_anomaly:
+            return
+        with self._lock:
+            self._buffer[self._head] = window
+            self._head = (self._head + 1) % len(self._buffer)
+            self._count = min(self._count + 1, len(self._buffer))
+        self._new_data.set()
+    
+    def clear(self):
+        with self._lock:
+            self._head = 0
+            self._count = 0
+    
+    def _sample(self) -> Optional[np.ndarray]:
+        with self._lock:
+            if self._count < self.min_windows:
+                return None
+            indices = self._rng.integers(0, self._count, size=self.batch_size)
+            return self._buffer[indices]
+    
+    def update_once(self) -> bool:
+        """Run steps_per_update training steps per agent and publish the weights
+        
+        Returns False (and trains nothing) while the buffer holds fewer
+        than min_windows windows.
+        """
+        trained = False
+        for agent in self.agents:
+            key = id(agent)
+            if key not in self._shadows:
+                self._shadows[key] = copy.deepcopy(agent.float_model())
+                self._optimizers[key] = torch.optim.Adam(
+                    self._shadows[key].parameters(), lr=self.learning_rate)
+            shadow, optimizer = self._shadows[key], self._optimizers[key]
+            
+            shadow.train()
+            loss = None
+            for _ in range(self.steps_per_update):
+                windows = self._sample()
+                if windows is None:
+                    break
+                start = time.perf_counter()
+                if self.schema is not None:
+                    windows = self.schema.view(windows, agent.agent_type)
+                x = torch.as_tensor(agent.extract_features_batch(windows),
+                                    dtype=torch.float32, device=agent.device)
+                optimizer.zero_grad()
+                loss = nn.functional.mse_loss(shadow(x), x)
+                loss.backward()
+                optimizer.step()
+                self._throttle(time.perf_counter() - start)
+            shadow.eval()
+            if loss is None:
+                continue
+            
+            # The shadow keeps training, so publish a frozen copy
+            agent.swap_model(copy.deepcopy(shadow))
+            self.last_loss[agent.agent_type.value] = loss.item()
+            trained = True
+        
+        if trained:
+            self.updates += 1
+        return trained
+    
+    def _throttle(self, busy: float):
+        if threading.current_thread() is self._thread and self.duty_cycle < 1.0:
+            self._stopped.wait(busy * (1.0 / self.duty_cycle - 1.0))
+    
+    def start(self):
+        """Fine-tune in a daemon thread until stop()"""
+        if self._thread is not None:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stopped.set()
+        self._new_data.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self):
+        last_update = 0.0
+        while not self._stopped.is_set():
+            self._new_data.wait(timeout=0.5)
+            self._new_data.clear()
+            wait = self.min_interval - (time.monotonic() - last_update)
+            if wait > 0 and self._stopped.wait(wait):
+                break
+            if self.update_once():
+                last_update = time.monotonic()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,183 @@
+"""
+ADAPT-MAD: Detector Training
+Mini-batch reconstruction training for agent LSTMDetectors
+"""
+
+import copy
+import numpy as np
+import torch
+import torch.nn as nn
+import yaml
+from dataclasses import dataclass, fields
+from torch.utils.data import DataLoader, Dataset, RandomSampler
+from typing import Dict, List, Optional
+
+from ..agents.checkpoint import save_checkpoint
+
+class SlidingWindowDataset(Dataset):
+    """Sliding windows over a (time, features) array, built on access
+    
+    Windows are sliced and normalized per item, so the full set of windows
+    is never materialized; data may be a np.memmap.
+    """
+    
+    def __init__(self, data: np.ndarray, window_size: int, agent,
+                 start: int = 0, stop: Optional[int] = None, stride: int = 1):
+        self.data = data
+        self.window_size = window_size
+        self.agent = agent
+        self.start = start
+        self.stop = len(data) if stop is None else stop
+        self.stride = stride
+    
+    def __len__(self) -> int:
+        span = self.stop - self.start - self.window_size
+        return max(0, span // self.stride + 1)
+    
+    def __getitem__(self, index: int) -> torch.Tensor:
+        begin = self.start + index * self.stride
+        window = np.asarray(self.data[begin:begin + self.window_size], dtype=float)
+        features = self.agent.extract_features(window)
+        return torch.as_tensor(features, dtype=torch.float32)
+
+@dataclass
+class TrainingConfig:
+    learning_rate: float = 0.001
+    batch_size: int = 32
+    epochs: int = 50
+    patience: int = 5
+    min_delta: float = 0.0
+    train_split: float = 0.70
+    val_split: float = 0.15
+    stride: int = 1
+    samples_per_epoch: Optional[int] = None
+    num_workers: int = 2
+    checkpoint_dir: str = 'checkpoints'
+    
+    @classmethod
+    def from_dict(cls, config: Dict) -> 'TrainingConfig':
+        """Build from a parsed configs/*.yaml (model, dataset and training sections)"""
+        known = {f.name for f in fields(cls)}
+        values = {}
+        for section in ('dataset', 'model', 'training'):
+            for key, value in (config.get(section) or {}).items():
+                if key in known:
+                    values[key] = value
+        return cls(**values)
+    
+    @classmethod
+    def from_yaml(cls, path: str) -> 'TrainingConfig':
+        with open(path) as f:
+            return cls.from_dict(yaml.safe_load(f) or {})
+
+class Trainer:
+    """Trains one agent's detector with early stopping and checkpointing"""
+    
+    def __init__(self, agent, config: Optional[TrainingConfig] = None):
+        self.agent = agent
+        self.config = config or TrainingConfig()
+    
+    def _loader(self, dataset: Dataset, shuffle: bool) -> DataLoader:
+        cfg = self.config
+        sampler = None
+        if shuffle and cfg.samples_per_epoch and cfg.samples_per_epoch < len(dataset):
+            sampler = RandomSampler(dataset, num_samples=cfg.samples_per_epoch)
+            shuffle = False
+        return DataLoader(
+            dataset, batch_size=cfg.batch_size, shuffle=shuffle, sampler=sampler,
+            num_workers=cfg.num_workers, persistent_workers=cfg.num_workers > 0
+        )
+    
+    def fit(self, data: np.ndarray) -> Dict:
+        """Train on the chronological train split, stop early on validation loss
+        
+        Returns the per-epoch history, the best validation loss and the
+        path of the checkpoint written for the best weights.
+        """
+        cfg = self.config
+        agent = self.agent
+        n = len(data)
+        train_end = int(n * cfg.train_split)
+        val_end = train_end + int(n * cfg.val_split)
+        
+        train_set = SlidingWindowDataset(data, agent.window_size, agent, 0, train_end, cfg.stride)
+        val_set = SlidingWindowDataset(data, agent.window_size, agent, train_end, val_end, cfg.stride)
+        if len(train_set) == 0 or len(val_set) == 0:
+            raise ValueError(
+                f"Not enough samples ({n}) for window_size={agent.window_size} "
+                f"with train/val splits {cfg.train_split}/{cfg.val_split}")
+        
+        train_loader = self._loader(train_set, shuffle=True)
+        val_loader = self._loader(val_set, shuffle=False)
+        
+        model = agent.float_model()
+        optimizer = torch.optim.Adam(model.parameters(), lr=cfg.learning_rate)
+        criterion = nn.MSELoss()
+        
+        best_loss = float('inf')
+        best_state = copy.deepcopy(model.state_dict())
+        bad_epochs = 0
+        history: List[Dict[str, float]] = []
+        
+        for epoch in range(cfg.epochs):
+            model.train()
+            train_loss, seen = 0.0, 0
+            for x in train_loader:
+                x = x.to(agent.device)
+                optimizer.zero_grad()
+                loss = criterion(model(x), x)
+                loss.backward()
+                optimizer.step()
+                train_loss += loss.item() * len(x)
+                seen += len(x)
+            
+            val_loss = self.evaluate(val_loader)
+            history.append({'epoch': epoch, 'train_loss': train_loss / max(seen, 1),
+                            'val_loss': val_loss})
+            
+            if val_loss < best_loss - cfg.min_delta:
+                best_loss = val_loss
+                best_state = copy.deepcopy(model.state_dict())
+                bad_epochs = 0
+            else:
+                bad_epochs += 1
+                if bad_epochs >= cfg.patience:
+                    break
+        
+        model.load_state_dict(best_state)
+        model.eval()
+        if agent.backend is not None:
+            agent.set_backend(agent.backend_name)
+        path = save_checkpoint(
+            agent, cfg.checkpoint_dir,
+            val_loss=best_loss, epochs=len(history), learning_rate=cfg.learning_rate
+        )
+        agent.checkpoint_version = int(path.stem[1:])
+        return {'history': history, 'best_val_loss': best_loss, 'checkpoint': str(path)}
+    
+    def evaluate(self, loader: DataLoader) -> float:
+        """Mean reconstruction error over a loader"""
+        model = self.agent.float_model()
+        model.eval()
+        total, seen = 0.0, 0
+        criterion = nn.MSELoss(reduction='sum')
+        with torch.no_grad():
+            for x in loader:
+                x = x.to(self.agent.device)
+                total += criterion(model(x), x).item()
+                seen += x.numel()
+        return total / max(seen, 1)
+
+def train_agents(agents: List, data: np.ndarray,
+                 config: Optional[TrainingConfig] = None,
+                 schema=None) -> Dict[str, Dict]:
+    """Train every agent type on the same trace
+    
+    With an agents.MetricSchema, data is in schema column order and each
+    agent trains on its own column view.
+    """
+    return {
+        agent.agent_type.value: Trainer(agent, config).fit(
+            data if schema is None else schema.view(data, agent.agent_type))
+        for agent in agents
+    }
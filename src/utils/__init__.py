@@ -0,0 +1,6 @@
+"""ADAPT-MAD Utilities"""
+from .rolling_stats import RollingWindowStats
+from .ring_buffer import RingBuffer, RollingRate
+from .clock import WallClock, SimulatedClock
+
+__all__ = ['RollingWindowStats', 'RingBuffer', 'RollingRate', 'WallClock', 'SimulatedClock']
@@ -0,0 +1,44 @@
+"""
+ADAPT-MAD: Clocks
+Seconds sources for time-based coordination logic (strategy time
+accounting, lenient-mode deadlines, result timestamps)
+"""
+
+import time
+
+class WallClock:
+    """Real time; observed timestamps are ignored"""
+    
+    def __call__(self) -> float:
+        return time.time()
+    
+    def observe(self, timestamp: float):
+        pass
+
+class SimulatedClock:
+    """Time driven by the data: reads return the latest observed timestamp
+    
+    Components holding this clock call observe(state.timestamp) as each
+    tick arrives, so deadlines and durations follow the trace rather than
+    the wall clock and a week of history replays at CPU speed. Time never
+    moves backwards; late or out-of-order timestamps are ignored.
+    """
+    
+    def __init__(self, start: float = 0.0):
+        self.now = float(start)
+    
+    def __call__(self) -> float:
+        return self.now
+    
+    def observe(self, timestamp: float):
+        if timestamp > self.now:
+            self.now = float(timestamp)
+    
+    def advance(self, seconds: float):
+        self.now += seconds
+
+def observe_time(clock, timestamp: float):
+    """Feed a tick timestamp to clocks that follow data (plain callables ignore it)"""
+    observe = getattr(clock, 'observe', None)
+    if observe is not None:
+        observe(timestamp)
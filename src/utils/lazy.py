@@ -0,0 +1,36 @@
+"""
+ADAPT-MAD: Lazy Exports
+Package attributes imported on first access (PEP 562)
+"""
+
+import importlib
+import sys
+from typing import Callable, Dict, List, Tuple
+
+def lazy_exports(package: str, exports: Dict[str, str]) -> Tuple[Callable, Callable]:
+    """Module-level __getattr__ and __dir__ for a package __init__
+    
+    exports maps each public name to the relative module that defines it,
+    as '.module' (the name is the module itself or an attribute of the
+    same name) or '.module:attribute' (an alias). Nothing is imported until
+    the name is first used; the value is then cached on the package.
+    """
+    def __getattr__(name: str):
+        target = exports.get(name)
+        if target is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        module_name, _, attribute = target.partition(':')
+        module = importlib.import_module(module_name, package)
+        if attribute:
+            value = getattr(module, attribute)
+        elif module_name.lstrip('.').rpartition('.')[2] == name:
+            value = module
+        else:
+            value = getattr(module, name)
+        setattr(sys.modules[package], name, value)
+        return value
+    
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(exports))
+    
+    return __getattr__, __dir__
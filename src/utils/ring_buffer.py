@@ -0,0 +1,101 @@
+"""
+ADAPT-MAD: Ring Buffers
+Preallocated histories: structured-array records and windowed 0/1 rates
+"""
+
+import numpy as np
+from typing import Tuple
+
+class RingBuffer:
+    """Fixed-capacity ring of numpy structured records
+    
+    Storage is allocated once; appends write in place and never create
+    Python objects. There is a single writer. Readers on other threads
+    call latest(n), which copies only the requested records and retries
+    if the writer lapped them mid-copy, so no lock is taken on either
+    side.
+    """
+    
+    def __init__(self, capacity: int, dtype):
+        self.capacity = capacity
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(capacity, dtype=self.dtype)
+        # Records ever started (_claimed) and finished (_written); the writer
+        # bumps _claimed before touching a slot and _written after
+        self._claimed = 0
+        self._written = 0
+    
+    def __len__(self) -> int:
+        return min(self._written, self.capacity)
+    
+    @property
+    def written(self) -> int:
+        return self._written
+    
+    def append(self, record: Tuple):
+        self._claimed = self._written + 1
+        self._data[self._written % self.capacity] = record
+        self._written = self._claimed
+    
+    def extend(self, records: np.ndarray):
+        """Append a structured array (or anything convertible to one)"""
+        records = np.asarray(records, dtype=self.dtype)
+        total = len(records)
+        if total == 0:
+            return
+        records = records[-self.capacity:]
+        n = len(records)
+        self._claimed = self._written + total
+        start = (self._claimed - n) % self.capacity
+        first = min(n, self.capacity - start)
+        self._data[start:start + first] = records[:first]
+        self._data[:n - first] = records[first:]
+        self._written = self._claimed
+    
+    def views(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Zero-copy (older, newer) views in write order; only stable on the writer thread"""
+        if self._written <= self.capacity:
+            return self._data[:self._written], self._data[:0]
+        head = self._written % self.capacity
+        return self._data[head:], self._data[:head]
+    
+    def latest(self, n: int = None) -> np.ndarray:
+        """Copy of the last n records (all when None), oldest first; safe from any thread"""
+        while True:
+            end = self._written
+            count = min(end, self.capacity) if n is None else min(n, end, self.capacity)
+            start = end - count
+            out = self._data[np.arange(start, end) % self.capacity]
+            # Valid unless the writer claimed slots of [start, end) while copying
+            if self._claimed - start <= self.capacity:
+                return out
+    
+    def clear(self):
+        self._claimed = self._written = 0
+
+class RollingRate:
+    """Mean of the last maxlen 0/1 outcomes with an O(1) running sum"""
+    
+    def __init__(self, maxlen: int = 100):
+        self.maxlen = maxlen
+        self._values = np.zeros(maxlen, dtype=np.int8)
+        self._pos = 0
+        self._count = 0
+        self._total = 0
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def append(self, value):
+        value = int(bool(value))
+        self._total += value - int(self._values[self._pos])
+        self._values[self._pos] = value
+        self._pos = (self._pos + 1) % self.maxlen
+        self._count = min(self._count + 1, self.maxlen)
+    
+    def mean(self) -> float:
+        return self._total / self._count if self._count else 0.0
+    
+    def clear(self):
+        self._values[:] = 0
+        self._pos = self._count = self._total = 0
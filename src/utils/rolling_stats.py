@@ -0,0 +1,133 @@
+"""
+ADAPT-MAD: Rolling Window Statistics
+Incremental per-feature moments and percentiles over a sliding window
+"""
+
+import numpy as np
+from typing import Iterable, Optional
+
+class RollingWindowStats:
+    """Sliding-window mean/std/percentiles shared between agents
+    
+    Moments use Welford-style O(feature_dim) add/replace updates. When
+    percentiles are subscribed, a per-feature sorted copy of the window is
+    kept and updated with one vectorized remove/insert per sample (no
+    re-sorting), so percentiles are exact and match np.percentile.
+    Inputs are assumed finite.
+    """
+    
+    def __init__(self, window_size: int, feature_dim: int):
+        self.window_size = window_size
+        self.feature_dim = feature_dim
+        self.percentiles = set()
+        self.reset()
+    
+    def reset(self, window: Optional[np.ndarray] = None):
+        """Clear the window, or rebuild it exactly from a full window"""
+        self._buffer = np.zeros((self.window_size, self.feature_dim))
+        self._head = 0
+        self.count = 0
+        self._mean = np.zeros(self.feature_dim)
+        self._m2 = np.zeros(self.feature_dim)
+        self._sorted = np.empty((0, self.feature_dim)) if self.percentiles else None
+        
+        if window is not None:
+            window = np.asarray(window, dtype=float)[-self.window_size:]
+            n = len(window)
+            self._buffer[:n] = window
+            self._head = n % self.window_size
+            self.count = n
+            self._mean = window.mean(axis=0)
+            self._m2 = ((window - self._mean) ** 2).sum(axis=0)
+            if self.percentiles:
+                self._sorted = np.sort(window, axis=0)
+    
+    def subscribe(self, percentiles: Iterable[float]):
+        """Register percentiles (0-100) a consumer will read"""
+        percentiles = set(percentiles)
+        if percentiles and self._sorted is None:
+            self._sorted = np.sort(self.window(), axis=0)
+        self.percentiles |= percentiles
+    
+    def update(self, sample: np.ndarray):
+        """Slide the window by one sample"""
+        x = np.asarray(sample, dtype=float)
+        
+        if self.count < self.window_size:
+            self.count += 1
+            delta = x - self._mean
+            self._mean = self._mean + delta / self.count
+            self._m2 = self._m2 + delta * (x - self._mean)
+            if self._sorted is not None:
+                self._sorted = _sorted_insert(self._sorted, x)
+        else:
+            old = self._buffer[self._head].copy()
+            old_mean = self._mean
+            self._mean = old_mean + (x - old) / self.count
+            self._m2 = self._m2 + (x - old) * (x - self._mean + old - old_mean)
+            if self._sorted is not None:
+                self._sorted = _sorted_insert(_sorted_remove(self._sorted, old), x)
+        
+        self._buffer[self._head] = x
+        self._head = (self._head + 1) % self.window_size
+    
+    def window(self) -> np.ndarray:
+        """Current window in chronological order"""
+        if self.count < self.window_size:
+            return self._buffer[:self.count].copy()
+        return np.concatenate([self._buffer[self._head:], self._buffer[:self._head]])
+    
+    def latest(self, k: int) -> np.ndarray:
+        """(k, feature_dim) newest samples in chronological order (k <= count)"""
+        return self._buffer[(self._head - k + np.arange(k)) % self.window_size]
+    
+    @property
+    def peak(self) -> np.ndarray:
+        """Largest magnitude per feature in the window"""
+        if self._sorted is not None and self.count:
+            return np.maximum(np.abs(self._sorted[0]), np.abs(self._sorted[self.count - 1]))
+        return np.abs(self._buffer[:self.count]).max(axis=0, initial=0.0)
+    
+    @property
+    def mean(self) -> np.ndarray:
+        return self._mean
+    
+    @property
+    def var(self) -> np.ndarray:
+        if self.count == 0:
+            return np.zeros(self.feature_dim)
+        return np.maximum(self._m2 / self.count, 0.0)
+    
+    @property
+    def std(self) -> np.ndarray:
+        return np.sqrt(self.var)
+    
+    def percentile(self, q: float) -> np.ndarray:
+        """Linear-interpolated percentile per feature (np.percentile default)"""
+        if q not in self.percentiles:
+            raise KeyError(f"percentile {q} not subscribed")
+        if self.count == 0:
+            raise ValueError("window is empty")
+        
+        h = (self.count - 1) * q / 100.0
+        lo = int(np.floor(h))
+        hi = min(lo + 1, self.count - 1)
+        return self._sorted[lo] + (h - lo) * (self._sorted[hi] - self._sorted[lo])
+
+def _sorted_insert(sorted_window: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Insert one value per column into a column-wise sorted array"""
+    n = len(sorted_window)
+    if n == 0:
+        return x[np.newaxis].copy()
+    pos = (sorted_window < x).sum(axis=0)
+    rows = np.arange(n + 1)[:, np.newaxis]
+    src = np.minimum(rows - (rows > pos), n - 1)
+    shifted = np.take_along_axis(sorted_window, src, axis=0)
+    return np.where(rows == pos, x, shifted)
+
+def _sorted_remove(sorted_window: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """Remove one occurrence of a value per column from a column-wise sorted array"""
+    idx = np.argmax(sorted_window == x, axis=0)
+    rows = np.arange(len(sorted_window) - 1)[:, np.newaxis]
+    src = rows + (rows >= idx)
+    return np.take_along_axis(sorted_window, src, axis=0)
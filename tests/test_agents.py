@@ -4,7 +4,10 @@ import numpy as np
 import sys
 sys.path.insert(0, 'src')
 
-from src.agents import LatencyDetectionAgent, AgentType
+from src.agents import LatencyDetectionAgent, AgentType, MetricSchema, AGENT_CLASSES
+from src.agents.checkpoint import save_checkpoint
+from src.agents.features import StreamSignals, WindowSignals
+from src.utils import RollingWindowStats
 
 class TestAgents:
     def test_agent_initialization(self):
@@ -28,3 +31,183 @@ class TestAgents:
         
         agent.update_performance(is_correct=True)
         assert agent.weight >= initial_weight
+    
+    def test_detect_batch_matches_detect(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        windows = np.random.randn(8, 50, 10)
+        
+        looped = [agent.detect(w) for w in windows]
+        batched = agent.detect_batch(windows)
+        
+        assert len(batched) == len(looped)
+        np.testing.assert_allclose(
+            [r.score for r in batched], [r.score for r in looped], rtol=1e-4
+        )
+        assert [r.is_anomaly for r in batched] == [r.is_anomaly for r in looped]
+    
+    def test_detect_stream(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        samples = np.random.randn(60, 10)
+        
+        results = [agent.detect_stream(s) for s in samples]
+        assert all(r is None for r in results[:49])
+        assert all(r is not None for r in results[49:])
+        
+        # The first full window is a resync, identical to a full detect
+        full = agent.detect(samples[:50])
+        assert results[49].score == pytest.approx(full.score, rel=1e-4)
+    
+    @pytest.mark.parametrize('agent_type', list(AgentType))
+    def test_stream_features_are_incremental(self, agent_type):
+        agent = AGENT_CLASSES[agent_type](feature_dim=4, window_size=20)
+        assert agent.input_dim > agent.feature_dim
+        samples = np.cumsum(np.random.randn(30, 4), axis=0)
+        for sample in samples[:20]:
+            agent.detect_stream(sample)
+        
+        # Between resyncs the full-window feature path must not run
+        calls = []
+        agent.extract_features = lambda *args, **kwargs: calls.append(args)
+        for sample in samples[20:]:
+            assert agent.detect_stream(sample) is not None
+            stats = agent._stream_stats
+            row = agent.feature_pipeline.transform(StreamSignals(stats))[0, -1]
+            expected = type(agent).extract_features(agent, stats.window())[-1]
+            np.testing.assert_allclose(row, expected, atol=1e-10)
+        assert not calls
+    
+    def test_detect_with_shared_stats(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        window = np.random.randn(50, 10)
+        stats = RollingWindowStats(window_size=50, feature_dim=10)
+        agent.subscribe(stats)
+        for sample in window:
+            stats.update(sample)
+        
+        shared = agent.detect(window, stats)
+        plain = agent.detect(window)
+        assert shared.score == pytest.approx(plain.score, rel=1e-4)
+    
+    @pytest.mark.parametrize('backend', ['torchscript', 'onnxruntime'])
+    def test_backend_parity(self, backend):
+        if backend == 'onnxruntime':
+            pytest.importorskip('onnxruntime')
+        eager = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        compiled = LatencyDetectionAgent(feature_dim=10, window_size=50, backend=backend)
+        compiled.model.load_state_dict(eager.model.state_dict())
+        compiled.set_backend(backend)
+        
+        windows = np.random.randn(4, 50, 10)
+        expected = [r.score for r in eager.detect_batch(windows)]
+        actual = [r.score for r in compiled.detect_batch(windows)]
+        np.testing.assert_allclose(actual, expected, rtol=1e-4)
+    
+    def test_compact_mode(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        compact = LatencyDetectionAgent(feature_dim=10, window_size=50, compact=True)
+        compact.model.load_state_dict(agent.model.state_dict())
+        compact.set_backend('quantized')
+        assert compact.backend_name == 'quantized'
+        
+        windows = np.random.randn(4, 50, 10)
+        assert compact.extract_features_batch(windows).dtype == np.float32
+        assert compact.extract_features(windows[0]).dtype == np.float32
+        expected = [r.score for r in agent.detect_batch(windows)]
+        actual = [r.score for r in compact.detect_batch(windows)]
+        np.testing.assert_allclose(actual, expected, rtol=0.05)
+        
+        sizes = compact.model_nbytes()
+        assert sizes['served'] < sizes['float'] / 2
+        assert sizes['resident'] == sizes['served'] + sizes['float']
+    
+    def test_serving_only_compact_keeps_int8_weights(self, tmp_path):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        save_checkpoint(agent, tmp_path)
+        serving = LatencyDetectionAgent(feature_dim=10, window_size=50, compact=True,
+                                        serving_only=True, checkpoint=str(tmp_path))
+        assert serving.model is None
+        sizes = serving.model_nbytes()
+        assert sizes['float'] == 0
+        assert sizes['resident'] < agent.model_nbytes()['resident'] / 2
+        
+        windows = np.random.randn(4, 50, 10)
+        expected = [r.score for r in agent.detect_batch(windows)]
+        actual = [r.score for r in serving.detect_batch(windows)]
+        np.testing.assert_allclose(actual, expected, rtol=0.05)
+        
+        stream = np.random.randn(60, 10)
+        results = [serving.detect_stream(sample) for sample in stream]
+        assert results[-1] is not None
+        with pytest.raises(RuntimeError, match='serving-only'):
+            save_checkpoint(serving, tmp_path)
+        # Reloading materializes the float weights only for the load
+        serving.load_checkpoint(str(tmp_path))
+        assert serving.model is None
+    
+    def test_detection_history_records(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        results = agent.detect_batch(np.random.randn(3, 50, 10))
+        
+        history = agent.detection_history.latest()
+        assert len(history) == 3
+        np.testing.assert_allclose(history['score'], [r.score for r in results])
+        np.testing.assert_array_equal(history['is_anomaly'], [r.is_anomaly for r in results])
+        assert not hasattr(results[0], '__dict__')
+    
+    def test_metric_schema(self):
+        columns = ['cpu', 'latency_p50', 'errors', 'latency_p99', 'mem']
+        schema = MetricSchema.from_patterns(columns, {
+            AgentType.LATENCY: ['latency_*'],
+            AgentType.RESOURCE: ['cpu', 'mem'],
+        })
+        assert schema.columns == ['latency_p50', 'latency_p99', 'cpu', 'mem']
+        assert schema.feature_dim(AgentType.RESOURCE) == 2
+        
+        window = schema.reorder(np.random.randn(50, 5), columns)
+        view = schema.view(window, AgentType.RESOURCE)
+        assert view.shape == (50, 2) and np.shares_memory(view, window)
+        
+        with pytest.raises(ValueError):
+            MetricSchema({AgentType.LATENCY: ['a'], AgentType.RESOURCE: ['a']})
+    
+    def test_agent_classes(self):
+        assert set(AGENT_CLASSES) == set(AgentType)
+        for agent_type, cls in AGENT_CLASSES.items():
+            agent = cls(feature_dim=4, window_size=20, hidden_dim=8)
+            assert agent.agent_type == agent_type
+            assert agent.detect(np.random.randn(20, 4)).agent_type == agent_type
+    
+    def test_feature_pipelines_keep_the_newest_row(self):
+        window = np.random.randn(20, 4) * 5 + 100
+        normalized = (window - window.mean(axis=0)) / (window.std(axis=0) + 1e-8)
+        agent = LatencyDetectionAgent(feature_dim=4, window_size=20)
+        features = agent.extract_features(window)
+        assert features.shape == (20, agent.input_dim) and agent.input_dim == 16
+        np.testing.assert_allclose(features[:, :4], normalized)
+    
+    def test_shared_signals_are_computed_once(self):
+        windows = np.random.randn(8, 20, 4)
+        throughput, errors = (AGENT_CLASSES[t](feature_dim=4, window_size=20)
+                              for t in (AgentType.THROUGHPUT, AgentType.ERROR_RATE))
+        signals = WindowSignals(windows)
+        throughput.extract_features_batch(windows, signals)
+        computed = signals.computed
+        features = errors.extract_features_batch(windows, signals)
+        assert signals.computed == computed  # mean, std and diff reused
+        np.testing.assert_allclose(features, errors.extract_features_batch(windows))
+    
+    def test_mixed_dtype_agents_share_signals(self):
+        windows = np.random.randn(8, 20, 4)
+        throughput = AGENT_CLASSES[AgentType.THROUGHPUT](feature_dim=4, window_size=20)
+        errors = AGENT_CLASSES[AgentType.ERROR_RATE](feature_dim=4, window_size=20, compact=True)
+        signals = WindowSignals(windows)
+        throughput.extract_features_batch(windows, signals)
+        computed = signals.computed
+        # The float32 agent reads the float64 signals, cast once
+        features = errors.extract_features_batch(windows, signals)
+        assert signals.computed == computed
+        assert features.dtype == np.float32
+        np.testing.assert_allclose(features, errors.extract_features_batch(windows),
+                                   rtol=1e-4, atol=1e-5)
+        assert signals.astype(np.float32) is signals.columns(slice(None)).astype(np.float32).parent
+
@@ -1,11 +1,21 @@
 """Test coordination layer"""
+import os
 import pytest
+import threading
+import time
 import numpy as np
 import sys
 sys.path.insert(0, 'src')
 
-from src.agents import LatencyDetectionAgent
-from src.coordination import AdaptiveCoordinator, SystemState, CollaborationStrategy
+from src.agents import (LatencyDetectionAgent, DetectionAgent, AgentType,
+                        DetectionResult, MetricSchema)
+from src.agents.features import WindowSignals
+from src.utils.clock import SimulatedClock
+from src.coordination import (
+    AdaptiveCoordinator, SystemState, CollaborationStrategy, SharedSignalEngine,
+    DetectionRunner, DecisionFusionEngine, MultiServiceDetector, AsyncDetectionPipeline,
+    PipelineConfig, build_pipeline, IncidentGrouper, PreScreen
+)
 
 class TestCoordination:
     def test_coordinator_initialization(self):
@@ -30,3 +40,314 @@ class TestCoordination:
         
         strategy = coordinator.select_strategy(state)
         assert strategy == CollaborationStrategy.HIERARCHICAL
+    
+    def test_shared_engine_matches_agents(self):
+        agents = [
+            LatencyDetectionAgent(feature_dim=10, window_size=50),
+            LatencyDetectionAgent(feature_dim=10, window_size=50, hidden_dim=32),
+        ]
+        coordinator = AdaptiveCoordinator(agents)
+        engine = SharedSignalEngine(coordinator)
+        window = np.random.randn(50, 10)
+        
+        shared = engine.detect(window)
+        separate = [agent.detect(window) for agent in agents]
+        
+        assert len(shared) == len(agents)
+        for f, s in zip(shared, separate):
+            assert f.agent_type == s.agent_type
+            assert f.score == pytest.approx(s.score, rel=1e-4)
+    
+    def test_schema_routes_column_views(self):
+        schema = MetricSchema({AgentType.LATENCY: ['p50', 'p99'],
+                               AgentType.ERROR_RATE: ['errors', 'timeouts', 'retries']})
+        agents = [
+            LatencyDetectionAgent(feature_dim=2, window_size=50),
+            DetectionAgent(AgentType.ERROR_RATE, feature_dim=3, window_size=50),
+        ]
+        coordinator = AdaptiveCoordinator(agents, schema=schema)
+        window = np.random.randn(50, 5)
+        
+        views = coordinator.agent_windows(window)
+        assert [v.shape[1] for v in views] == [2, 3]
+        assert all(np.shares_memory(v, window) for v in views)
+        
+        shared = SharedSignalEngine(coordinator).detect(window)
+        for f, agent, view in zip(shared, agents, views):
+            assert f.score == pytest.approx(agent.detect(view).score, rel=1e-4)
+    
+    def test_detection_runner(self):
+        agents = [LatencyDetectionAgent(feature_dim=10, window_size=50) for _ in range(3)]
+        coordinator = AdaptiveCoordinator(agents)
+        state = SystemState(
+            workload_intensity=2000.0, cpu_utilization=0.5,
+            memory_utilization=0.5, recent_fpr=0.05, recent_fnr=0.05,
+            deployment_active=False, timestamp=0.0
+        )
+        
+        torch = pytest.importorskip('torch')
+        threads = torch.get_num_threads()
+        # Differs from any threads_per_worker, so the restore is observable
+        torch.set_num_threads(os.cpu_count() + 1)
+        with DetectionRunner(coordinator, max_workers=2, deadline=5.0) as runner:
+            assert torch.get_num_threads() == runner.threads_per_worker
+            results, missed = runner.run(np.random.randn(50, 10))
+            assert len(results) == 3 and not missed
+            
+            is_anomaly, confidence, metadata = runner.run_and_coordinate(
+                np.random.randn(50, 10), state
+            )
+            assert metadata['missed_agents'] == []
+        # The process-wide thread count is restored on exit
+        assert torch.get_num_threads() == os.cpu_count() + 1
+        torch.set_num_threads(threads)
+    
+    def test_runner_drops_late_calls(self):
+        slow, fast = (LatencyDetectionAgent(feature_dim=10, window_size=50) for _ in range(2))
+        forward = slow._forward_last
+        finished = threading.Event()
+        
+        def late_forward(features):
+            time.sleep(0.2)
+            try:
+                return forward(features)
+            finally:
+                finished.set()
+        
+        slow._forward_last = late_forward
+        for _ in range(20):
+            slow.recent_fpr.append(1)  # alpha would step on every scored call
+        coordinator = AdaptiveCoordinator([slow, fast])
+        with DetectionRunner(coordinator, max_workers=2, deadline=0.05) as runner:
+            results, missed = runner.run(np.random.randn(50, 10))
+            assert missed == [AgentType.LATENCY] and len(results) == 1
+            assert finished.wait(5.0)
+            time.sleep(0.05)
+        # The late call finished in the background without scoring
+        assert slow.alpha == 1.0 and len(slow.detection_history) == 0
+    
+    def test_register_unregister_agent(self):
+        latency = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        coordinator = AdaptiveCoordinator([])
+        
+        coordinator.register_agent(latency)
+        assert coordinator.agents == [latency]
+        assert coordinator._get_agent_by_type(AgentType.LATENCY) is latency
+        
+        assert coordinator.unregister_agent(AgentType.LATENCY) is latency
+        assert coordinator.agents == []
+        assert coordinator._get_agent_by_type(AgentType.LATENCY) is None
+    
+    def test_fusion_weighted_vote(self):
+        agents = [
+            LatencyDetectionAgent(feature_dim=10, window_size=50),
+            LatencyDetectionAgent(feature_dim=10, window_size=50),
+        ]
+        engine = DecisionFusionEngine(agents)
+        results = [
+            DetectionResult(score=2.0, is_anomaly=True, confidence=1.0,
+                            timestamp=0.0, agent_type=AgentType.LATENCY),
+            DetectionResult(score=0.5, is_anomaly=False, confidence=0.5,
+                            timestamp=0.0, agent_type=AgentType.LATENCY),
+        ]
+        state = SystemState(
+            workload_intensity=2000.0, cpu_utilization=0.5,
+            memory_utilization=0.5, recent_fpr=0.05, recent_fnr=0.05,
+            deployment_active=False, timestamp=0.0
+        )
+        
+        is_anomaly, score = engine.fuse_decisions(results, state)
+        assert score == pytest.approx(1.0)
+        assert is_anomaly
+    
+    def test_multi_service_detector(self):
+        agents = [LatencyDetectionAgent(feature_dim=10, window_size=50)]
+        services = ['ts-order', 'ts-travel', 'ts-route']
+        detector = MultiServiceDetector(agents, services, hysteresis=1)
+        states = [
+            SystemState(
+                workload_intensity=load, cpu_utilization=0.5,
+                memory_utilization=0.5, recent_fpr=0.05, recent_fnr=0.05,
+                deployment_active=False, timestamp=0.0
+            )
+            for load in (500.0, 2000.0, 5000.0)
+        ]
+        
+        is_anomaly, confidence, metadata = detector.process_tick(
+            np.random.randn(3, 50, 10), states
+        )
+        assert is_anomaly.shape == (3,) and confidence.shape == (3,)
+        assert metadata['strategy'] == ['P2P', 'HYBRID', 'HIER']
+        assert metadata['scores'].shape == (3, 1)
+        
+        detector.update_performance(np.array([[True], [False], [True]]))
+        assert detector.weight[0, 0] > detector.weight[1, 0]
+        
+        # A tick over a subset of services leaves the others untouched
+        strategy = detector.current_strategy.copy()
+        _, _, metadata = detector.process_tick(
+            np.random.randn(1, 50, 10), [states[2]], services=['ts-order']
+        )
+        assert metadata['strategy'] == ['HIER']
+        assert list(detector.current_strategy[1:]) == list(strategy[1:])
+    
+    def test_prescreen_skips_quiet_services(self):
+        prescreen = PreScreen(z_threshold=4.0, escalate_every=3, services=3)
+        windows = np.zeros((3, 50, 10))
+        windows[:, ::2] = 1.0
+        
+        escalated = []
+        for tick in range(6):
+            windows[2, -1] = 100.0 if tick == 4 else windows[2, -3]
+            escalate, _ = prescreen.screen(WindowSignals(windows))
+            escalated.append(list(escalate))
+            # Only a still-anomalous service stays escalated
+            prescreen.resolve(np.flatnonzero(escalate), np.zeros(escalate.sum(), dtype=bool))
+        # First tick, every third tick after it, and the spike on service c
+        assert escalated[0] == [True] * 3 and escalated[3] == [True] * 3
+        assert escalated[1] == escalated[2] == escalated[5] == [False] * 3
+        assert escalated[4] == [False, False, True]
+        assert prescreen.escalation_rate == pytest.approx(7 / 18)
+        
+        # Quiet services are scored by the pre-screen alone
+        agents = [LatencyDetectionAgent(feature_dim=10, window_size=50)]
+        detector = MultiServiceDetector(agents, ['a', 'b', 'c'], prescreen=PreScreen())
+        states = [SystemState(2000.0, 0.5, 0.5, 0.05, 0.05, False, 0.0)] * 3
+        detector.process_tick(windows, states)
+        detector.prescreen.resolve(np.arange(3), np.zeros(3, dtype=bool))
+        windows[2, -1] = 100.0
+        is_anomaly, _, metadata = detector.process_tick(windows, states)
+        assert list(metadata['escalated']) == [False, False, True]
+        assert not is_anomaly[:2].any() and (metadata['scores'][:2] < 1.0).all()
+        assert detector.get_statistics()['prescreen']['escalations'] == 4
+    
+    def test_async_pipeline(self):
+        import asyncio
+        
+        coordinators = {
+            name: AdaptiveCoordinator(
+                [LatencyDetectionAgent(feature_dim=10, window_size=50)], hysteresis=1)
+            for name in ('cart', 'checkout')
+        }
+        
+        async def source(n):
+            for t in range(n):
+                await asyncio.sleep(0)
+                yield np.random.randn(50, 10), SystemState(
+                    workload_intensity=500.0, cpu_utilization=0.5,
+                    memory_utilization=0.5, recent_fpr=0.05, recent_fnr=0.05,
+                    deployment_active=False, timestamp=float(t)
+                )
+        
+        decisions = []
+        with AsyncDetectionPipeline(coordinators, max_workers=2) as pipeline:
+            counts = asyncio.run(pipeline.run(
+                {'cart': source(3), 'checkout': source(4)},
+                sink=lambda service, state, decision: decisions.append((service, decision))
+            ))
+        assert counts == {'cart': 3, 'checkout': 4}
+        assert len(decisions) == 7
+        assert all(d[2]['strategy'] == 'P2P' for _, d in decisions)
+    
+    def test_injectable_clock(self):
+        now = [1000.0]
+        coordinator = AdaptiveCoordinator([LatencyDetectionAgent(feature_dim=10)],
+                                          clock=lambda: now[0])
+        coordinator.enable_lenient_mode()
+        assert coordinator.is_lenient_mode()
+        now[0] += coordinator.lenient_mode_duration + 1
+        assert not coordinator.is_lenient_mode()
+    
+    def test_simulated_clock_follows_state_timestamps(self):
+        clock = SimulatedClock(start=0.0)
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        coordinator = AdaptiveCoordinator([agent], hysteresis=1, clock=clock)
+        
+        lenient = []
+        for minute in range(60):
+            state = SystemState(
+                workload_intensity=500.0 if minute < 30 else 5000.0,
+                cpu_utilization=0.5, memory_utilization=0.5,
+                recent_fpr=0.05, recent_fnr=0.05,
+                deployment_active=minute == 0, timestamp=minute * 60.0
+            )
+            clock.observe(state.timestamp)
+            results = [agent.detect(np.random.randn(50, 10))]
+            coordinator.coordinate_detection(results, state)
+            lenient.append(coordinator.is_lenient_mode())
+        
+        # 30-minute lenient window in trace time
+        assert all(lenient[:30]) and not any(lenient[30:])
+        assert agent.detection_history.latest(1)['timestamp'][0] == 59 * 60.0
+        distribution = coordinator.get_statistics()['strategy_distribution']
+        assert distribution['P2P']['time_percent'] == pytest.approx(30 / 59 * 100)
+        assert distribution['HIER']['time_percent'] == pytest.approx(29 / 59 * 100)
+
+class TestIncidentGrouper:
+    def test_sustained_positives_form_one_incident(self):
+        grouper = IncidentGrouper(time_window=120.0, update_interval=300.0)
+        events = []
+        for minute in range(20):
+            events += grouper.observe('cart', minute * 60.0, 5 <= minute < 10, 0.8)
+        events += grouper.flush()
+        assert [(e.kind, e.reason) for e in events] == [('open', None), ('close', 'resolved')]
+        assert events[0].incident.detections == 5
+        assert events[0].incident.duration == 240.0
+        assert grouper.reduction == 2.5
+    
+    def test_topology_merges_cross_service_positives(self):
+        grouper = IncidentGrouper(time_window=60.0, topology={'checkout': ['cart', 'payment']})
+        grouper.observe('cart', 0.0, True)
+        grouper.observe('payment', 10.0, True)
+        assert len(grouper.open) == 2
+        
+        events = grouper.observe_tick(['checkout', 'search'], [20.0, 20.0], [True, True])
+        merged = [e for e in events if e.reason == 'merged']
+        assert len(merged) == 1 and merged[0].merged_into == 1
+        incident = grouper.open[1]
+        assert incident.services == {'cart', 'payment', 'checkout'}
+        assert incident.detections == 3
+        assert sorted(grouper.open) == [1, 3]
+    
+    def test_open_incidents_are_bounded(self):
+        grouper = IncidentGrouper(time_window=1e9, max_open=4)
+        for i in range(10):
+            grouper.observe(f'svc{i}', float(i), True)
+        assert len(grouper.open) == 4
+        assert sorted(grouper.open) == [7, 8, 9, 10]
+        assert grouper.events['close'] == 6
+
+class TestPipelineFactory:
+    def test_build_from_yaml(self):
+        config = PipelineConfig.from_yaml('configs/default.yaml', 'configs/train_ticket.yaml')
+        assert config.feature_dim == 187
+        assert [spec.type for spec in config.agents][-1] == 'slo_compliance'
+        
+        pipeline = build_pipeline(config, feature_dim=6)
+        assert [a.agent_type for a in pipeline.agents] == list(AgentType)
+        assert pipeline.coordinator.hysteresis == 2
+        
+        windows = np.random.randn(3, config.window_size, 6)
+        results = pipeline.detect_batch(windows)
+        assert len(results) == 3 and len(results[0]) == len(AgentType)
+    
+    def test_validation_reports_every_error(self):
+        with pytest.raises(ValueError) as excinfo:
+            PipelineConfig.from_dict({
+                'dataset': {'window_size': 0},
+                'model': {'checkpoint_dir': 'no/such/checkpoints'},
+                'agents': [{'type': 'latency'}, {'type': 'bogus'}],
+                'coordination': {'threshold_low_load': 5000, 'hystersis': 2},
+                'execution': {'backend': 'tensorrt', 'batch_size': -1},
+            })
+        assert len(excinfo.value.errors) == 7
+        assert any('no/such/checkpoints' in e for e in excinfo.value.errors)
+    
+    def test_agent_columns_build_a_schema(self):
+        config = PipelineConfig.from_dict({'agents': [
+            {'type': 'latency', 'columns': ['*_ms']},
+            {'type': 'error_rate', 'columns': ['errors']},
+        ]})
+        pipeline = build_pipeline(config, feature_names=['p50_ms', 'errors', 'p99_ms'])
+        assert [a.feature_dim for a in pipeline.agents] == [2, 1]
+        assert pipeline.schema.columns == ['p50_ms', 'p99_ms', 'errors']
@@ -0,0 +1,50 @@
+"""Test columnar dataset storage"""
+import numpy as np
+import sys
+sys.path.insert(0, 'src')
+
+from src.data import ColumnarDataset, convert_csv_traces, open_dataset
+
+class TestColumnarDataset:
+    def _write_csv(self, path, n=120, features=3):
+        data = np.random.randn(n, features)
+        labels = (np.arange(n) > 100).astype(int)
+        with open(path, 'w') as f:
+            f.write('timestamp,label,' + ','.join(f'm{i}' for i in range(features)) + '\n')
+            for t in range(n):
+                f.write(f'{t},{labels[t]},' + ','.join(map(str, data[t])) + '\n')
+        return data, labels
+    
+    def test_convert_and_window_views(self, tmp_path):
+        data, labels = self._write_csv(tmp_path / 'orders.csv')
+        dataset = convert_csv_traces({'orders': tmp_path / 'orders.csv'},
+                                     tmp_path / 'columnar', chunksize=32)
+        
+        reopened = ColumnarDataset(tmp_path / 'columnar')
+        trace = reopened.trace('orders')
+        assert reopened.services == ['orders']
+        assert trace.feature_names == ['m0', 'm1', 'm2']
+        assert len(trace) == 120 and trace.feature_dim == 3
+        
+        window = trace.window(10, window_size=50)
+        assert window.shape == (50, 3)
+        assert np.shares_memory(window, trace.features)
+        np.testing.assert_allclose(window, data[10:60], rtol=1e-6)
+        
+        windows = trace.windows(window_size=50, stride=5)
+        assert windows.shape == (trace.num_windows(50, 5), 50, 3)
+        np.testing.assert_array_equal(windows[2], trace.window(2, 50, stride=5))
+        np.testing.assert_array_equal(trace.window_labels(50), labels[49:])
+    
+    def test_open_dataset_appends_services_on_demand(self, tmp_path):
+        raw = tmp_path / 'shop' / 'raw'
+        raw.mkdir(parents=True)
+        self._write_csv(raw / 'cart.csv')
+        data, _ = self._write_csv(raw / 'orders.csv', features=2)
+        
+        assert open_dataset('shop', tmp_path, services=['cart']).services == ['cart']
+        dataset = open_dataset('shop', tmp_path, services=['orders'])
+        assert dataset.services == ['cart', 'orders']
+        np.testing.assert_allclose(dataset.trace('orders').features, data, rtol=1e-6)
+        assert dataset.trace('cart').feature_dim == 3
+        assert ColumnarDataset(tmp_path / 'shop' / 'columnar').services == ['cart', 'orders']
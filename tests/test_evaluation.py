@@ -0,0 +1,99 @@
+"""Test replay evaluation"""
+import pytest
+import json
+import numpy as np
+import sys
+sys.path.insert(0, 'src')
+
+from src.evaluation import (ReplayConfig, compact_report, prescreen_report, run_replay,
+                            write_results)
+from src.evaluation.sweep import (
+    SweepCache, cell_config, config_hash, expand_grid, load_sweep_results, run_sweep
+)
+
+class TestReplay:
+    def _dataset(self, tmp_path, n=120, features=4):
+        data = np.random.randn(n, features)
+        labels = ((np.arange(n) >= 80) & (np.arange(n) < 100)).astype(int)
+        raw = tmp_path / 'toy' / 'raw'
+        raw.mkdir(parents=True)
+        with open(raw / 'svc.csv', 'w') as f:
+            f.write('timestamp,label,' + ','.join(f'm{i}' for i in range(features)) + '\n')
+            for t in range(n):
+                f.write(f'{t * 60},{labels[t]},' + ','.join(map(str, data[t])) + '\n')
+    
+    def test_replay_reports_quality_and_cost(self, tmp_path):
+        self._dataset(tmp_path)
+        config = ReplayConfig(dataset='toy', data_root=str(tmp_path),
+                              window_size=20, hidden_dim=8)
+        
+        results = run_replay(config, ['P2P', 'ADAPTIVE'], isolate=False)
+        assert [r.strategy for r in results] == ['P2P', 'ADAPTIVE']
+        for r in results:
+            assert r.windows == 101
+            assert r.incidents == 1
+            assert 0.0 <= r.f1 <= 1.0
+            assert r.windows_per_sec > 0 and r.latency_p99_ms >= r.latency_p50_ms
+            assert r.peak_rss_mb > 0
+            assert sum(r.strategy_time_percent.values()) == pytest.approx(100.0)
+            assert r.alert_incidents <= r.positive_decisions
+        
+        path = write_results(results, config, str(tmp_path / 'results'))
+        report = json.loads(path.read_text())
+        assert report['dataset'] == 'toy' and len(report['results']) == 2
+    
+    def test_replay_rejects_missing_checkpoints(self, tmp_path):
+        with pytest.raises(ValueError, match='not a directory'):
+            ReplayConfig(dataset='toy', data_root=str(tmp_path),
+                         checkpoint_dir=str(tmp_path / 'checkpoints'))
+    
+    def test_replay_feature_groups(self, tmp_path):
+        self._dataset(tmp_path)
+        config = ReplayConfig(dataset='toy', data_root=str(tmp_path), window_size=20,
+                              hidden_dim=8, feature_groups={'LDA': ['m1', 'm3']})
+        
+        result, = run_replay(config, ['HYBRID'], isolate=False)
+        assert result.windows == 101
+    
+    def test_compact_report(self, tmp_path):
+        self._dataset(tmp_path)
+        config = ReplayConfig(dataset='toy', data_root=str(tmp_path),
+                              window_size=20, hidden_dim=8)
+        
+        report = compact_report(config, ['P2P'])
+        assert report['model_bytes_compact'] < report['model_bytes_float']
+        row = report['strategies'][0]
+        assert row['strategy'] == 'P2P'
+        assert row['f1_delta'] == pytest.approx(row['f1_compact'] - row['f1_float'])
+    
+    def test_prescreen_report(self, tmp_path):
+        self._dataset(tmp_path)
+        config = ReplayConfig(dataset='toy', data_root=str(tmp_path),
+                              window_size=20, hidden_dim=8, prescreen_every=5)
+        
+        report = prescreen_report(config, ['HYBRID'])
+        row = report['strategies'][0]
+        assert 0.2 <= row['escalation_rate'] < 1.0
+        assert 0.0 <= row['escalated_anomaly_rate'] <= 1.0
+        assert row['recall_delta'] == pytest.approx(row['recall_tiered'] - row['recall_full'])
+        assert row['recall_tiered'] <= row['escalated_anomaly_rate']
+    
+    def test_sweep_grid_and_cache(self, tmp_path):
+        grid = {'window_size': [25, 50], 'hysteresis': [1, 2]}
+        cells = expand_grid(grid)
+        assert len(cells) == 4
+        assert {'hysteresis': 1, 'window_size': 50} in cells
+        assert config_hash({'a': 1, 'b': 2}) == config_hash({'b': 2, 'a': 1})
+        
+        # Fully cached sweeps do not start any workers
+        cache = SweepCache(str(tmp_path))
+        for params in cells:
+            cell = dict(dataset='toy', strategies=['P2P'], **params)
+            cache.put(cell, [{'strategy': 'P2P', 'f1': 0.5}])
+        entries = run_sweep(['toy'], grid, strategies=['P2P'], cache_dir=str(tmp_path))
+        assert len(entries) == 4
+        assert len(load_sweep_results(str(tmp_path))) == 4
+        
+        config = cell_config(dict(dataset='toy', strategies=['P2P'], window_size=25,
+                                  hysteresis=1))
+        assert config.window_size == 25 and config.coordination == {'hysteresis': 1}
@@ -0,0 +1,96 @@
+"""Test Prometheus instrumentation"""
+import pytest
+import numpy as np
+import sys
+import threading
+sys.path.insert(0, 'src')
+
+pytest.importorskip('prometheus_client')
+
+from src.agents import AgentType, LatencyDetectionAgent
+from src.coordination import AdaptiveCoordinator, SystemState, SharedSignalEngine
+from src.monitoring import Instrumentation
+
+def _state(workload=2000.0, deployment=False):
+    return SystemState(
+        workload_intensity=workload, cpu_utilization=0.5,
+        memory_utilization=0.5, recent_fpr=0.05, recent_fnr=0.05,
+        deployment_active=deployment, timestamp=0.0
+    )
+
+class TestInstrumentation:
+    def test_exports_stage_and_coordination_metrics(self):
+        agent = LatencyDetectionAgent(feature_dim=10, window_size=50)
+        coordinator = AdaptiveCoordinator([agent], hysteresis=1)
+        metrics = Instrumentation()
+        metrics.instrument(coordinator)
+        
+        agent.detect_batch(np.random.randn(4, 50, 10))
+        results = SharedSignalEngine(coordinator).detect(np.random.randn(50, 10))
+        coordinator.coordinate_detection(results, _state(workload=5000.0, deployment=True))
+        
+        registry = metrics.registry
+        labels = {'agent_type': 'LDA', 'stage': 'score'}
+        assert registry.get_sample_value('adapt_mad_stage_duration_seconds_count', labels) == 2
+        assert registry.get_sample_value(
+            'adapt_mad_stage_duration_seconds_count', {'agent_type': 'LDA', 'stage': 'forward'}
+        ) == 2
+        assert registry.get_sample_value(
+            'adapt_mad_strategy_switches_total',
+            {'from_strategy': 'HYBRID', 'to_strategy': 'HIER'}
+        ) == 1
+        assert registry.get_sample_value('adapt_mad_lenient_mode_activations_total') == 1
+        assert registry.get_sample_value(
+            'adapt_mad_agent_alpha', {'agent_type': 'LDA', 'agent': '0'}
+        ) == pytest.approx(agent.alpha)
+        assert b'adapt_mad_fusion_duration_seconds' in metrics.exposition()
+    
+    def test_agent_gauges_per_agent(self):
+        coordinators = [AdaptiveCoordinator([LatencyDetectionAgent(feature_dim=10)])
+                        for _ in range(2)]
+        metrics = Instrumentation()
+        for coordinator, alpha in zip(coordinators, (0.8, 1.4)):
+            metrics.instrument(coordinator)
+            coordinator.agents[0].alpha = alpha
+        
+        registry = metrics.registry
+        # Agents of the same type keep separate series
+        for index, alpha in (('0', 0.8), ('1', 1.4)):
+            assert registry.get_sample_value(
+                'adapt_mad_agent_alpha', {'agent_type': 'LDA', 'agent': index}) == alpha
+        
+        agent = coordinators[0].unregister_agent(AgentType.LATENCY)
+        assert agent.metrics is None
+        assert registry.get_sample_value(
+            'adapt_mad_agent_alpha', {'agent_type': 'LDA', 'agent': '0'}) is None
+        assert registry.get_sample_value(
+            'adapt_mad_agent_weight', {'agent_type': 'LDA', 'agent': '1'}) == 1.0
+    
+    def test_scrape_during_registration(self):
+        metrics = Instrumentation()
+        agents = [LatencyDetectionAgent(feature_dim=4) for _ in range(50)]
+        done = threading.Event()
+        
+        def churn():
+            for _ in range(20):
+                for agent in agents:
+                    metrics.instrument_agent(agent)
+                for agent in agents:
+                    metrics.uninstrument_agent(agent)
+            done.set()
+        
+        thread = threading.Thread(target=churn)
+        thread.start()
+        while not done.is_set():
+            metrics.exposition()
+        thread.join()
+    
+    def test_get_statistics_is_read_only(self):
+        coordinator = AdaptiveCoordinator([LatencyDetectionAgent(feature_dim=10)])
+        before = ({k: dict(v) for k, v in coordinator.strategy_stats.items()},
+                  coordinator.strategy_start_time)
+        coordinator.get_statistics()
+        coordinator.get_statistics()
+        after = ({k: dict(v) for k, v in coordinator.strategy_stats.items()},
+                 coordinator.strategy_start_time)
+        assert before == after
@@ -0,0 +1,112 @@
+"""Test gRPC detection service"""
+import pytest
+import numpy as np
+import queue
+import threading
+import sys
+sys.path.insert(0, 'src')
+
+grpc = pytest.importorskip('grpc')
+
+from src.agents import LatencyDetectionAgent
+from src.coordination import MultiServiceDetector, SystemState
+from src.serving import DetectionServicer, DetectionClient, serve
+from src.serving.server import _Pending
+
+@pytest.fixture
+def service(request):
+    agents = [LatencyDetectionAgent(feature_dim=4, window_size=10)]
+    options = getattr(request, 'param', {})
+    servicer = DetectionServicer(MultiServiceDetector(agents, []), feature_dim=4,
+                                 window_size=10, max_delay=0.01, **options)
+    server, port = serve(servicer, 'localhost:0', max_streams=4)
+    channel = grpc.insecure_channel(f'localhost:{port}')
+    yield servicer, DetectionClient(channel)
+    channel.close()
+    server.stop(None)
+    servicer.stop()
+
+def _samples(services, n, features=4):
+    for t in range(n):
+        for name in services:
+            yield {'service': name, 'timestamp': float(t),
+                   'values': np.random.randn(features).tolist()}
+
+class TestDetectionService:
+    def test_streams_decisions_from_concurrent_clients(self, service):
+        servicer, client = service
+        outputs = {}
+        
+        def run(cluster):
+            services = [f'{cluster}-{i}' for i in range(3)]
+            outputs[cluster] = list(client.detect(_samples(services, 25)))
+        
+        threads = [threading.Thread(target=run, args=(c,)) for c in ('a', 'b')]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        
+        for cluster, decisions in outputs.items():
+            # A decision per sample once each service has a full window
+            assert len(decisions) == 3 * (25 - 9)
+            assert {d['service'] for d in decisions} == {f'{cluster}-{i}' for i in range(3)}
+            assert [d['timestamp'] for d in decisions] == sorted(d['timestamp'] for d in decisions)
+            assert set(decisions[0]['scores']) == {'LDA'}
+        assert servicer.detector.services and servicer.windows_processed == 96
+        assert servicer.mean_batch_size >= 1
+    
+    def test_rejects_malformed_samples(self, service):
+        _, client = service
+        with pytest.raises(grpc.RpcError) as excinfo:
+            list(client.detect([{'service': 's', 'values': [1.0, 2.0]}]))
+        assert excinfo.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+    
+    def test_defers_only_repeated_services(self, service):
+        servicer, _ = service
+        servicer.detector.add_services(['a', 'b', 'c'])
+        replies = queue.Queue()
+        state = SystemState(0.5, 0.0, 0.0, 0.0, 0.0, False, 0.0)
+        batch = [_Pending(name, np.random.randn(10, 4), state, replies, seq)
+                 for seq, name in enumerate(['a', 'b', 'a', 'c'])]
+        servicer._inflight.update({'a': 2, 'b': 1, 'c': 1})
+        ticks = servicer.ticks
+        
+        servicer._process(batch)
+        
+        # b and c share the first tick with a; only the second a waits
+        assert servicer.ticks - ticks == 2
+        order = [replies.get_nowait() for _ in range(4)]
+        assert [(seq, d['service']) for seq, d in order] == [
+            (0, 'a'), (1, 'b'), (3, 'c'), (2, 'a')]
+        assert not servicer._inflight
+    
+    @pytest.mark.parametrize('service', [{'max_services': 2, 'service_ttl': None}],
+                             indirect=True)
+    def test_evicts_least_recently_seen_services(self, service):
+        servicer, client = service
+        decisions = list(client.detect(_samples(['a', 'b'], 12)))
+        # a and b have no windows in flight once their replies are back
+        decisions += client.detect(_samples(['c'], 12))
+        
+        assert {d['service'] for d in decisions} == {'a', 'b', 'c'}
+        assert set(servicer._windows) == {'b', 'c'}
+        assert servicer.detector.services == ['b', 'c']
+        assert servicer.services_evicted == 1
+    
+    @pytest.mark.parametrize('service', [{'max_pending': 2}], indirect=True)
+    def test_backpressure_completes_every_stream(self, service):
+        servicer, client = service
+        finished = []
+        
+        def run(k):
+            decisions = list(client.detect(_samples([f's{k}-{i}' for i in range(4)], 20)))
+            finished.append(len(decisions))
+        
+        threads = [threading.Thread(target=run, args=(k,), daemon=True) for k in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join(timeout=30)
+        
+        assert finished == [4 * (20 - 9)] * 8
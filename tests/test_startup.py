@@ -0,0 +1,43 @@
+"""Test package import cost"""
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+# Generous for a cold interpreter on a loaded CI box; torch alone takes several seconds
+IMPORT_BUDGET_SECONDS = 1.0
+
+_PROBE = """
+import json, sys, time
+start = time.perf_counter()
+import src.coordination as coordination
+coordination.AdaptiveCoordinator, coordination.DecisionFusionEngine
+coordination.MultiServiceDetector, coordination.AsyncDetectionPipeline
+from src.agents import AgentType, DetectionResult, MetricSchema
+elapsed = time.perf_counter() - start
+print(json.dumps({'seconds': elapsed, 'torch': 'torch' in sys.modules}))
+"""
+
+def _probe(code: str) -> dict:
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True,
+                         text=True, check=True, cwd=REPO_ROOT)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+class TestStartup:
+    def test_coordination_import_is_torch_free_and_fast(self):
+        # Best of three, so one slow filesystem read does not fail the run
+        probes = [_probe(_PROBE) for _ in range(3)]
+        assert not any(p['torch'] for p in probes)
+        assert min(p['seconds'] for p in probes) < IMPORT_BUDGET_SECONDS
+    
+    def test_heavy_exports_load_on_first_use(self):
+        probe = _probe(
+            "import json, sys\n"
+            "import src\n"
+            "before = 'torch' in sys.modules\n"
+            "src.coordination.DetectionRunner\n"
+            "print(json.dumps({'before': before, 'after': 'torch' in sys.modules}))"
+        )
+        assert probe == {'before': False, 'after': True}
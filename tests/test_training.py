@@ -0,0 +1,108 @@
+"""Test detector training"""
+import pytest
+import numpy as np
+import sys
+import time
+import torch
+sys.path.insert(0, 'src')
+
+from src.agents import AgentType, DetectionAgent, LatencyDetectionAgent, MetricSchema
+from src.coordination import AdaptiveCoordinator, SharedSignalEngine
+from src.training import OnlineUpdater, SlidingWindowDataset, Trainer, TrainingConfig
+
+class TestTraining:
+    def test_sliding_window_dataset(self):
+        agent = LatencyDetectionAgent(feature_dim=4, window_size=10)
+        dataset = SlidingWindowDataset(np.random.randn(100, 4), 10, agent, stride=5)
+        assert len(dataset) == 19
+        assert tuple(dataset[3].shape) == (10, agent.input_dim)
+    
+    def test_fit_writes_loadable_checkpoint(self, tmp_path):
+        agent = LatencyDetectionAgent(feature_dim=4, window_size=10, hidden_dim=8)
+        config = TrainingConfig(epochs=2, batch_size=8, num_workers=0,
+                                checkpoint_dir=str(tmp_path))
+        
+        summary = Trainer(agent, config).fit(np.random.randn(200, 4))
+        assert len(summary['history']) <= 2
+        
+        restored = LatencyDetectionAgent(feature_dim=4, window_size=10, hidden_dim=8,
+                                         checkpoint=str(tmp_path))
+        assert restored.checkpoint_version == 1
+        for a, b in zip(agent.model.parameters(), restored.model.parameters()):
+            assert np.allclose(a.detach().numpy(), b.detach().numpy())
+    
+    def test_online_updater_tracks_drift(self):
+        torch.manual_seed(0)
+        agent = LatencyDetectionAgent(feature_dim=4, window_size=10, hidden_dim=8)
+        updater = OnlineUpdater([agent], window_size=10, feature_dim=4, buffer_size=64,
+                                min_windows=16, learning_rate=0.01, seed=0)
+        
+        t = np.arange(10)[:, np.newaxis]
+        drifted = [np.sin(t / 2.0 + phase) * 3 + 5 for phase in np.linspace(0, 6, 40)]
+        drifted = [np.repeat(w, 4, axis=1) for w in drifted]
+        for window in drifted[:10]:
+            updater.observe(window, is_anomaly=False)
+        updater.observe(drifted[0] * 100, is_anomaly=True)
+        assert len(updater) == 10 and not updater.update_once()
+        
+        for window in drifted[10:]:
+            updater.observe(window, is_anomaly=False)
+        original = agent.model
+        losses = []
+        for _ in range(20):
+            assert updater.update_once()
+            losses.append(updater.last_loss['LDA'])
+        assert agent.model is not original
+        assert np.mean(losses[-5:]) < np.mean(losses[:5])
+        
+        # A deployment discards the pre-deployment baseline
+        updater.observe(drifted[0], is_anomaly=False, deployment_active=True)
+        assert len(updater) == 1
+        
+        # Background mode publishes without the caller driving updates
+        for window in drifted:
+            updater.observe(window, is_anomaly=False)
+        updater.min_interval = 0.0
+        with updater:
+            for _ in range(100):
+                if updater.updates > 20:
+                    break
+                time.sleep(0.05)
+        assert updater.updates > 20
+    
+    def test_swapped_models_serve_without_repacking(self):
+        agent = LatencyDetectionAgent(feature_dim=4, window_size=10, hidden_dim=8)
+        engine = SharedSignalEngine(AdaptiveCoordinator([agent]))
+        updater = OnlineUpdater([agent], window_size=10, feature_dim=4, buffer_size=32,
+                                min_windows=8, seed=0)
+        for _ in range(8):
+            updater.observe(np.random.randn(10, 4), is_anomaly=False)
+        
+        window = np.random.randn(10, 4)
+        before = engine.detect(window)[0].score
+        assert updater.update_once()
+        # The next tick serves the published model; there is no packed copy to rebuild
+        after = engine.detect(window)[0].score
+        assert after != before
+        assert after == pytest.approx(agent.detect(window).score, rel=1e-5)
+    
+    def test_online_updater_trains_schema_views(self):
+        schema = MetricSchema({AgentType.LATENCY: ['p50', 'p99'],
+                               AgentType.ERROR_RATE: ['errors', 'timeouts', 'retries']})
+        agents = [
+            LatencyDetectionAgent(feature_dim=2, window_size=10, hidden_dim=8),
+            DetectionAgent(AgentType.ERROR_RATE, feature_dim=3, window_size=10, hidden_dim=8),
+        ]
+        coordinator = AdaptiveCoordinator(agents, schema=schema)
+        updater = OnlineUpdater(coordinator.agents, window_size=10, feature_dim=len(schema),
+                                buffer_size=32, min_windows=8, seed=0, schema=coordinator.schema)
+        for _ in range(8):
+            updater.observe(np.random.randn(10, 5), is_anomaly=False)
+        
+        originals = [agent.model for agent in agents]
+        assert updater.update_once()
+        assert all(agent.model is not m for agent, m in zip(agents, originals))
+        assert set(updater.last_loss) == {'LDA', 'ERA'}
+        
+        with pytest.raises(ValueError, match='schema width'):
+            OnlineUpdater(agents, window_size=10, feature_dim=4, schema=schema)
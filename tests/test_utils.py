@@ -0,0 +1,57 @@
+"""Test utilities"""
+import pytest
+import numpy as np
+import sys
+sys.path.insert(0, 'src')
+
+from src.utils import RingBuffer, RollingRate, RollingWindowStats
+
+class TestRollingWindowStats:
+    def test_matches_full_recompute(self):
+        data = np.random.randn(120, 5) * 10 + 500
+        stats = RollingWindowStats(window_size=50, feature_dim=5)
+        stats.subscribe([50, 95, 99])
+        
+        for i, sample in enumerate(data):
+            stats.update(sample)
+            window = data[max(0, i - 49):i + 1]
+            np.testing.assert_allclose(stats.mean, window.mean(axis=0))
+            np.testing.assert_allclose(stats.std, window.std(axis=0), rtol=1e-6)
+            for q in (50, 95, 99):
+                np.testing.assert_allclose(
+                    stats.percentile(q), np.percentile(window, q, axis=0)
+                )
+        
+        np.testing.assert_array_equal(stats.window(), data[-50:])
+    
+    def test_unsubscribed_percentile(self):
+        stats = RollingWindowStats(window_size=10, feature_dim=2)
+        stats.update(np.zeros(2))
+        with pytest.raises(KeyError):
+            stats.percentile(95)
+
+class TestRingBuffer:
+    def test_wraparound_and_snapshots(self):
+        dtype = [('t', np.float64), ('flag', np.bool_)]
+        ring = RingBuffer(5, dtype)
+        ring.append((0.0, True))
+        ring.extend(np.array([(float(t), t % 2 == 0) for t in range(1, 8)], dtype=dtype))
+        
+        assert len(ring) == 5 and ring.written == 8
+        np.testing.assert_array_equal(ring.latest()['t'], [3, 4, 5, 6, 7])
+        np.testing.assert_array_equal(ring.latest(2)['t'], [6, 7])
+        older, newer = ring.views()
+        np.testing.assert_array_equal(np.concatenate([older, newer])['t'], [3, 4, 5, 6, 7])
+        
+        # Oversized batches keep only the newest records
+        ring.extend(np.array([(float(t), False) for t in range(20)], dtype=dtype))
+        np.testing.assert_array_equal(ring.latest()['t'], [15, 16, 17, 18, 19])
+    
+    def test_rolling_rate(self):
+        rate = RollingRate(maxlen=4)
+        outcomes = [1, 0, 1, 1, 1, 0, 0]
+        for i, value in enumerate(outcomes):
+            rate.append(value)
+            window = outcomes[max(0, i - 3):i + 1]
+            assert len(rate) == len(window)
+            assert rate.mean() == pytest.approx(np.mean(window))